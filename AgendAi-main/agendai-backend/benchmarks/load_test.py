@@ -0,0 +1,131 @@
+"""Teste de carga do servidor de produção com diferentes quantidades de workers
+
+Sobe o gunicorn (gunicorn.conf.py + wsgi:app) sobre um banco SQLite temporário e
+mede requisições por segundo em GET /api/bookings/available-times.
+
+Uso (a partir de agendai-backend):
+    python benchmarks/load_test.py --workers 1 2 4 --clients 32 --duration 10
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('Servidor não respondeu a tempo')
+
+def request(connection, method, path, body=None):
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+def seed(port):
+    """Criar um serviço e alguns agendamentos no dia consultado"""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    status, body = request(connection, 'POST', '/api/services', {'name': 'Carga', 'duration_minutes': 60, 'price': 100})
+    service_id = json.loads(body)['data']['id']
+    day = (date.today() + timedelta(days=7)).isoformat()
+    for hour in (9, 11, 14, 16):
+        request(connection, 'POST', '/api/bookings', {
+            'service_id': service_id,
+            'client_name': 'Cliente',
+            'client_contact': '11999999999',
+            'appointment_date': day,
+            'appointment_time': f'{hour:02d}:00'
+        })
+    return f'/api/bookings/available-times/{day}/{service_id}'
+
+def hammer(port, path, clients, duration):
+    """Disparar requisições com conexões keep-alive; retorna (req/s, erros)"""
+    counts = [0] * clients
+    errors = [0] * clients
+    deadline = time.monotonic() + duration
+    
+    def client(index):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        while time.monotonic() < deadline:
+            try:
+                status, _ = request(connection, 'GET', path)
+                if status == 200:
+                    counts[index] += 1
+                else:
+                    errors[index] += 1
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port)
+    
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.monotonic() - started), sum(errors)
+
+def run(workers, threads, clients, duration):
+    with tempfile.TemporaryDirectory() as directory:
+        port = free_port()
+        env = dict(
+            os.environ,
+            PORT=str(port),
+            WEB_CONCURRENCY=str(workers),
+            WEB_THREADS=str(threads),
+            DATABASE_URL=f"sqlite:///{os.path.join(directory, 'load.db')}",
+            AGENDAI_OUTBOX_WORKER='0'
+        )
+        # Mesmo procedimento do deploy: migrar antes de subir os workers
+        subprocess.run(
+            [sys.executable, '-m', 'flask', '--app', 'wsgi', 'db-upgrade'],
+            cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL
+        )
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_ready(port)
+            path = seed(port)
+            return hammer(port, path, clients, duration)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+    
+    for workers in args.workers:
+        rate, errors = run(workers, args.threads, args.clients, args.duration)
+        print(f'{workers:>2} worker(s): {rate:8.1f} req/s  erros={errors}')
+
+if __name__ == '__main__':
+    main()
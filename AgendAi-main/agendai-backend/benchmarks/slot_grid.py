@@ -0,0 +1,89 @@
+"""Micro-benchmark do cálculo de horários livres de um dia
+
+Compara, em memória e sem banco:
+  - legado: laço com datetime.combine/timedelta e verificação contra cada agendamento;
+  - varredura: BusyIntervals.free_slots_in com a grade gerada a cada chamada;
+  - grade: Schedule com a grade de inteiros em cache (caminho usado pelas rotas).
+
+Uso (a partir de agendai-backend):
+    python benchmarks/slot_grid.py --bookings 12 --duration 60 --number 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import date, datetime, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.availability import BusyIntervals
+from src.utils.schedule import Schedule, default_business_hours
+
+# Expediente padrão (8h às 18h) e intervalo entre horários, em minutos
+BUSINESS_START = 8 * 60
+BUSINESS_END = 18 * 60
+SLOT_STEP = 30
+
+def legacy_free_slots(day, bookings, duration):
+    """Algoritmo original de get_available_times (8h às 18h, a cada 30 minutos)"""
+    slots = []
+    current_time = time(8, 0)
+    end_time = time(18, 0)
+    while current_time < end_time:
+        current_datetime = datetime.combine(day, current_time)
+        end_datetime = current_datetime + timedelta(minutes=duration)
+        if end_datetime.time() <= end_time:
+            has_conflict = False
+            for booking_time, booking_duration in bookings:
+                booking_start = datetime.combine(day, booking_time)
+                booking_end = booking_start + timedelta(minutes=booking_duration)
+                if current_datetime < booking_end and end_datetime > booking_start:
+                    has_conflict = True
+                    break
+            if not has_conflict:
+                slots.append(current_time.strftime('%H:%M'))
+        current_datetime += timedelta(minutes=30)
+        current_time = current_datetime.time()
+    return slots
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookings', type=int, default=12, help='agendamentos de 20 minutos no dia')
+    parser.add_argument('--duration', type=int, default=60)
+    parser.add_argument('--number', type=int, default=20000, help='repetições de cada variante')
+    args = parser.parse_args()
+    
+    day = date(2026, 3, 2)
+    # Agendamentos espalhados pelo expediente, a cada 50 minutos a partir das 8h
+    bookings = [(time((480 + index * 50) // 60, (480 + index * 50) % 60), 20)
+                for index in range(args.bookings) if 480 + index * 50 < 18 * 60]
+    busy = BusyIntervals(
+        (booking_time.hour * 60 + booking_time.minute, booking_time.hour * 60 + booking_time.minute + duration)
+        for booking_time, duration in bookings
+    )
+    schedule = Schedule(default_business_hours())
+    
+    def to_str(slots):
+        return [f'{slot // 60:02d}:{slot % 60:02d}' for slot in slots]
+    
+    variants = {
+        'legado': lambda: legacy_free_slots(day, bookings, args.duration),
+        'varredura': lambda: to_str(busy.free_slots_in(
+            range(BUSINESS_START, BUSINESS_END - args.duration + 1, SLOT_STEP), args.duration
+        )),
+        'grade': lambda: to_str(schedule.free_slots(day, busy, args.duration))
+    }
+    expected = variants['legado']()
+    for name, function in variants.items():
+        if function() != expected:
+            raise SystemExit(f'Resultado divergente na variante {name}')
+    
+    baseline = None
+    for name, function in variants.items():
+        seconds = min(timeit.repeat(function, number=args.number, repeat=3))
+        per_call = seconds / args.number * 1e6
+        baseline = baseline or per_call
+        print(f'{name:>10}: {per_call:8.2f} µs/chamada  ({baseline / per_call:5.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Vazão de escrita do SQLite com o perfil padrão e com o perfil de desempenho
+
+Uso (a partir de agendai-backend):
+    python benchmarks/sqlite_profile.py --bookings 400 --threads 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import create_app
+from src.models.agendai import db
+from src.storage import SQLITE_PRAGMAS
+
+# Perfil equivalente ao comportamento anterior: journal em rollback e fsync completo
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+def build_app(path, pragmas):
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLITE_PRAGMAS': pragmas,
+        'RUN_MIGRATIONS_ON_START': True,
+        'START_OUTBOX_WORKER': False
+    })
+
+def run(pragmas, bookings, threads):
+    """Criar agendamentos em paralelo e retornar (agendamentos/s, erros)"""
+    with tempfile.TemporaryDirectory() as directory:
+        app = build_app(os.path.join(directory, 'bench.db'), pragmas)
+        client = app.test_client()
+        client.post('/api/services', json={'name': 'Benchmark', 'duration_minutes': 30, 'price': 100})
+        first_day = date.today() + timedelta(days=1)
+        
+        def create(index):
+            # Um agendamento por horário livre: 20 horários por dia entre 8h e 18h
+            day = first_day + timedelta(days=index // 20)
+            minutes = 8 * 60 + (index % 20) * 30
+            response = client.post('/api/bookings', json={
+                'service_id': 1,
+                'client_name': f'Cliente {index}',
+                'client_contact': '11999999999',
+                'appointment_date': day.isoformat(),
+                'appointment_time': f'{minutes // 60:02d}:{minutes % 60:02d}'
+            })
+            return response.status_code
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = list(executor.map(create, range(bookings)))
+        elapsed = time.perf_counter() - started
+        with app.app_context():
+            db.engine.dispose()
+    return bookings / elapsed, sum(1 for status in statuses if status != 201)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookings', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+    
+    for name, pragmas in (('padrão', DEFAULT_PRAGMAS), ('desempenho', SQLITE_PRAGMAS)):
+        rate, errors = run(pragmas, args.bookings, args.threads)
+        print(f'{name:>10}: {rate:8.1f} agendamentos/s  erros={errors}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Tempo de inicialização: importação da aplicação e tempo até a primeira requisição
+
+Cada rodada usa um processo Python novo (como um worker recém-criado) sobre um
+banco SQLite temporário já migrado. Mede:
+  - importação de src.main, via `python -X importtime`;
+  - tempo até a primeira resposta de GET /api/services, contando importação,
+    create_app('production') e a própria requisição.
+
+Também falha se módulos pesados que devem ser carregados sob demanda (httpx)
+forem importados durante a inicialização.
+
+Uso (a partir de agendai-backend):
+    python benchmarks/startup.py --runs 5 --max-import-ms 1500 --max-first-request-ms 3000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que não devem ser importados só para iniciar a aplicação
+LAZY_MODULES = ('httpx',)
+
+# Executado em um processo novo; imprime os tempos em JSON
+FIRST_REQUEST_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from src.main import create_app
+imported = time.perf_counter()
+app = create_app('production')
+created = time.perf_counter()
+response = app.test_client().get('/api/services')
+finished = time.perf_counter()
+print(json.dumps({
+    'status': response.status_code,
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (finished - created) * 1000,
+    'total_ms': (finished - started) * 1000,
+    'loaded': [name for name in %r if name in sys.modules]
+}))
+""" % (LAZY_MODULES,)
+
+def import_times(env):
+    """Tempo cumulativo de importação (ms) por módulo, segundo -X importtime"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import src.main'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+def first_request(env):
+    result = subprocess.run(
+        [sys.executable, '-c', FIRST_REQUEST_SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=None,
+                        help='falhar se a mediana da importação de src.main passar deste valor')
+    parser.add_argument('--max-first-request-ms', type=float, default=None,
+                        help='falhar se a mediana do tempo até a primeira resposta passar deste valor')
+    parser.add_argument('--top', type=int, default=10, help='módulos mais lentos a listar')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            AGENDAI_ENV='production',
+            AGENDAI_RUN_MIGRATIONS='0',
+            AGENDAI_OUTBOX_WORKER='0',
+            DATABASE_URL=f"sqlite:///{os.path.join(directory, 'startup.db')}"
+        )
+        # Esquema criado uma vez, como no deploy; a inicialização medida não migra
+        subprocess.run(
+            [sys.executable, '-m', 'flask', '--app', 'wsgi', 'db-upgrade'],
+            cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL
+        )
+        
+        imports = [import_times(env) for _ in range(args.runs)]
+        requests = [first_request(env) for _ in range(args.runs)]
+    
+    import_ms = statistics.median(run['src.main'] for run in imports)
+    print(f'Importação de src.main (mediana de {args.runs}): {import_ms:.1f} ms')
+    slowest = sorted(imports[-1].items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for name, ms in slowest:
+        print(f'  {ms:8.1f} ms  {name}')
+    
+    for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'total_ms'):
+        print(f'{key:>18}: {statistics.median(run[key] for run in requests):8.1f} ms')
+    total_ms = statistics.median(run['total_ms'] for run in requests)
+    
+    failures = []
+    if any(run['status'] != 200 for run in requests):
+        failures.append('primeira requisição não retornou 200')
+    loaded = sorted({name for run in requests for name in run['loaded']})
+    if loaded:
+        failures.append(f"módulos carregados na inicialização: {', '.join(loaded)}")
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failures.append(f'importação {import_ms:.1f} ms > {args.max_import_ms} ms')
+    if args.max_first_request_ms is not None and total_ms > args.max_first_request_ms:
+        failures.append(f'primeira requisição {total_ms:.1f} ms > {args.max_first_request_ms} ms')
+    
+    for failure in failures:
+        print(f'FALHA: {failure}')
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""Suíte de desempenho dos endpoints de agendamentos e serviços
+
+Popula um banco SQLite com dados sintéticos (benchmarks/synthetic.py) e mede,
+pelo test client do Flask, a listagem, o calendário (com e sem cache), os
+horários disponíveis, a criação e a atualização de agendamentos. Cada cenário
+registra mínimo, mediana, p95 e média em ms e a quantidade de consultas SQL
+por requisição.
+
+O resultado pode ser gravado em JSON (--output) e comparado depois:
+  --baseline anterior.json --max-regression 0.25
+      falha se a mediana de algum cenário piorar mais de 25%;
+  --thresholds limites.json
+      falha se a mediana passar do limite em ms, ex.: {"bookings.list": 50}.
+
+Uso (a partir de agendai-backend):
+    python benchmarks/suite.py --bookings 1000000 --years 5 --db /tmp/agendai-bench.db --output resultado.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from synthetic import build_app, data_period, seed_database
+from sqlalchemy import func
+from src.models.agendai import db, Booking
+from src.utils.calendar_cache import invalidate_calendar
+from src.utils.metrics import get_metrics
+
+# Dias após o fim dos dados sintéticos usados pelos cenários de escrita (sempre livres)
+WRITE_OFFSET_DAYS = 30
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def _slot(index, duration):
+    minutes = 8 * 60 + index * duration
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+class Runner:
+    """Executa os cenários e acumula os resultados"""
+    
+    def __init__(self, app, iterations, warmup):
+        self.app = app
+        self.client = app.test_client()
+        self.iterations = iterations
+        self.warmup = warmup
+        self.results = {}
+    
+    def _queries(self):
+        metrics = get_metrics(self.app)
+        return metrics.sql_queries if metrics is not None else 0
+    
+    def measure(self, name, request, expected_status=200, setup=None, iterations=None, warmup=None):
+        """Medir ``request(i)``; ``setup(i)`` roda antes de cada chamada, fora do tempo"""
+        iterations = iterations or self.iterations
+        warmup = self.warmup if warmup is None else warmup
+        for index in range(warmup):
+            if setup:
+                setup(index)
+            request(index)
+        
+        timings = []
+        failures = 0
+        queries = 0
+        for index in range(warmup, warmup + iterations):
+            if setup:
+                setup(index)
+            before = self._queries()
+            started = time.perf_counter()
+            response = request(index)
+            timings.append((time.perf_counter() - started) * 1000)
+            queries += self._queries() - before
+            if response.status_code != expected_status:
+                failures += 1
+        
+        self.results[name] = {
+            'iterations': iterations,
+            'min_ms': round(min(timings), 3),
+            'median_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(_percentile(timings, 0.95), 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries_per_request': round(queries / iterations, 2),
+            'failures': failures
+        }
+        result = self.results[name]
+        print(f"{name:>32}: mediana {result['median_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+              f"SQL/req {result['queries_per_request']:5.1f}  falhas={failures}")
+
+def run_scenarios(runner, service_ids, years, seed):
+    client = runner.client
+    rng = random.Random(seed)
+    first, last = data_period(years)
+    today = date.today()
+    days = (last - first).days
+    
+    def random_day():
+        return first + timedelta(days=rng.randrange(days + 1))
+    
+    runner.measure('services.list', lambda index: client.get('/api/services'))
+    runner.measure('bookings.list', lambda index: client.get('/api/bookings?limit=100'))
+    runner.measure('bookings.list_month', lambda index: client.get(
+        f'/api/bookings?start_date={today.replace(day=1).isoformat()}&end_date={today.isoformat()}&limit=100'
+    ))
+    
+    months = [(day.month, day.year) for day in (random_day() for _ in range(runner.iterations + runner.warmup))]
+    runner.measure('bookings.calendar', lambda index: client.get(
+        f'/api/bookings/calendar/{today.month}/{today.year}'
+    ))
+    
+    def drop_calendar(index):
+        with runner.app.app_context():
+            invalidate_calendar()
+    runner.measure('bookings.calendar_cold', lambda index: client.get(
+        '/api/bookings/calendar/{}/{}'.format(*months[index])
+    ), setup=drop_calendar)
+    runner.measure('bookings.calendar_counts_cold', lambda index: client.get(
+        '/api/bookings/calendar/{}/{}?view=counts'.format(*months[index])
+    ), setup=drop_calendar)
+    
+    runner.measure('bookings.available_times', lambda index: client.get(
+        f'/api/bookings/available-times/{random_day().isoformat()}/{rng.choice(service_ids)}'
+    ))
+    
+    def available_range(index):
+        start = random_day()
+        ids = ','.join(str(service_id) for service_id in rng.sample(service_ids, min(3, len(service_ids))))
+        return client.get(
+            f'/api/bookings/available-times?start_date={start.isoformat()}'
+            f'&end_date={(start + timedelta(days=6)).isoformat()}&service_ids={ids}'
+        )
+    runner.measure('bookings.available_times_week', available_range)
+    
+    # Escritas em dias livres após o último agendamento (inclusive de execuções
+    # anteriores com --db), sem conflitos entre si: cada dia recebe `per_day`
+    # criações na primeira metade do expediente e as atualizações as movem para a segunda
+    with runner.app.app_context():
+        latest = db.session.query(func.max(Booking.appointment_date)).scalar() or last
+    write_start = max(latest, last) + timedelta(days=WRITE_OFFSET_DAYS)
+    service = min(client.get('/api/services').get_json()['data'], key=lambda item: item['duration_minutes'])
+    duration = service['duration_minutes']
+    per_day = (10 * 60 // duration) // 2
+    created = {}
+    
+    def create(index):
+        day = write_start + timedelta(days=index // per_day)
+        response = client.post('/api/bookings', json={
+            'service_id': service['id'],
+            'client_name': f'Benchmark {index}',
+            'client_contact': '11999999999',
+            'appointment_date': day.isoformat(),
+            'appointment_time': _slot(index % per_day, duration)
+        })
+        if response.status_code == 201:
+            created[index] = response.get_json()['data']['id']
+        return response
+    runner.measure('bookings.create', create, expected_status=201)
+    
+    def update(index):
+        # Remarcar no mesmo dia, para um horário da segunda metade (sempre livre)
+        return client.put(f'/api/bookings/{created.get(index, 0)}', json={
+            'appointment_time': _slot(per_day + index % per_day, duration),
+            'client_name': f'Benchmark {index} (remarcado)'
+        })
+    runner.measure('bookings.update', update)
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline=None, max_regression=None, thresholds=None):
+    """Lista de falhas em relação ao baseline e aos limites absolutos"""
+    failures = []
+    for name, result in results.items():
+        if result['failures']:
+            failures.append(f"{name}: {result['failures']} resposta(s) com status inesperado")
+    if baseline and max_regression is not None:
+        for name, previous in baseline.get('results', {}).items():
+            current = results.get(name)
+            if current is None or not previous['median_ms']:
+                continue
+            ratio = current['median_ms'] / previous['median_ms']
+            if ratio > 1 + max_regression:
+                failures.append(
+                    f"{name}: mediana {current['median_ms']:.2f} ms, {ratio - 1:+.0%} em relação ao baseline "
+                    f"({previous['median_ms']:.2f} ms)"
+                )
+    for name, limit in (thresholds or {}).items():
+        current = results.get(name)
+        if current is not None and current['median_ms'] > limit:
+            failures.append(f"{name}: mediana {current['median_ms']:.2f} ms > {limit} ms")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--services', type=int, default=50)
+    parser.add_argument('--bookings', type=int, default=1000000)
+    parser.add_argument('--years', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50, help='repetições medidas por cenário')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--db', help='arquivo SQLite reaproveitado entre execuções (padrão: temporário)')
+    parser.add_argument('--output', help='gravar o resultado em JSON neste arquivo')
+    parser.add_argument('--baseline', help='resultado JSON anterior para comparação')
+    parser.add_argument('--max-regression', type=float, default=None,
+                        help='piora máxima da mediana em relação ao baseline (0.25 = 25%%)')
+    parser.add_argument('--thresholds', help='JSON {cenário: mediana máxima em ms}')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.abspath(args.db) if args.db else os.path.join(directory, 'bench.db')
+        if args.db and os.path.exists(path):
+            print(f'Reaproveitando {path} (dados completados até --bookings se necessário)')
+        app = build_app(path)
+        service_ids = seed_database(app, args.services, args.bookings, args.years, args.seed)
+        
+        runner = Runner(app, args.iterations, args.warmup)
+        run_scenarios(runner, service_ids, args.years, args.seed)
+        with app.app_context():
+            db.engine.dispose()
+    
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'services': args.services,
+            'bookings': args.bookings,
+            'years': args.years,
+            'seed': args.seed,
+            'iterations': args.iterations
+        },
+        'results': runner.results
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f'Resultado gravado em {args.output}')
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+    thresholds = None
+    if args.thresholds:
+        with open(args.thresholds) as source:
+            thresholds = json.load(source)
+    
+    failures = compare(runner.results, baseline, args.max_regression, thresholds)
+    for failure in failures:
+        print(f'FALHA: {failure}')
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Gerador de dados sintéticos de uma clínica (serviços e agendamentos)
+
+Cria (ou completa) um banco SQLite com o esquema atual e insere os dados em
+lotes, numa única transação. Os agendamentos são distribuídos ao acaso pelo
+período, no expediente padrão; com muitos agendamentos por dia há
+sobreposições, o que não impede as consultas medidas.
+
+Uso (a partir de agendai-backend):
+    python benchmarks/synthetic.py --db /tmp/agendai-bench.db --services 50 --bookings 1000000 --years 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from src.main import create_app
+from src.models.agendai import db, Booking, Service
+from src.utils.occupancy import rebuild_all
+
+# Agendamentos inseridos por lote
+CHUNK_SIZE = 20000
+# Proporção de status dos agendamentos gerados
+CANCELLED_RATE = 0.1
+# Dias após hoje cobertos pelos dados (o restante do período fica no passado)
+FUTURE_DAYS = 180
+DURATIONS = (15, 30, 45, 60, 90, 120)
+
+def build_app(path):
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'RUN_MIGRATIONS_ON_START': True,
+        'START_OUTBOX_WORKER': False,
+        # Os inserts em lote da carga passariam do limite do log de consultas lentas
+        'SLOW_QUERY_MS': 60000
+    })
+
+def data_period(years, today=None):
+    """Primeiro e último dia cobertos pelos dados sintéticos"""
+    today = today or date.today()
+    last = today + timedelta(days=FUTURE_DAYS)
+    return last - timedelta(days=int(years * 365)), last
+
+def generate_bookings(service_ids, count, years, seed=42, today=None):
+    """Gerar os agendamentos em lotes de dicts prontos para o insert"""
+    rng = random.Random(seed)
+    first, last = data_period(years, today)
+    today = today or date.today()
+    days = (last - first).days + 1
+    created_at = datetime.utcnow()
+    slots = [dt_time(minutes // 60, minutes % 60) for minutes in range(8 * 60, 18 * 60, 30)]
+    chunk = []
+    for index in range(count):
+        day = first + timedelta(days=rng.randrange(days))
+        if rng.random() < CANCELLED_RATE:
+            status = 'cancelled'
+        else:
+            status = 'completed' if day < today else 'scheduled'
+        chunk.append({
+            'service_id': rng.choice(service_ids),
+            'client_name': f'Cliente {index}',
+            'client_contact': f'11{rng.randrange(10 ** 8, 10 ** 9)}',
+            'appointment_date': day,
+            'appointment_time': rng.choice(slots),
+            'status': status,
+            'created_at': created_at,
+            'updated_at': created_at
+        })
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def seed_database(app, services=50, bookings=1000000, years=5, seed=42, log=print):
+    """Inserir serviços e agendamentos sintéticos; retorna os ids dos serviços"""
+    rng = random.Random(seed)
+    with app.app_context():
+        service_ids = [service_id for (service_id,) in db.session.query(Service.id)]
+        if not service_ids:
+            db.session.execute(Service.__table__.insert(), [{
+                'name': f'Serviço {index + 1}',
+                'duration_minutes': rng.choice(DURATIONS),
+                'price': round(rng.uniform(50, 500), 2),
+                'description': 'Serviço sintético',
+                'created_at': datetime.utcnow(),
+                'updated_at': datetime.utcnow()
+            } for index in range(services)])
+            service_ids = [service_id for (service_id,) in db.session.query(Service.id)]
+        
+        existing = db.session.query(Booking.id).count()
+        started = time.perf_counter()
+        inserted = 0
+        for chunk in generate_bookings(service_ids, max(bookings - existing, 0), years, seed):
+            db.session.execute(Booking.__table__.insert(), chunk)
+            inserted += len(chunk)
+            if inserted % (CHUNK_SIZE * 10) == 0:
+                log(f'  {inserted} agendamentos inseridos...')
+        if inserted:
+            # Os inserts diretos não passam pelas rotas: regenerar a ocupação por dia
+            rebuild_all()
+        db.session.commit()
+        if inserted:
+            # Estatísticas do planejador de consultas com a tabela já cheia
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+            log(f'{inserted} agendamentos inseridos em {time.perf_counter() - started:.1f} s')
+        return service_ids
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True, help='arquivo SQLite (criado se não existir)')
+    parser.add_argument('--services', type=int, default=50)
+    parser.add_argument('--bookings', type=int, default=1000000)
+    parser.add_argument('--years', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    app = build_app(os.path.abspath(args.db))
+    seed_database(app, args.services, args.bookings, args.years, args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Configuração do gunicorn para produção
+
+    flask --app wsgi db-upgrade
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Em produção as migrações não rodam na inicialização (RUN_MIGRATIONS_ON_START
+desligado): o esquema é atualizado pelo comando db-upgrade antes de subir o
+servidor.
+
+Os valores podem ser ajustados por variáveis de ambiente (PORT, WEB_CONCURRENCY,
+WEB_THREADS, WEB_TIMEOUT).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Threads por worker: as rotas passam boa parte do tempo esperando banco e rede
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 4))
+# Carregar a aplicação uma vez no processo mestre; os workers herdam as importações.
+# Não aplica migrações: só com AGENDAI_RUN_MIGRATIONS=1 elas rodariam aqui, uma vez no mestre
+preload_app = True
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+# Reciclar workers periodicamente para limitar crescimento de memória
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = '-'
+
+# Com preload a aplicação é criada no mestre, que não deve rodar a fila de
+# sincronização: threads não sobrevivem ao fork. Cada worker inicia a sua.
+_start_outbox_worker = os.environ.get('AGENDAI_OUTBOX_WORKER', '1').lower() in ('1', 'true', 'yes', 'on')
+os.environ['AGENDAI_OUTBOX_WORKER'] = '0'
+
+def post_fork(server, worker):
+    from src.models.agendai import db
+    from src.utils.outbox import start_outbox_worker
+    
+    app = worker.app.wsgi()
+    with app.app_context():
+        # Conexões abertas no mestre não podem ser compartilhadas entre processos
+        db.engine.dispose(close=False)
+    if _start_outbox_worker:
+        start_outbox_worker(app)
+
+def worker_exit(server, worker):
+    from src.utils.outbox import stop_outbox_worker
+    
+    stop_outbox_worker(worker.app.wsgi())
@@ -0,0 +1,39 @@
+from src.migrations import upgrade
+from src.models.agendai import db
+from src.utils.occupancy import rebuild_all
+from src.utils.outbox import outbox_stats, process_outbox
+from src.utils.static_assets import precompress
+
+def register_commands(app):
+    """Registrar os comandos `flask ...` da aplicação"""
+    
+    @app.cli.command('db-upgrade')
+    def db_upgrade_command():
+        """Aplicar as migrações pendentes do banco de dados"""
+        applied = upgrade()
+        print(f"Migrações aplicadas: {', '.join(applied)}" if applied else 'Banco de dados já está atualizado')
+    
+    @app.cli.command('outbox-flush')
+    def outbox_flush_command():
+        """Enviar ao Supabase todos os eventos pendentes da fila"""
+        total = 0
+        while True:
+            sent = process_outbox()
+            total += sent
+            if sent == 0:
+                break
+        stats = outbox_stats()
+        print(f'{total} evento(s) sincronizado(s); pendentes: {stats["depth"]}; abandonados: {stats["dead"]}')
+    
+    @app.cli.command('occupancy-rebuild')
+    def occupancy_rebuild_command():
+        """Regenerar a ocupação por dia a partir dos agendamentos e das séries"""
+        days = rebuild_all()
+        db.session.commit()
+        print(f'Ocupação regenerada: {days} dia(s) com agendamentos')
+    
+    @app.cli.command('static-compress')
+    def static_compress_command():
+        """Gerar as versões .gz/.br dos arquivos do frontend (após o build)"""
+        written = precompress(app.static_folder)
+        print(f'{written} arquivo(s) comprimido(s) em {app.static_folder}')
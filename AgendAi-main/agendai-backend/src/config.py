@@ -0,0 +1,65 @@
+import os
+
+def _env_flag(name, default):
+    return os.environ.get(name, '1' if default else '0').lower() in ('1', 'true', 'yes', 'on')
+
+class Config:
+    """Configuração base, lida do ambiente na importação"""
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'agendai_secret_key_2024')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    # Delegar o envio de arquivos estáticos ao proxy (nginx/Apache) via X-Sendfile
+    USE_X_SENDFILE = _env_flag('USE_X_SENDFILE', False)
+    DEBUG = False
+    TESTING = False
+    # Aplicar migrações pendentes ao criar a aplicação. Desligado por padrão: em
+    # produção o esquema é atualizado com `flask --app wsgi db-upgrade` no deploy
+    RUN_MIGRATIONS_ON_START = _env_flag('AGENDAI_RUN_MIGRATIONS', False)
+    # Thread da fila de sincronização com o Supabase neste processo
+    START_OUTBOX_WORKER = _env_flag('AGENDAI_OUTBOX_WORKER', True)
+    # Versões do avatar geradas em segundo plano (True: na própria requisição)
+    AVATAR_PROCESS_SYNC = False
+    # Latência por endpoint e contagem de SQL expostas em /api/metrics (formato Prometheus)
+    METRICS_ENABLED = _env_flag('AGENDAI_METRICS', True)
+    # Se definido, /api/metrics exige o cabeçalho Authorization: Bearer <token>
+    METRICS_TOKEN = os.environ.get('AGENDAI_METRICS_TOKEN')
+    # Consultas acima deste tempo são registradas no log com os parâmetros
+    SLOW_QUERY_MS = int(os.environ.get('AGENDAI_SLOW_QUERY_MS', 200))
+    # Profiling sob demanda: ativo só com um segredo (cabeçalho X-Profile)
+    PROFILE_SECRET = os.environ.get('AGENDAI_PROFILE_SECRET')
+    # Pasta dos perfis (.pstats) e quantidade mantida; padrão: <tmp>/agendai-profiles
+    PROFILE_DIR = os.environ.get('AGENDAI_PROFILE_DIR')
+    PROFILE_MAX_FILES = int(os.environ.get('AGENDAI_PROFILE_MAX_FILES', 20))
+    # Servidor de desenvolvimento (python src/main.py)
+    HOST = os.environ.get('HOST', '0.0.0.0')
+    PORT = int(os.environ.get('PORT', 5000))
+
+class DevelopmentConfig(Config):
+    DEBUG = _env_flag('FLASK_DEBUG', True)
+    # Conveniência local: `python src/main.py` já cria/atualiza o banco
+    RUN_MIGRATIONS_ON_START = _env_flag('AGENDAI_RUN_MIGRATIONS', True)
+
+class ProductionConfig(Config):
+    pass
+
+class TestingConfig(Config):
+    TESTING = True
+    # Banco em memória e isolado: nunca o arquivo de src/database
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    RUN_MIGRATIONS_ON_START = True
+    START_OUTBOX_WORKER = False
+    # Gerar as versões do avatar na própria requisição
+    AVATAR_PROCESS_SYNC = True
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig
+}
+
+def get_config(name=None):
+    """Classe de configuração pelo nome ou pela variável AGENDAI_ENV"""
+    name = name or os.environ.get('AGENDAI_ENV', 'development')
+    if name not in CONFIGS:
+        raise ValueError(f'Configuração desconhecida: {name}')
+    return CONFIGS[name]
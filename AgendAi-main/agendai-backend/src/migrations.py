@@ -0,0 +1,101 @@
+from datetime import datetime
+from sqlalchemy import inspect, text
+from src.models.agendai import db, Profile, Service, Booking, BookingDayLock, BookingSeries, DayOccupancy, OutboxEvent, SeriesOverride
+from src.utils.occupancy import rebuild_all
+
+# Cada migração recebe uma conexão já dentro de uma transação.
+# Novas migrações devem ser adicionadas ao final de MIGRATIONS com a próxima versão.
+
+def _initial_schema(conn):
+    """Tabelas originais (perfil, serviços e agendamentos)"""
+    for model in (Profile, Service, Booking):
+        model.__table__.create(conn, checkfirst=True)
+
+def _bookings_indexes(conn):
+    """Índices compostos das consultas de agendamentos"""
+    names = ('ix_bookings_date_status_time', 'ix_bookings_date_time_id', 'ix_bookings_service_id')
+    for index in Booking.__table__.indexes:
+        if index.name in names:
+            index.create(conn, checkfirst=True)
+    # Atualizar as estatísticas usadas pelo planejador de consultas
+    conn.execute(text('ANALYZE'))
+
+def _booking_day_locks(conn):
+    """Tabela de travas por dia usada na verificação atômica de conflitos"""
+    BookingDayLock.__table__.create(conn, checkfirst=True)
+
+def _sync_outbox(conn):
+    """Fila de sincronização com a tabela agendamentos do Supabase"""
+    OutboxEvent.__table__.create(conn, checkfirst=True)
+
+def _profile_avatar_variants(conn):
+    """Coluna com as versões redimensionadas do avatar"""
+    columns = {column['name'] for column in inspect(conn).get_columns('profiles')}
+    if 'avatar_variants' not in columns:
+        conn.execute(text('ALTER TABLE profiles ADD COLUMN avatar_variants TEXT'))
+
+def _profile_business_hours(conn):
+    """Coluna com o expediente configurável da clínica"""
+    columns = {column['name'] for column in inspect(conn).get_columns('profiles')}
+    if 'business_hours' not in columns:
+        conn.execute(text('ALTER TABLE profiles ADD COLUMN business_hours TEXT'))
+
+def _booking_series(conn):
+    """Agendamentos recorrentes e exceções de ocorrências"""
+    for model in (BookingSeries, SeriesOverride):
+        model.__table__.create(conn, checkfirst=True)
+
+def _booking_day_occupancy(conn):
+    """Ocupação materializada por dia, preenchida a partir dos dados existentes"""
+    DayOccupancy.__table__.create(conn, checkfirst=True)
+    rebuild_all(connection=conn)
+
+def _sync_outbox_status(conn):
+    """Situação dos eventos da fila, para separar os abandonados (dead letter)"""
+    columns = {column['name'] for column in inspect(conn).get_columns('sync_outbox')}
+    if 'status' not in columns:
+        conn.execute(text("ALTER TABLE sync_outbox ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'pending'"))
+
+MIGRATIONS = [
+    (1, 'initial_schema', _initial_schema),
+    (2, 'bookings_indexes', _bookings_indexes),
+    (3, 'booking_day_locks', _booking_day_locks),
+    (4, 'sync_outbox', _sync_outbox),
+    (5, 'profile_avatar_variants', _profile_avatar_variants),
+    (6, 'profile_business_hours', _profile_business_hours),
+    (7, 'booking_series', _booking_series),
+    (8, 'booking_day_occupancy', _booking_day_occupancy),
+    (9, 'sync_outbox_status', _sync_outbox_status),
+]
+
+def _ensure_migrations_table(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'version INTEGER NOT NULL PRIMARY KEY, '
+        'name VARCHAR(100) NOT NULL, '
+        'applied_at TIMESTAMP NOT NULL)'
+    ))
+
+def applied_versions(conn):
+    """Versões já aplicadas no banco"""
+    _ensure_migrations_table(conn)
+    return {row[0] for row in conn.execute(text('SELECT version FROM schema_migrations'))}
+
+def upgrade():
+    """Aplicar as migrações pendentes; retorna os nomes aplicados
+    
+    Deve ser chamada dentro de um contexto de aplicação.
+    """
+    applied = []
+    with db.engine.begin() as conn:
+        done = applied_versions(conn)
+        for version, name, migrate in MIGRATIONS:
+            if version in done:
+                continue
+            migrate(conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)'),
+                {'version': version, 'name': name, 'applied_at': datetime.utcnow()}
+            )
+            applied.append(name)
+    return applied
@@ -1,3 +1,4 @@
+import json
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 
@@ -12,6 +13,10 @@ class Profile(db.Model):
     email = db.Column(db.String(120), nullable=False)
     phone = db.Column(db.String(20), nullable=False)
     avatar_url = db.Column(db.String(255), nullable=True)
+    # JSON {tamanho: {formato: url}} das versões redimensionadas do avatar
+    avatar_variants = db.Column(db.Text, nullable=True)
+    # JSON do expediente (dias da semana, intervalos, dias fechados e intervalo entre horários)
+    business_hours = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -23,6 +28,8 @@ class Profile(db.Model):
             'email': self.email,
             'phone': self.phone,
             'avatar_url': self.avatar_url,
+            'avatar_variants': json.loads(self.avatar_variants) if self.avatar_variants else None,
+            'business_hours': json.loads(self.business_hours) if self.business_hours else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -40,6 +47,7 @@ class Service(db.Model):
     
     # Relacionamento com agendamentos
     bookings = db.relationship('Booking', backref='service', lazy=True, cascade='all, delete-orphan')
+    series = db.relationship('BookingSeries', backref='service', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -54,6 +62,12 @@ class Service(db.Model):
 
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    # Índices alinhados às consultas de routes/bookings.py (criados pela migração 2)
+    __table_args__ = (
+        db.Index('ix_bookings_date_status_time', 'appointment_date', 'status', 'appointment_time'),
+        db.Index('ix_bookings_date_time_id', 'appointment_date', 'appointment_time', 'id'),
+        db.Index('ix_bookings_service_id', 'service_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
@@ -65,11 +79,14 @@ class Booking(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
+    def to_dict(self, service_dict=None, include_service=True):
+        # service_dict permite reaproveitar o serviço já serializado em listas
+        if include_service and service_dict is None and self.service:
+            service_dict = self.service.to_dict()
         return {
             'id': self.id,
             'service_id': self.service_id,
-            'service': self.service.to_dict() if self.service else None,
+            'service': service_dict if include_service else None,
             'client_name': self.client_name,
             'client_contact': self.client_contact,
             'appointment_date': self.appointment_date.isoformat() if self.appointment_date else None,
@@ -79,3 +96,111 @@ class Booking(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class BookingSeries(db.Model):
+    __tablename__ = 'booking_series'
+    __table_args__ = (
+        db.Index('ix_booking_series_status_dates', 'status', 'start_date', 'last_date'),
+    )
+    
+    # Agendamento recorrente (semanal ou quinzenal); as ocorrências não são gravadas,
+    # são expandidas sob demanda para o período consultado (src/utils/recurrence.py)
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
+    client_name = db.Column(db.String(100), nullable=False)
+    client_contact = db.Column(db.String(100), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    appointment_time = db.Column(db.Time, nullable=False)
+    interval_weeks = db.Column(db.Integer, nullable=False, default=1)  # 1 = semanal, 2 = quinzenal
+    until = db.Column(db.Date, nullable=True)
+    count = db.Column(db.Integer, nullable=True)
+    last_date = db.Column(db.Date, nullable=False)  # data da última ocorrência (de until ou count)
+    status = db.Column(db.String(20), nullable=False, default='active')  # active, cancelled
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    overrides = db.relationship('SeriesOverride', backref='series', lazy=True, cascade='all, delete-orphan')
+    
+    @property
+    def rrule(self):
+        rule = f'FREQ=WEEKLY;INTERVAL={self.interval_weeks}'
+        if self.count:
+            return f'{rule};COUNT={self.count}'
+        return f"{rule};UNTIL={self.last_date.strftime('%Y%m%d')}"
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'service_id': self.service_id,
+            'client_name': self.client_name,
+            'client_contact': self.client_contact,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'appointment_time': self.appointment_time.strftime('%H:%M') if self.appointment_time else None,
+            'interval_weeks': self.interval_weeks,
+            'until': self.until.isoformat() if self.until else None,
+            'count': self.count,
+            'last_date': self.last_date.isoformat() if self.last_date else None,
+            'rrule': self.rrule,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class SeriesOverride(db.Model):
+    __tablename__ = 'booking_series_overrides'
+    __table_args__ = (
+        db.UniqueConstraint('series_id', 'original_date', name='uq_series_overrides_series_date'),
+        db.Index('ix_series_overrides_original_date', 'original_date'),
+        db.Index('ix_series_overrides_new_date', 'new_date'),
+    )
+    
+    # Exceção de uma ocorrência: cancelada ou remarcada para outra data/horário
+    id = db.Column(db.Integer, primary_key=True)
+    series_id = db.Column(db.Integer, db.ForeignKey('booking_series.id'), nullable=False)
+    original_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # cancelled, rescheduled
+    new_date = db.Column(db.Date, nullable=True)
+    new_time = db.Column(db.Time, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'series_id': self.series_id,
+            'original_date': self.original_date.isoformat() if self.original_date else None,
+            'status': self.status,
+            'new_date': self.new_date.isoformat() if self.new_date else None,
+            'new_time': self.new_time.strftime('%H:%M') if self.new_time else None
+        }
+
+class BookingDayLock(db.Model):
+    __tablename__ = 'booking_day_locks'
+    
+    # Uma linha por dia com agendamentos; escrever nela serializa as escritas do dia
+    appointment_date = db.Column(db.Date, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+class DayOccupancy(db.Model):
+    __tablename__ = 'booking_day_occupancy'
+    
+    # Minutos ocupados do dia (1 bit por minuto, ver src/utils/occupancy.py),
+    # mantidos a cada escrita de agendamentos e séries; dias sem linha estão livres
+    appointment_date = db.Column(db.Date, primary_key=True)
+    bitmap = db.Column(db.LargeBinary, nullable=False)
+
+class OutboxEvent(db.Model):
+    __tablename__ = 'sync_outbox'
+    __table_args__ = (
+        db.Index('ix_sync_outbox_next_attempt_at', 'next_attempt_at'),
+    )
+    
+    # Alterações pendentes de envio ao Supabase (write-behind)
+    id = db.Column(db.Integer, primary_key=True)
+    target_table = db.Column(db.String(50), nullable=False)
+    idempotency_key = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON do registro a enviar
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # 'pending' ou 'dead' (abandonado após OUTBOX_MAX_ATTEMPTS falhas, fica para inspeção)
+    status = db.Column(db.String(20), nullable=False, default='pending', server_default='pending')
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
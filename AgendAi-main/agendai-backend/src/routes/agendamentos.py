@@ -0,0 +1,94 @@
+import logging
+import re
+import uuid
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from src.models.agendai import db
+from src.utils.outbox import AGENDAMENTOS_TABLE, enqueue, outbox_stats
+from src.utils.supabase_rest import SupabaseError, get_supabase
+
+agendamentos_bp = Blueprint('agendamentos', __name__)
+logger = logging.getLogger(__name__)
+
+# Paginação da listagem de agendamentos do Supabase
+AGENDAMENTOS_PAGE_SIZE = 100
+AGENDAMENTOS_MAX_PAGE_SIZE = 1000
+COLUMN_NAME = re.compile(r'^[a-z_][a-z0-9_]*$')
+EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Teste de leitura da tabela 'servicos'
+@agendamentos_bp.route('/teste-supabase')
+def teste_supabase():
+    dados = get_supabase().select("servicos", limit=AGENDAMENTOS_PAGE_SIZE)
+    return {'dados': dados}
+
+def _validar_agendamento(dados):
+    """Mensagem de erro do corpo de /agendar, ou None se for válido
+    
+    O envio ao Supabase é assíncrono: o que ele rejeitaria precisa ser recusado
+    aqui, antes de entrar na fila.
+    """
+    if not isinstance(dados, dict):
+        return "Corpo deve ser um objeto JSON"
+    for campo in ("nome", "email", "servico", "data"):
+        if not isinstance(dados.get(campo), str) or not dados[campo].strip():
+            return f"Campo {campo} é obrigatório"
+    if not EMAIL.match(dados["email"]):
+        return "email inválido"
+    try:
+        datetime.fromisoformat(dados["data"])
+    except ValueError:
+        return "data inválida (use YYYY-MM-DDTHH:MM)"
+    return None
+
+# Criar novo agendamento (gravado localmente e enviado ao Supabase pela fila)
+@agendamentos_bp.route('/agendar', methods=['POST'])
+def agendar():
+    dados = request.get_json(silent=True)
+    erro = _validar_agendamento(dados)
+    if erro:
+        return jsonify({"erro": erro}), 400
+    # Chave de idempotência opcional enviada pelo cliente para evitar duplicatas em reenvios
+    chave = request.headers.get('Idempotency-Key') or f'agendar-{uuid.uuid4()}'
+    try:
+        enqueue(AGENDAMENTOS_TABLE, chave[:100], {
+            "nome": dados["nome"].strip(),
+            "email": dados["email"].strip(),
+            "servico": dados["servico"].strip(),
+            "data": dados["data"]
+        })
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Erro ao criar agendamento')  # aparecerá nos logs da Render
+        return jsonify({"erro": str(e)}), 500
+    
+    return jsonify({"mensagem": "Agendamento criado com sucesso"}), 201
+
+# Listar agendamentos (paginado: ?limit=&offset=&columns=nome,data)
+@agendamentos_bp.route('/agendamentos', methods=['GET'])
+def listar_agendamentos():
+    try:
+        limit = min(int(request.args.get('limit', AGENDAMENTOS_PAGE_SIZE)), AGENDAMENTOS_MAX_PAGE_SIZE)
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"erro": "limit e offset devem ser números inteiros"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"erro": "limit deve ser maior que zero e offset não pode ser negativo"}), 400
+    
+    columns = request.args.get('columns', '*')
+    if columns != '*' and not all(COLUMN_NAME.match(column) for column in columns.split(',')):
+        return jsonify({"erro": "columns deve ser uma lista de colunas separadas por vírgula"}), 400
+    
+    try:
+        dados = get_supabase().select("agendamentos", columns=columns, order="data", limit=limit, offset=offset)
+    except SupabaseError as e:
+        logger.exception('Erro ao listar agendamentos')
+        # Erros do cliente (4xx) viram 400; falhas do Supabase ou da rede, 502
+        return jsonify({"erro": str(e)}), 400 if e.status_code and 400 <= e.status_code < 500 else 502
+    return jsonify(dados)
+
+# Estado da fila de sincronização com o Supabase
+@agendamentos_bp.route('/sync/status', methods=['GET'])
+def sync_status():
+    return jsonify({'success': True, 'data': outbox_stats()}), 200
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from flask import Blueprint, request, jsonify
+from src.utils.analytics import get_month_stats, iter_months, summarize
+from src.utils.catalog import get_catalog
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# Maior período (em meses) aceito em uma consulta
+MAX_ANALYTICS_MONTHS = 24
+# Período padrão: o mês atual e os dois anteriores
+DEFAULT_ANALYTICS_MONTHS = 3
+
+def _parse_month(value):
+    parsed = datetime.strptime(value, '%Y-%m')
+    return parsed.year, parsed.month
+
+@analytics_bp.route('/analytics/occupancy', methods=['GET'])
+def get_occupancy():
+    """Ocupação, receita, cancelamentos e horários de pico (?start=AAAA-MM&end=AAAA-MM)"""
+    try:
+        today = date.today()
+        try:
+            end = _parse_month(request.args['end']) if request.args.get('end') else (today.year, today.month)
+            if request.args.get('start'):
+                start = _parse_month(request.args['start'])
+            else:
+                index = end[0] * 12 + end[1] - DEFAULT_ANALYTICS_MONTHS
+                start = (index // 12, index % 12 + 1)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Formato de mês inválido. Use AAAA-MM'
+            }), 400
+        
+        months = list(iter_months(start[0], start[1], end[0], end[1]))
+        if not months:
+            return jsonify({
+                'success': False,
+                'error': 'start deve ser anterior ou igual a end'
+            }), 400
+        if len(months) > MAX_ANALYTICS_MONTHS:
+            return jsonify({
+                'success': False,
+                'error': f'Período máximo é de {MAX_ANALYTICS_MONTHS} meses'
+            }), 400
+        
+        # Cada mês vem do cache ou de uma única consulta de colunas
+        stats = [get_month_stats(year, month) for year, month in months]
+        service_names = {service_id: service['name'] for service_id, service in get_catalog().by_id.items()}
+        data = summarize(stats, service_names)
+        data['period'] = {
+            'start': f'{start[0]:04d}-{start[1]:02d}',
+            'end': f'{end[0]:04d}-{end[1]:02d}'
+        }
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
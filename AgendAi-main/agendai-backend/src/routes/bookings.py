@@ -1,56 +1,280 @@
-from flask import Blueprint, request, jsonify
+import csv
+import heapq
+import io
+import json
+from types import SimpleNamespace
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from src.models.agendai import db, Booking, Service
+from src.utils.analytics import invalidate_analytics_months
+from src.utils.availability import (
+    available_times, is_slot_available, load_busy_intervals_for_dates,
+    lock_booking_days, minutes_to_str, service_durations, time_to_minutes
+)
+from src.utils.calendar_cache import get_month, invalidate_months
+from src.utils.catalog import get_cached_service, get_catalog
+from src.utils.occupancy import load_day_bitmaps, mark_busy, rebuild_days
+from src.utils.outbox import enqueue_booking
+from src.utils.pagination import decode_cursor, encode_cursor, paginate_bookings, parse_page_size
+from src.utils.recurrence import load_occurrences, occurrence_id, occurrence_to_dict, series_span
+from src.utils.schedule import get_schedule
+from src.utils.serializers import bookings_to_dicts, parse_fields, with_service
 from datetime import datetime, date, time, timedelta
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, insert, or_
+from sqlalchemy.exc import OperationalError
 
 bookings_bp = Blueprint('bookings', __name__)
 
+# Período máximo aceito pela consulta de disponibilidade por intervalo
+MAX_AVAILABILITY_RANGE_DAYS = 62
+# Quantidade máxima de linhas aceitas pela importação em lote
+MAX_BULK_ROWS = 5000
+# Status válidos de um agendamento
+BOOKING_STATUSES = ('scheduled', 'completed', 'cancelled')
+# Colunas da exportação e tamanho dos blocos lidos do cursor
+EXPORT_BOOKING_COLUMNS = (
+    'id', 'appointment_date', 'appointment_time', 'status', 'client_name',
+    'client_contact', 'service_id', 'created_at', 'updated_at'
+)
+EXPORT_SERVICE_COLUMNS = ('name', 'duration_minutes', 'price')
+EXPORT_CHUNK_SIZE = 1000
+
+def _filtered_bookings_query(args):
+    """Aplicar os filtros start_date, end_date e status da listagem
+    
+    Retorna (query, None) ou (None, resposta de erro).
+    """
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    status = args.get('status')
+    
+    query = Booking.query
+    
+    if start_date:
+        try:
+            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+            query = query.filter(Booking.appointment_date >= start_date_obj)
+        except ValueError:
+            return None, (jsonify({
+                'success': False,
+                'error': 'Formato de data inválido para start_date (use YYYY-MM-DD)'
+            }), 400)
+    
+    if end_date:
+        try:
+            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+            query = query.filter(Booking.appointment_date <= end_date_obj)
+        except ValueError:
+            return None, (jsonify({
+                'success': False,
+                'error': 'Formato de data inválido para end_date (use YYYY-MM-DD)'
+            }), 400)
+    
+    if status:
+        query = query.filter(Booking.status == status)
+    
+    return query, None
+
 @bookings_bp.route('/bookings', methods=['GET'])
 def get_bookings():
-    """Listar todos os agendamentos"""
+    """Listar agendamentos com paginação por cursor"""
     try:
         # Parâmetros opcionais para filtrar
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        status = request.args.get('status')
+        query, error = _filtered_bookings_query(request.args)
+        if error:
+            return error
         
-        query = Booking.query
+        # Projeção de campos (?fields=appointment_time,status)
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': f'Campo desconhecido em fields: {e}'
+            }), 400
         
-        if start_date:
-            try:
-                start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-                query = query.filter(Booking.appointment_date >= start_date_obj)
-            except ValueError:
-                return jsonify({
-                    'success': False,
-                    'error': 'Formato de data inválido para start_date (use YYYY-MM-DD)'
-                }), 400
+        try:
+            limit = parse_page_size(request.args.get('limit'))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'limit deve ser um número inteiro maior que zero'
+            }), 400
+        
+        # O serviço só é carregado quando faz parte da resposta
+        if fields is None or 'service' in fields:
+            query = with_service(query)
         
-        if end_date:
+        try:
+            bookings, next_cursor = paginate_bookings(query, request.args.get('cursor'), limit)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Cursor inválido'
+            }), 400
+        
+        response = {
+            'success': True,
+            'data': bookings_to_dicts(bookings, fields),
+            'next_cursor': next_cursor
+        }
+        # Ocorrências de séries só são expandidas para um período fechado, paginadas
+        # com o mesmo limit e um cursor próprio (primeira página ou occurrences_cursor)
+        args = request.args
+        if args.get('start_date') and args.get('end_date') and (not args.get('cursor') or args.get('occurrences_cursor')):
             try:
-                end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-                query = query.filter(Booking.appointment_date <= end_date_obj)
+                response['occurrences'], response['next_occurrences_cursor'] = _list_occurrences(args, fields, limit)
             except ValueError:
                 return jsonify({
                     'success': False,
-                    'error': 'Formato de data inválido para end_date (use YYYY-MM-DD)'
+                    'error': 'Cursor inválido'
                 }), 400
         
-        if status:
-            query = query.filter(Booking.status == status)
-        
-        bookings = query.order_by(Booking.appointment_date.desc(), Booking.appointment_time.desc()).all()
-        
+        return jsonify(response), 200
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'data': [booking.to_dict() for booking in bookings]
-        }), 200
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _list_occurrences(args, fields, limit):
+    """Página de ocorrências de séries do período da listagem, com o mesmo filtro de status
+    
+    Mesma ordem dos agendamentos (data, horário e série, do mais recente ao
+    mais antigo) e cursor no mesmo formato. Retorna (ocorrências, próximo
+    cursor ou None); lança ValueError se occurrences_cursor for inválido.
+    """
+    start_date = datetime.strptime(args['start_date'], '%Y-%m-%d').date()
+    end_date = datetime.strptime(args['end_date'], '%Y-%m-%d').date()
+    status = args.get('status')
+    after = decode_cursor(args['occurrences_cursor']) if args.get('occurrences_cursor') else None
+    occurrences = [
+        occurrence
+        for occurrence in load_occurrences(start_date, end_date, include_cancelled=status in (None, '', 'cancelled'))
+        if (not status or occurrence.status == status)
+        and (after is None or (occurrence.date, occurrence.time, occurrence.series_id) < after)
+    ]
+    occurrences.sort(key=lambda occurrence: (occurrence.date, occurrence.time, occurrence.series_id), reverse=True)
+    
+    next_cursor = None
+    if len(occurrences) > limit:
+        occurrences = occurrences[:limit]
+        last = occurrences[-1]
+        next_cursor = encode_cursor(SimpleNamespace(
+            appointment_date=last.date, appointment_time=last.time, id=last.series_id
+        ))
+    
+    services = get_catalog().by_id
+    result = []
+    for occurrence in occurrences:
+        occurrence_dict = occurrence_to_dict(occurrence, services.get(occurrence.service_id))
+        if fields is not None:
+            occurrence_dict = {field: occurrence_dict.get(field) for field in fields}
+        result.append(occurrence_dict)
+    return result, next_cursor
+
+@bookings_bp.route('/bookings/export', methods=['GET'])
+def export_bookings():
+    """Exportar agendamentos e ocorrências de séries com serviços em CSV ou NDJSON (streaming)"""
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in ('csv', 'ndjson'):
+            return jsonify({
+                'success': False,
+                'error': 'format deve ser csv ou ndjson'
+            }), 400
+        
+        # Mesmos filtros da listagem
+        query, error = _filtered_bookings_query(request.args)
+        if error:
+            return error
+        
+        # Somente as colunas exportadas, lidas do cursor em blocos (yield_per)
+        rows = query.with_entities(
+            *[getattr(Booking, column) for column in EXPORT_BOOKING_COLUMNS],
+            *[getattr(Service, column) for column in EXPORT_SERVICE_COLUMNS]
+        ).join(
+            Service, Booking.service_id == Service.id
+        ).order_by(
+            Booking.appointment_date, Booking.appointment_time, Booking.id
+        ).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        # Ocorrências de séries intercaladas por data e horário, como na listagem
+        rows = heapq.merge(rows, _export_occurrences(request.args), key=lambda row: (row[1], row[2]))
+        
+        header = list(EXPORT_BOOKING_COLUMNS) + [f'service_{column}' for column in EXPORT_SERVICE_COLUMNS]
+        generate = _export_csv if export_format == 'csv' else _export_ndjson
+        mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        
+        response = Response(stream_with_context(generate(header, rows)), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=bookings.{export_format}'
+        return response
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def _export_occurrences(args):
+    """Ocorrências de séries do período filtrado, nas colunas da exportação
+    
+    O id é o da ocorrência (ex.: s12-20261020); created_at e updated_at ficam vazios.
+    """
+    first, last = series_span()
+    if first is None:
+        return []
+    if args.get('start_date'):
+        first = max(first, datetime.strptime(args['start_date'], '%Y-%m-%d').date())
+    if args.get('end_date'):
+        last = min(last, datetime.strptime(args['end_date'], '%Y-%m-%d').date())
+    if first > last:
+        return []
+    status = args.get('status')
+    services = get_catalog().by_id
+    rows = []
+    for occurrence in load_occurrences(first, last, include_cancelled=status in (None, '', 'cancelled')):
+        if status and occurrence.status != status:
+            continue
+        service = services.get(occurrence.service_id) or {}
+        rows.append((
+            occurrence_id(occurrence.series_id, occurrence.original_date), occurrence.date, occurrence.time,
+            occurrence.status, occurrence.client_name, occurrence.client_contact, occurrence.service_id,
+            None, None, service.get('name'), occurrence.duration, occurrence.price
+        ))
+    return sorted(rows, key=lambda row: (row[1], row[2], row[0]))
+
+def _export_value(value):
+    if isinstance(value, time):
+        return value.strftime('%H:%M')
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def _export_csv(header, rows):
+    """Gerar o CSV em blocos de EXPORT_CHUNK_SIZE linhas"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_export_value(value) for value in row])
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+def _export_ndjson(header, rows):
+    """Gerar uma linha JSON por agendamento, em blocos de EXPORT_CHUNK_SIZE linhas"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(
+            {key: _export_value(value) for key, value in zip(header, row)},
+            ensure_ascii=False
+        ))
+        if len(lines) == EXPORT_CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
 @bookings_bp.route('/bookings/calendar/<int:month>/<int:year>', methods=['GET'])
 def get_calendar_bookings(month, year):
     """Buscar agendamentos do mês para o calendário"""
@@ -75,21 +299,16 @@ def get_calendar_bookings(month, year):
         else:
             end_date = date(year, month + 1, 1) - timedelta(days=1)
         
-        bookings = Booking.query.filter(
-            and_(
-                Booking.appointment_date >= start_date,
-                Booking.appointment_date <= end_date,
-                Booking.status != 'cancelled'
-            )
-        ).order_by(Booking.appointment_date, Booking.appointment_time).all()
+        # Modo compacto (?view=counts) retorna apenas a quantidade por dia
+        view = request.args.get('view', 'full')
+        if view not in ('full', 'counts'):
+            return jsonify({
+                'success': False,
+                'error': 'view deve ser full ou counts'
+            }), 400
         
-        # Agrupar por data
-        calendar_data = {}
-        for booking in bookings:
-            date_str = booking.appointment_date.isoformat()
-            if date_str not in calendar_data:
-                calendar_data[date_str] = []
-            calendar_data[date_str].append(booking.to_dict())
+        loader = _load_calendar_counts if view == 'counts' else _load_calendar_month
+        calendar_data = get_month(year, month, view, lambda: loader(start_date, end_date))
         
         return jsonify({
             'success': True,
@@ -101,6 +320,52 @@ def get_calendar_bookings(month, year):
             'error': str(e)
         }), 500
 
+def _month_bookings_filter(start_date, end_date):
+    return and_(
+        Booking.appointment_date >= start_date,
+        Booking.appointment_date <= end_date,
+        Booking.status != 'cancelled'
+    )
+
+def _load_calendar_month(start_date, end_date):
+    """Agendamentos e ocorrências de séries do período agrupados por data"""
+    bookings = with_service(Booking.query).filter(
+        _month_bookings_filter(start_date, end_date)
+    ).order_by(Booking.appointment_date, Booking.appointment_time).all()
+    
+    # Agrupar por data
+    calendar_data = {}
+    for booking, booking_dict in zip(bookings, bookings_to_dicts(bookings)):
+        date_str = booking.appointment_date.isoformat()
+        if date_str not in calendar_data:
+            calendar_data[date_str] = []
+        calendar_data[date_str].append(booking_dict)
+    
+    occurrences = load_occurrences(start_date, end_date)
+    if occurrences:
+        services = get_catalog().by_id
+        for occurrence in occurrences:
+            calendar_data.setdefault(occurrence.date.isoformat(), []).append(
+                occurrence_to_dict(occurrence, services.get(occurrence.service_id))
+            )
+        # Manter cada dia em ordem de horário após incluir as ocorrências
+        for day_bookings in calendar_data.values():
+            day_bookings.sort(key=lambda booking: booking['appointment_time'])
+    return calendar_data
+
+def _load_calendar_counts(start_date, end_date):
+    """Quantidade de agendamentos por data do período"""
+    rows = db.session.query(
+        Booking.appointment_date, func.count(Booking.id)
+    ).filter(
+        _month_bookings_filter(start_date, end_date)
+    ).group_by(Booking.appointment_date).all()
+    counts = {appointment_date.isoformat(): count for appointment_date, count in rows}
+    for occurrence in load_occurrences(start_date, end_date):
+        date_str = occurrence.date.isoformat()
+        counts[date_str] = counts.get(date_str, 0) + 1
+    return counts
+
 @bookings_bp.route('/bookings/available-times/<date_str>/<int:service_id>', methods=['GET'])
 def get_available_times(date_str, service_id):
     """Buscar horários disponíveis para uma data e serviço"""
@@ -122,58 +387,94 @@ def get_available_times(date_str, service_id):
         #     }), 400
         
         # Verificar se o serviço existe
-        service = Service.query.get(service_id)
+        service = get_cached_service(service_id)
         if not service:
             return jsonify({
                 'success': False,
                 'error': 'Serviço não encontrado'
             }), 404
         
-        # Horários de funcionamento (8h às 18h)
-        start_hour = 8
-        end_hour = 18
+        # Calcular horários livres a partir dos intervalos ocupados do dia
+        times = available_times(appointment_date, service['duration_minutes'])
         
-        # Buscar agendamentos existentes para a data
-        existing_bookings = Booking.query.filter(
-            and_(
-                Booking.appointment_date == appointment_date,
-                Booking.status != 'cancelled'
-            )
-        ).all()
-        
-        # Gerar todos os horários possíveis (intervalos de 30 minutos)
-        available_times = []
-        current_time = time(start_hour, 0)
-        end_time = time(end_hour, 0)
-        
-        while current_time < end_time:
-            # Verificar se o horário + duração do serviço não ultrapassa o horário de funcionamento
-            current_datetime = datetime.combine(appointment_date, current_time)
-            end_datetime = current_datetime + timedelta(minutes=service.duration_minutes)
-            
-            if end_datetime.time() <= end_time:
-                # Verificar se não há conflito com agendamentos existentes
-                has_conflict = False
-                for booking in existing_bookings:
-                    booking_start = datetime.combine(appointment_date, booking.appointment_time)
-                    booking_end = booking_start + timedelta(minutes=booking.service.duration_minutes)
-                    
-                    # Verificar sobreposição
-                    if (current_datetime < booking_end and end_datetime > booking_start):
-                        has_conflict = True
-                        break
-                
-                if not has_conflict:
-                    available_times.append(current_time.strftime('%H:%M'))
-            
-            # Próximo horário (intervalos de 30 minutos)
-            current_datetime = datetime.combine(appointment_date, current_time)
-            next_datetime = current_datetime + timedelta(minutes=30)
-            current_time = next_datetime.time()
+        return jsonify({
+            'success': True,
+            'data': times
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bookings_bp.route('/bookings/available-times', methods=['GET'])
+def get_available_times_range():
+    """Buscar horários disponíveis de um período para um ou mais serviços"""
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        service_ids = request.args.get('service_ids')
+        
+        if not start_date or not end_date or not service_ids:
+            return jsonify({
+                'success': False,
+                'error': 'Parâmetros start_date, end_date e service_ids são obrigatórios'
+            }), 400
+        
+        # Validar datas
+        try:
+            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Formato de data inválido (use YYYY-MM-DD)'
+            }), 400
+        
+        if end_date_obj < start_date_obj:
+            return jsonify({
+                'success': False,
+                'error': 'end_date deve ser igual ou posterior a start_date'
+            }), 400
+        
+        if (end_date_obj - start_date_obj).days >= MAX_AVAILABILITY_RANGE_DAYS:
+            return jsonify({
+                'success': False,
+                'error': f'O período não pode ultrapassar {MAX_AVAILABILITY_RANGE_DAYS} dias'
+            }), 400
+        
+        # Validar serviços (lista separada por vírgulas)
+        try:
+            ids = sorted({int(service_id) for service_id in service_ids.split(',') if service_id.strip()})
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'service_ids deve ser uma lista de números separados por vírgula'
+            }), 400
+        
+        services = [get_cached_service(service_id) for service_id in ids]
+        if not all(services):
+            return jsonify({
+                'success': False,
+                'error': 'Serviço não encontrado'
+            }), 404
+        
+        # Uma única consulta à ocupação materializada do período
+        busy_by_date = load_day_bitmaps(start_date_obj, end_date_obj)
+        schedule = get_schedule()
+        
+        availability = {}
+        for day, busy in busy_by_date.items():
+            availability[day.isoformat()] = {
+                str(service['id']): [
+                    minutes_to_str(slot) for slot in schedule.free_slots(day, busy, service['duration_minutes'])
+                ]
+                for service in services
+            }
         
         return jsonify({
             'success': True,
-            'data': available_times
+            'data': availability
         }), 200
     except Exception as e:
         return jsonify({
@@ -203,7 +504,7 @@ def create_booking():
                 }), 400
         
         # Validar serviço
-        service = Service.query.get(data['service_id'])
+        service = get_cached_service(data['service_id'])
         if not service:
             return jsonify({
                 'success': False,
@@ -235,26 +536,26 @@ def create_booking():
                 'error': 'Não é possível agendar para datas passadas'
             }), 400
         
-        # Verificar se o horário está disponível
-        current_datetime = datetime.combine(appointment_date, appointment_time)
-        end_datetime = current_datetime + timedelta(minutes=service.duration_minutes)
+        # Duração lida do banco (a do catálogo em cache pode estar atrasada), com a linha
+        # do serviço travada para leitura até o commit; antes dos dias, como em update_service
+        duration_minutes = service_durations(service['id']).get(service['id'])
+        if duration_minutes is None:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': 'Serviço não encontrado'
+            }), 404
         
-        existing_bookings = Booking.query.filter(
-            and_(
-                Booking.appointment_date == appointment_date,
-                Booking.status != 'cancelled'
-            )
-        ).all()
+        # Travar o dia para que verificação e inserção sejam atômicas
+        lock_booking_days(appointment_date)
         
-        for booking in existing_bookings:
-            booking_start = datetime.combine(appointment_date, booking.appointment_time)
-            booking_end = booking_start + timedelta(minutes=booking.service.duration_minutes)
-            
-            if (current_datetime < booking_end and end_datetime > booking_start):
-                return jsonify({
-                    'success': False,
-                    'error': 'Horário não disponível'
-                }), 400
+        # Verificar se o horário está disponível
+        if not is_slot_available(appointment_date, appointment_time, duration_minutes):
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': 'Horário não disponível'
+            }), 409
         
         # Criar agendamento
         booking = Booking(
@@ -267,13 +568,170 @@ def create_booking():
         )
         
         db.session.add(booking)
+        db.session.flush()
+        start = time_to_minutes(appointment_time)
+        mark_busy({appointment_date: [(start, start + duration_minutes)]})
+        # Sincronização com o Supabase fica na fila, na mesma transação
+        enqueue_booking(booking, service['name'])
         db.session.commit()
+        invalidate_months(booking.appointment_date)
+        invalidate_analytics_months(booking.appointment_date)
         
         return jsonify({
             'success': True,
             'message': 'Agendamento criado com sucesso',
             'data': booking.to_dict()
         }), 201
+    except OperationalError:
+        # Trava do dia não obtida dentro do busy timeout
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Agenda ocupada, tente novamente'
+        }), 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _parse_bulk_rows():
+    """Ler as linhas do corpo como array JSON ou NDJSON (uma linha por agendamento)"""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        rows = []
+        for line in request.stream:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+        return rows
+    return request.get_json(silent=True)
+
+def _validate_bulk_row(row):
+    """Validar uma linha de importação; retorna (valores, None) ou (None, erro)"""
+    if not isinstance(row, dict):
+        return None, 'Linha deve ser um objeto JSON'
+    
+    required_fields = ['service_id', 'client_name', 'client_contact', 'appointment_date', 'appointment_time']
+    for field in required_fields:
+        if field not in row or not row[field]:
+            return None, f'Campo {field} é obrigatório'
+    
+    service = get_cached_service(row['service_id'])
+    if not service:
+        return None, 'Serviço não encontrado'
+    
+    try:
+        appointment_date = datetime.strptime(row['appointment_date'], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None, 'Formato de data inválido (use YYYY-MM-DD)'
+    
+    try:
+        appointment_time = datetime.strptime(row['appointment_time'], '%H:%M').time()
+    except (TypeError, ValueError):
+        return None, 'Formato de horário inválido (use HH:MM)'
+    
+    status = row.get('status') or 'scheduled'
+    if status not in BOOKING_STATUSES:
+        return None, f"Status deve ser um de: {', '.join(BOOKING_STATUSES)}"
+    
+    return {
+        'service_id': service['id'],
+        'client_name': str(row['client_name']).strip(),
+        'client_contact': str(row['client_contact']).strip(),
+        'appointment_date': appointment_date,
+        'appointment_time': appointment_time,
+        'status': status,
+        'service_name': service['name']
+    }, None
+
+@bookings_bp.route('/bookings/bulk', methods=['POST'])
+def bulk_create_bookings():
+    """Importar agendamentos em lote (array JSON ou NDJSON)"""
+    try:
+        try:
+            rows = _parse_bulk_rows()
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Corpo inválido (use um array JSON ou NDJSON)'
+            }), 400
+        
+        if not rows or not isinstance(rows, list):
+            return jsonify({
+                'success': False,
+                'error': 'Dados não fornecidos'
+            }), 400
+        
+        if len(rows) > MAX_BULK_ROWS:
+            return jsonify({
+                'success': False,
+                'error': f'Máximo de {MAX_BULK_ROWS} agendamentos por importação'
+            }), 400
+        
+        # Validar todas as linhas antes de consultar o banco
+        results = []
+        parsed = []
+        for index, row in enumerate(rows):
+            values, error = _validate_bulk_row(row)
+            if error:
+                results.append({'row': index, 'success': False, 'error': error})
+            else:
+                results.append({'row': index, 'success': True})
+                parsed.append((index, values))
+        
+        # Durações lidas do banco, não do catálogo em cache (serviços travados antes dos dias)
+        durations = service_durations(*[values['service_id'] for _, values in parsed])
+        # Índice de intervalos por dia carregado de uma vez e alimentado pelo próprio lote
+        lock_booking_days(*[values['appointment_date'] for _, values in parsed if values['status'] != 'cancelled'])
+        busy_by_date = load_busy_intervals_for_dates(values['appointment_date'] for _, values in parsed)
+        to_insert = []
+        service_names = []
+        occupied = {}
+        for index, values in parsed:
+            service_name = values.pop('service_name')
+            if values['service_id'] not in durations:
+                results[index] = {'row': index, 'success': False, 'error': 'Serviço não encontrado'}
+                continue
+            duration_minutes = durations[values['service_id']]
+            if values['status'] != 'cancelled':
+                busy = busy_by_date[values['appointment_date']]
+                start = time_to_minutes(values['appointment_time'])
+                if busy.has_conflict(start, start + duration_minutes):
+                    results[index] = {'row': index, 'success': False, 'error': 'Horário não disponível'}
+                    continue
+                busy.add(start, start + duration_minutes)
+                occupied.setdefault(values['appointment_date'], []).append((start, start + duration_minutes))
+            to_insert.append(values)
+            service_names.append(service_name)
+        
+        if to_insert:
+            # Inserção única no estilo executemany, retornando os ids na ordem das linhas
+            booking_ids = db.session.scalars(
+                insert(Booking).returning(Booking.id, sort_by_parameter_order=True),
+                to_insert
+            ).all()
+            for booking_id, values, service_name in zip(booking_ids, to_insert, service_names):
+                enqueue_booking(SimpleNamespace(id=booking_id, **values), service_name)
+            mark_busy(occupied)
+            db.session.commit()
+            invalidate_months(*{values['appointment_date'] for values in to_insert})
+            invalidate_analytics_months(*{values['appointment_date'] for values in to_insert})
+        
+        return jsonify({
+            'success': True,
+            'message': f'{len(to_insert)} agendamento(s) importado(s)',
+            'created': len(to_insert),
+            'failed': len(rows) - len(to_insert),
+            'data': results
+        }), 200
+    except OperationalError:
+        # Trava do dia não obtida dentro do busy timeout
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Agenda ocupada, tente novamente'
+        }), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -300,13 +758,12 @@ def update_booking(booking_id):
             }), 400
         
         # Validar serviço se fornecido
-        if 'service_id' in data:
-            service = Service.query.get(data['service_id'])
-            if not service:
-                return jsonify({
-                    'success': False,
-                    'error': 'Serviço não encontrado'
-                }), 404
+        service = get_cached_service(data.get('service_id', booking.service_id))
+        if not service:
+            return jsonify({
+                'success': False,
+                'error': 'Serviço não encontrado'
+            }), 404
         
         # Validar data se fornecida
         if 'appointment_date' in data:
@@ -333,7 +790,40 @@ def update_booking(booking_id):
                     'error': 'Formato de horário inválido (use HH:MM)'
                 }), 400
         
+        # Verificar conflito quando data, horário ou serviço mudarem ou o agendamento for reativado
+        rescheduled = any(field in data for field in ('service_id', 'appointment_date', 'appointment_time'))
+        new_status = data.get('status', booking.status)
+        reactivated = booking.status == 'cancelled' and new_status != 'cancelled'
+        target_date = appointment_date if 'appointment_date' in data else booking.appointment_date
+        check_conflict = (rescheduled or reactivated) and new_status != 'cancelled'
+        if check_conflict:
+            # Duração lida do banco, como na criação (serviço travado antes dos dias)
+            duration_minutes = service_durations(service['id']).get(service['id'])
+            if duration_minutes is None:
+                db.session.rollback()
+                return jsonify({
+                    'success': False,
+                    'error': 'Serviço não encontrado'
+                }), 404
+        if rescheduled or new_status != booking.status:
+            # Travar origem e destino numa única chamada (ordem fixa, sem deadlock entre
+            # remarcações em sentidos opostos) antes da verificação e da atualização
+            lock_booking_days(booking.appointment_date, target_date)
+        if check_conflict and not is_slot_available(
+            target_date,
+            appointment_time if 'appointment_time' in data else booking.appointment_time,
+            duration_minutes,
+            exclude_booking_id=booking.id
+        ):
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': 'Horário não disponível'
+            }), 409
+        
         # Atualizar campos
+        previous_date = booking.appointment_date
+        previous_status = booking.status
         if 'service_id' in data:
             booking.service_id = data['service_id']
         if 'client_name' in data:
@@ -347,13 +837,27 @@ def update_booking(booking_id):
         if 'status' in data:
             booking.status = data['status']
         
+        if rescheduled or booking.status != previous_status:
+            # Recalcular a ocupação dos dias de origem e destino, já travados
+            db.session.flush()
+            rebuild_days(previous_date, booking.appointment_date)
+        enqueue_booking(booking, service['name'])
         db.session.commit()
+        invalidate_months(previous_date, booking.appointment_date)
+        invalidate_analytics_months(previous_date, booking.appointment_date)
         
         return jsonify({
             'success': True,
             'message': 'Agendamento atualizado com sucesso',
             'data': booking.to_dict()
         }), 200
+    except OperationalError:
+        # Trava do dia não obtida dentro do busy timeout
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Agenda ocupada, tente novamente'
+        }), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -373,12 +877,26 @@ def cancel_booking(booking_id):
             }), 404
         
         booking.status = 'cancelled'
+        lock_booking_days(booking.appointment_date)
+        db.session.flush()
+        rebuild_days(booking.appointment_date)
+        service = get_cached_service(booking.service_id)
+        enqueue_booking(booking, service['name'] if service else None)
         db.session.commit()
+        invalidate_months(booking.appointment_date)
+        invalidate_analytics_months(booking.appointment_date)
         
         return jsonify({
             'success': True,
             'message': 'Agendamento cancelado com sucesso'
         }), 200
+    except OperationalError:
+        # Trava do dia não obtida dentro do busy timeout
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Agenda ocupada, tente novamente'
+        }), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -0,0 +1,39 @@
+import os
+from flask import Blueprint, current_app, send_from_directory
+from src.utils.avatars import AVATAR_FILE
+from src.utils.static_assets import DEFAULT_MAX_AGE, IMMUTABLE_MAX_AGE, get_manifest, send_asset
+
+frontend_bp = Blueprint('frontend', __name__)
+
+# Servir frontend (arquivos do build ou index.html para as rotas do React)
+@frontend_bp.route('/', defaults={'path': ''})
+@frontend_bp.route('/<path:path>')
+def serve(path):
+    if current_app.static_folder is None:
+        return "Static folder not configured", 404
+    
+    manifest = get_manifest()
+    asset = manifest.get(path) if path != "" else None
+    if asset is None:
+        asset = manifest.get('index.html')
+        if asset is None:
+            return "index.html not found", 404
+    return send_asset(asset)
+
+# Rota para servir arquivos enviados
+@frontend_bp.route('/uploads/<filename>')
+def uploaded_file(filename):
+    uploads_folder = os.path.join(current_app.static_folder, 'uploads')
+    # Avatares têm o hash do conteúdo no nome: o mesmo nome nunca muda de conteúdo
+    immutable = AVATAR_FILE.match(filename) is not None
+    response = send_from_directory(
+        uploads_folder, filename, max_age=IMMUTABLE_MAX_AGE if immutable else DEFAULT_MAX_AGE
+    )
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+# Health check da API
+@frontend_bp.route('/api/health')
+def health_check():
+    return {'status': 'ok', 'message': 'AgendAI API is running'}, 200
@@ -0,0 +1,30 @@
+import hmac
+from flask import Blueprint, Response, current_app, request, jsonify
+from src.utils.metrics import get_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics_text():
+    """Métricas do processo no formato de exposição do Prometheus"""
+    try:
+        metrics = get_metrics(current_app)
+        if metrics is None:
+            return jsonify({
+                'success': False,
+                'error': 'Métricas desativadas'
+            }), 404
+        
+        token = current_app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return jsonify({
+                'success': False,
+                'error': 'Não autorizado'
+            }), 401
+        
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
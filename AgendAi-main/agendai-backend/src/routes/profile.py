@@ -1,37 +1,26 @@
+import json
 from flask import Blueprint, request, jsonify
-from src.models.agendai import db, Profile
-import os
-from werkzeug.utils import secure_filename
+from src.models.agendai import db
+from src.utils.analytics import invalidate_analytics
+from src.utils.avatars import AvatarError, save_upload, schedule_processing, uploads_folder
+from src.utils.profile_cache import get_or_create_profile, get_profile_snapshot, store_profile
+from src.utils.schedule import default_business_hours, normalize_business_hours
 
 profile_bp = Blueprint('profile', __name__)
 
-UPLOAD_FOLDER = 'src/static/uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
 @profile_bp.route('/profile', methods=['GET'])
 def get_profile():
     """Buscar dados do perfil"""
     try:
-        profile = Profile.query.first()
-        if not profile:
-            # Criar perfil padrão se não existir
-            profile = Profile(
-                full_name='',
-                clinic_name='',
-                email='',
-                phone='',
-                avatar_url=None
-            )
-            db.session.add(profile)
-            db.session.commit()
-        
-        return jsonify({
+        # Perfil em cache (criado na primeira leitura, se necessário)
+        snapshot = get_profile_snapshot()
+        response = jsonify({
             'success': True,
-            'data': profile.to_dict()
-        }), 200
+            'data': snapshot.data
+        })
+        # ETag forte: navegadores com If-None-Match recebem 304 sem corpo
+        response.set_etag(snapshot.etag)
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -59,10 +48,7 @@ def update_profile():
                     'error': f'Campo {field} é obrigatório'
                 }), 400
         
-        profile = Profile.query.first()
-        if not profile:
-            profile = Profile()
-            db.session.add(profile)
+        profile = get_or_create_profile()
         
         profile.full_name = data['full_name']
         profile.clinic_name = data['clinic_name']
@@ -70,11 +56,12 @@ def update_profile():
         profile.phone = data['phone']
         
         db.session.commit()
+        snapshot = store_profile(profile)
         
         return jsonify({
             'success': True,
             'message': 'Perfil atualizado com sucesso',
-            'data': profile.to_dict()
+            'data': snapshot.data
         }), 200
     except Exception as e:
         db.session.rollback()
@@ -100,48 +87,87 @@ def upload_avatar():
                 'error': 'Nenhum arquivo selecionado'
             }), 400
         
-        if file and allowed_file(file.filename):
-            # Criar diretório de upload se não existir
-            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-            
-            filename = secure_filename(file.filename)
-            # Adicionar timestamp para evitar conflitos
-            import time
-            timestamp = str(int(time.time()))
-            name, ext = os.path.splitext(filename)
-            filename = f"{name}_{timestamp}{ext}"
-            
-            file_path = os.path.join(UPLOAD_FOLDER, filename)
-            file.save(file_path)
-            
-            # Atualizar perfil com URL do avatar
-            profile = Profile.query.first()
-            if not profile:
-                profile = Profile(
-                    full_name='',
-                    clinic_name='',
-                    email='',
-                    phone=''
-                )
-                db.session.add(profile)
-            
-            profile.avatar_url = f'/uploads/{filename}'
-            db.session.commit()
-            
+        # Gravado em blocos com nome pelo hash do conteúdo; o tipo vem dos magic bytes
+        try:
+            filename = save_upload(file.stream, uploads_folder())
+        except AvatarError as e:
             return jsonify({
-                'success': True,
-                'message': 'Avatar atualizado com sucesso',
-                'avatar_url': profile.avatar_url
-            }), 200
-        else:
+                'success': False,
+                'error': str(e)
+            }), e.status_code
+        
+        # Atualizar perfil com URL do avatar (original até as versões redimensionadas ficarem prontas)
+        profile = get_or_create_profile()
+        profile.avatar_url = f'/uploads/{filename}'
+        profile.avatar_variants = None
+        db.session.commit()
+        store_profile(profile)
+        
+        # Versões WebP/JPEG e limpeza de avatares antigos fora da thread da requisição
+        schedule_processing(filename)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Avatar atualizado com sucesso',
+            'avatar_url': profile.avatar_url
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@profile_bp.route('/profile/business-hours', methods=['GET'])
+def get_business_hours():
+    """Buscar o expediente (padrão de 8h às 18h se não configurado)"""
+    try:
+        snapshot = get_profile_snapshot()
+        return jsonify({
+            'success': True,
+            'data': snapshot.data['business_hours'] or default_business_hours()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@profile_bp.route('/profile/business-hours', methods=['PUT'])
+def update_business_hours():
+    """Atualizar expediente, intervalos, dias fechados e intervalo entre horários"""
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'Dados não fornecidos'
+            }), 400
+        
+        try:
+            business_hours = normalize_business_hours(data)
+        except ValueError as e:
             return jsonify({
                 'success': False,
-                'error': 'Tipo de arquivo não permitido'
+                'error': str(e)
             }), 400
+        
+        profile = get_or_create_profile()
+        profile.business_hours = json.dumps(business_hours)
+        db.session.commit()
+        store_profile(profile)
+        # A capacidade diária usada nos indicadores depende do expediente
+        invalidate_analytics()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Expediente atualizado com sucesso',
+            'data': business_hours
+        }), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
-
@@ -0,0 +1,104 @@
+import os
+from flask import Blueprint, Response, current_app, request, jsonify, send_from_directory
+from src.utils.profiler import (
+    PROFILE_HEADER, PROFILE_NAME, check_secret, get_toggle, list_profiles, profile_summary,
+    profiles_folder, set_toggle
+)
+
+profiler_bp = Blueprint('profiler', __name__)
+
+# Maior quantidade de requisições perfiladas por ativação do modo administrativo
+MAX_PROFILE_COUNT = 100
+
+def _check_access():
+    """Retorna None se autorizado, ou a resposta de erro"""
+    if not current_app.config.get('PROFILE_SECRET'):
+        return jsonify({
+            'success': False,
+            'error': 'Profiling desativado (defina AGENDAI_PROFILE_SECRET)'
+        }), 404
+    if not check_secret(request.headers.get(PROFILE_HEADER)):
+        return jsonify({
+            'success': False,
+            'error': 'Não autorizado'
+        }), 401
+    return None
+
+@profiler_bp.route('/profiler', methods=['GET'])
+def get_profiler():
+    """Estado do modo administrativo e perfis guardados"""
+    try:
+        error = _check_access()
+        if error:
+            return error
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'toggle': dict(get_toggle()),
+                'profiles': list_profiles(profiles_folder())
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@profiler_bp.route('/profiler', methods=['PUT'])
+def update_profiler():
+    """Ativar o profiling das próximas requisições ({"count": 5, "endpoint": "bookings.get_available_times"})"""
+    try:
+        error = _check_access()
+        if error:
+            return error
+        
+        data = request.get_json(silent=True) or {}
+        count = data.get('count', 1)
+        if isinstance(count, bool) or not isinstance(count, int) or not 0 <= count <= MAX_PROFILE_COUNT:
+            return jsonify({
+                'success': False,
+                'error': f'count deve ser um inteiro entre 0 e {MAX_PROFILE_COUNT}'
+            }), 400
+        
+        endpoint = data.get('endpoint') or None
+        if endpoint is not None and endpoint not in current_app.view_functions:
+            return jsonify({
+                'success': False,
+                'error': f'Endpoint desconhecido: {endpoint}'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'message': 'Profiling atualizado com sucesso',
+            'data': set_toggle(endpoint, count)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@profiler_bp.route('/profiler/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    """Baixar um perfil (.pstats) ou, com ?format=text, o resumo por tempo acumulado"""
+    try:
+        error = _check_access()
+        if error:
+            return error
+        
+        folder = profiles_folder()
+        if not PROFILE_NAME.match(profile_id) or not os.path.isfile(os.path.join(folder, profile_id)):
+            return jsonify({
+                'success': False,
+                'error': 'Perfil não encontrado'
+            }), 404
+        
+        if request.args.get('format') == 'text':
+            return Response(profile_summary(os.path.join(folder, profile_id)), mimetype='text/plain')
+        return send_from_directory(folder, profile_id, as_attachment=True, mimetype='application/octet-stream')
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,456 @@
+from datetime import datetime, date, timedelta
+from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import OperationalError
+from src.models.agendai import db, BookingSeries, SeriesOverride
+from src.utils.analytics import invalidate_analytics, invalidate_analytics_months
+from src.utils.availability import (
+    is_slot_available, load_busy_intervals_for_dates, lock_booking_days, service_durations, time_to_minutes
+)
+from src.utils.calendar_cache import invalidate_calendar, invalidate_months
+from src.utils.catalog import get_cached_service
+from src.utils.occupancy import mark_busy, rebuild_days
+from src.utils.outbox import enqueue_occurrence
+from src.utils.recurrence import (
+    FREQUENCIES, compute_last_date, is_series_date, occurrence_id, parse_rrule, series_dates
+)
+
+series_bp = Blueprint('series', __name__)
+
+def _parse_rule(data):
+    """Ler a regra da série (rrule ou frequency + until/count); lança ValueError"""
+    if data.get('rrule'):
+        return parse_rrule(data['rrule'])
+    frequency = data.get('frequency', 'weekly')
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"frequency deve ser um de: {', '.join(FREQUENCIES)}")
+    until = None
+    if data.get('until'):
+        try:
+            until = datetime.strptime(data['until'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            raise ValueError('Formato de data inválido para until (use YYYY-MM-DD)')
+    return FREQUENCIES[frequency], until, data.get('count')
+
+def _series_to_dict(series):
+    data = series.to_dict()
+    data['overrides'] = [override.to_dict() for override in sorted(series.overrides, key=lambda item: item.original_date)]
+    return data
+
+def _invalidate_series():
+    # Uma série pode cobrir até dois anos: descartar todos os meses em cache
+    invalidate_calendar()
+    invalidate_analytics()
+
+def _find_occurrence(series_id, date_str):
+    """Retorna (série, data original, None) ou (None, None, resposta de erro)"""
+    series = BookingSeries.query.get(series_id)
+    if not series or series.status != 'active':
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'Série não encontrada'
+        }), 404)
+    try:
+        original_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'Formato de data inválido (use YYYY-MM-DD)'
+        }), 400)
+    if not is_series_date(series, original_date):
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'Ocorrência não encontrada'
+        }), 404)
+    return series, original_date, None
+
+@series_bp.route('/bookings/series', methods=['POST'])
+def create_series():
+    """Criar agendamento recorrente (semanal ou quinzenal, com until ou count)"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'Dados não fornecidos'
+            }), 400
+        
+        # Validações
+        required_fields = ['service_id', 'client_name', 'client_contact', 'start_date', 'appointment_time']
+        for field in required_fields:
+            if field not in data or not data[field]:
+                return jsonify({
+                    'success': False,
+                    'error': f'Campo {field} é obrigatório'
+                }), 400
+        
+        service = get_cached_service(data['service_id'])
+        if not service:
+            return jsonify({
+                'success': False,
+                'error': 'Serviço não encontrado'
+            }), 404
+        
+        try:
+            start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Formato de data inválido (use YYYY-MM-DD)'
+            }), 400
+        
+        try:
+            appointment_time = datetime.strptime(data['appointment_time'], '%H:%M').time()
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Formato de horário inválido (use HH:MM)'
+            }), 400
+        
+        if start_date < date.today():
+            return jsonify({
+                'success': False,
+                'error': 'Não é possível agendar para datas passadas'
+            }), 400
+        
+        try:
+            interval_weeks, until, count = _parse_rule(data)
+            last_date = compute_last_date(start_date, interval_weeks, until, count)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        # Duração lida do banco, não do catálogo em cache (serviço travado antes dos dias)
+        duration_minutes = service_durations(service['id']).get(service['id'])
+        if duration_minutes is None:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': 'Serviço não encontrado'
+            }), 404
+        
+        # Verificação de conflitos em uma passada: trava e carrega todos os dias da série de uma vez
+        dates = series_dates(start_date, interval_weeks, last_date)
+        lock_booking_days(*dates)
+        busy_by_date = load_busy_intervals_for_dates(dates)
+        start = time_to_minutes(appointment_time)
+        end = start + duration_minutes
+        conflicts = [day.isoformat() for day in dates if busy_by_date[day].has_conflict(start, end)]
+        if conflicts:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': 'Horário não disponível em todas as datas da série',
+                'conflicts': conflicts
+            }), 409
+        
+        series = BookingSeries(
+            service_id=service['id'],
+            client_name=data['client_name'].strip(),
+            client_contact=data['client_contact'].strip(),
+            start_date=start_date,
+            appointment_time=appointment_time,
+            interval_weeks=interval_weeks,
+            until=until if count is None else None,
+            count=count,
+            last_date=last_date,
+            status='active'
+        )
+        db.session.add(series)
+        db.session.flush()
+        mark_busy({day: [(start, end)] for day in dates})
+        # Sincronização com o Supabase: uma linha por ocorrência, na mesma transação
+        for day in dates:
+            enqueue_occurrence(series, day, day, appointment_time, 'scheduled', service['name'])
+        db.session.commit()
+        _invalidate_series()
+        
+        return jsonify({
+            'success': True,
+            'message': f'Série criada com {len(dates)} ocorrência(s)',
+            'data': _series_to_dict(series)
+        }), 201
+    except OperationalError:
+        # Trava do dia não obtida dentro do busy timeout
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Agenda ocupada, tente novamente'
+        }), 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@series_bp.route('/bookings/series/<int:series_id>', methods=['GET'])
+def get_series(series_id):
+    """Buscar série com suas exceções"""
+    try:
+        series = BookingSeries.query.get(series_id)
+        if not series:
+            return jsonify({
+                'success': False,
+                'error': 'Série não encontrada'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': _series_to_dict(series)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@series_bp.route('/bookings/series/<int:series_id>', methods=['DELETE'])
+def cancel_series(series_id):
+    """Cancelar a série inteira ou, com ?from=YYYY-MM-DD, as ocorrências a partir da data"""
+    try:
+        series = BookingSeries.query.get(series_id)
+        if not series or series.status != 'active':
+            return jsonify({
+                'success': False,
+                'error': 'Série não encontrada'
+            }), 404
+        
+        from_date = None
+        if request.args.get('from'):
+            try:
+                from_date = datetime.strptime(request.args['from'], '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'error': 'Formato de data inválido para from (use YYYY-MM-DD)'
+                }), 400
+        
+        # Dias ocupados pela série antes da alteração (datas da regra e remarcações)
+        affected = set(series_dates(series.start_date, series.interval_weeks, series.last_date))
+        affected.update(override.new_date for override in series.overrides if override.new_date)
+        # Ocorrências canceladas (a partir de from), com a data e o horário em vigor
+        overrides = {override.original_date: override for override in series.overrides}
+        cancelled = []
+        for original_date in series_dates(series.start_date, series.interval_weeks, series.last_date, window_start=from_date):
+            override = overrides.get(original_date)
+            if override is not None and override.status == 'rescheduled':
+                cancelled.append((original_date, override.new_date, override.new_time))
+            else:
+                cancelled.append((original_date, original_date, series.appointment_time))
+        
+        if from_date is None or from_date <= series.start_date:
+            series.status = 'cancelled'
+            message = 'Série cancelada com sucesso'
+        else:
+            # Encerrar a série na última ocorrência anterior a from
+            remaining = series_dates(series.start_date, series.interval_weeks, series.last_date,
+                                     window_end=from_date - timedelta(days=1))
+            series.until = series.last_date = remaining[-1]
+            series.count = None
+            for override in [override for override in series.overrides if override.original_date >= from_date]:
+                series.overrides.remove(override)
+            message = f'Ocorrências a partir de {from_date.isoformat()} canceladas com sucesso'
+        
+        lock_booking_days(*affected)
+        db.session.flush()
+        rebuild_days(*affected)
+        service = get_cached_service(series.service_id)
+        for original_date, appointment_date, appointment_time in cancelled:
+            enqueue_occurrence(series, original_date, appointment_date, appointment_time, 'cancelled',
+                               service['name'] if service else None)
+        db.session.commit()
+        _invalidate_series()
+        
+        return jsonify({
+            'success': True,
+            'message': message,
+            'data': _series_to_dict(series)
+        }), 200
+    except OperationalError:
+        # Trava do dia não obtida dentro do busy timeout
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Agenda ocupada, tente novamente'
+        }), 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@series_bp.route('/bookings/series/<int:series_id>/occurrences/<date_str>', methods=['PUT'])
+def update_occurrence(series_id, date_str):
+    """Remarcar, cancelar ou restaurar uma ocorrência (identificada pela data original)"""
+    try:
+        series, original_date, error = _find_occurrence(series_id, date_str)
+        if error:
+            return error
+        
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'Dados não fornecidos'
+            }), 400
+        
+        status = data.get('status', 'scheduled')
+        if status not in ('scheduled', 'cancelled'):
+            return jsonify({
+                'success': False,
+                'error': 'Status deve ser scheduled ou cancelled'
+            }), 400
+        
+        override = SeriesOverride.query.filter_by(series_id=series.id, original_date=original_date).first()
+        previous_date = override.new_date if override and override.new_date else original_date
+        previous_time = override.new_time if override and override.new_time else series.appointment_time
+        
+        if status == 'cancelled':
+            new_date, new_time = original_date, series.appointment_time
+        else:
+            new_date = previous_date
+            new_time = previous_time
+            if data.get('appointment_date'):
+                try:
+                    new_date = datetime.strptime(data['appointment_date'], '%Y-%m-%d').date()
+                except (TypeError, ValueError):
+                    return jsonify({
+                        'success': False,
+                        'error': 'Formato de data inválido (use YYYY-MM-DD)'
+                    }), 400
+            if data.get('appointment_time'):
+                try:
+                    new_time = datetime.strptime(data['appointment_time'], '%H:%M').time()
+                except (TypeError, ValueError):
+                    return jsonify({
+                        'success': False,
+                        'error': 'Formato de horário inválido (use HH:MM)'
+                    }), 400
+            if new_date < date.today():
+                return jsonify({
+                    'success': False,
+                    'error': 'Não é possível agendar para datas passadas'
+                }), 400
+            
+            # Duração lida do banco, não do catálogo em cache (serviço travado antes dos dias)
+            duration_minutes = service_durations(series.service_id).get(series.service_id)
+            if duration_minutes is None:
+                db.session.rollback()
+                return jsonify({
+                    'success': False,
+                    'error': 'Serviço não encontrado'
+                }), 404
+        
+        # Travar numa única chamada (ordem fixa, sem deadlock) todos os dias tocados
+        lock_booking_days(original_date, previous_date, new_date)
+        
+        # Verificar o conflito ignorando a própria ocorrência
+        if status == 'scheduled' and not is_slot_available(new_date, new_time, duration_minutes,
+                                                           exclude_occurrence=(series.id, original_date)):
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': 'Horário não disponível'
+            }), 409
+        
+        if status == 'scheduled' and (new_date, new_time) == (original_date, series.appointment_time):
+            # De volta à data e horário da regra: a exceção deixa de existir
+            if override:
+                db.session.delete(override)
+        else:
+            if override is None:
+                override = SeriesOverride(series_id=series.id, original_date=original_date)
+                db.session.add(override)
+            override.status = 'cancelled' if status == 'cancelled' else 'rescheduled'
+            override.new_date = new_date if status == 'scheduled' else None
+            override.new_time = new_time if status == 'scheduled' else None
+        
+        db.session.flush()
+        rebuild_days(original_date, previous_date, new_date)
+        service = get_cached_service(series.service_id)
+        if status == 'cancelled':
+            # Cancelada na data e no horário em que estava marcada
+            enqueue_occurrence(series, original_date, previous_date, previous_time, status,
+                               service['name'] if service else None)
+        else:
+            enqueue_occurrence(series, original_date, new_date, new_time, status, service['name'] if service else None)
+        db.session.commit()
+        invalidate_months(original_date, previous_date, new_date)
+        invalidate_analytics_months(original_date, previous_date, new_date)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Ocorrência atualizada com sucesso',
+            'data': {
+                'id': occurrence_id(series.id, original_date),
+                'series_id': series.id,
+                'occurrence_date': original_date.isoformat(),
+                'appointment_date': new_date.isoformat(),
+                'appointment_time': new_time.strftime('%H:%M'),
+                'status': status,
+                'recurring': True
+            }
+        }), 200
+    except OperationalError:
+        # Trava do dia não obtida dentro do busy timeout
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Agenda ocupada, tente novamente'
+        }), 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@series_bp.route('/bookings/series/<int:series_id>/occurrences/<date_str>', methods=['DELETE'])
+def cancel_occurrence(series_id, date_str):
+    """Cancelar uma única ocorrência da série"""
+    try:
+        series, original_date, error = _find_occurrence(series_id, date_str)
+        if error:
+            return error
+        
+        override = SeriesOverride.query.filter_by(series_id=series.id, original_date=original_date).first()
+        previous_date = override.new_date if override and override.new_date else original_date
+        previous_time = override.new_time if override and override.new_time else series.appointment_time
+        if override is None:
+            override = SeriesOverride(series_id=series.id, original_date=original_date)
+            db.session.add(override)
+        override.status = 'cancelled'
+        override.new_date = None
+        override.new_time = None
+        
+        lock_booking_days(original_date, previous_date)
+        db.session.flush()
+        rebuild_days(original_date, previous_date)
+        service = get_cached_service(series.service_id)
+        enqueue_occurrence(series, original_date, previous_date, previous_time, 'cancelled',
+                           service['name'] if service else None)
+        db.session.commit()
+        invalidate_months(original_date, previous_date)
+        invalidate_analytics_months(original_date, previous_date)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Ocorrência cancelada com sucesso'
+        }), 200
+    except OperationalError:
+        # Trava do dia não obtida dentro do busy timeout
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Agenda ocupada, tente novamente'
+        }), 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
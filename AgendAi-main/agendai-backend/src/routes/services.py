@@ -1,5 +1,11 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import OperationalError
 from src.models.agendai import db, Service
+from src.utils.analytics import invalidate_analytics
+from src.utils.availability import lock_booking_days
+from src.utils.calendar_cache import invalidate_calendar
+from src.utils.catalog import get_cached_service, get_catalog, invalidate_catalog
+from src.utils.occupancy import rebuild_days, service_days
 
 services_bp = Blueprint('services', __name__)
 
@@ -7,11 +13,14 @@ services_bp = Blueprint('services', __name__)
 def get_services():
     """Listar todos os serviços"""
     try:
-        services = Service.query.order_by(Service.created_at.desc()).all()
-        return jsonify({
+        catalog = get_catalog()
+        response = jsonify({
             'success': True,
-            'data': [service.to_dict() for service in services]
-        }), 200
+            'data': catalog.services
+        })
+        # ETag forte: navegadores com If-None-Match recebem 304 sem corpo
+        response.set_etag(catalog.etag)
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -70,6 +79,7 @@ def create_service():
         
         db.session.add(service)
         db.session.commit()
+        invalidate_catalog()
         
         return jsonify({
             'success': True,
@@ -87,7 +97,7 @@ def create_service():
 def get_service(service_id):
     """Buscar serviço específico"""
     try:
-        service = Service.query.get(service_id)
+        service = get_cached_service(service_id)
         if not service:
             return jsonify({
                 'success': False,
@@ -96,7 +106,7 @@ def get_service(service_id):
         
         return jsonify({
             'success': True,
-            'data': service.to_dict()
+            'data': service
         }), 200
     except Exception as e:
         return jsonify({
@@ -160,6 +170,7 @@ def update_service(service_id):
         # Atualizar campos
         if 'name' in data:
             service.name = data['name'].strip()
+        duration_changed = 'duration_minutes' in data and int(data['duration_minutes']) != service.duration_minutes
         if 'duration_minutes' in data:
             service.duration_minutes = int(data['duration_minutes'])
         if 'price' in data:
@@ -167,13 +178,31 @@ def update_service(service_id):
         if 'description' in data:
             service.description = data['description'].strip()
         
+        if duration_changed:
+            # A ocupação dos dias com agendamentos do serviço depende da duração. O flush
+            # trava a linha do serviço (escritas em andamento terminam antes, ver
+            # service_durations); depois os dias são travados e recalculados
+            db.session.flush()
+            days = service_days(service.id)
+            lock_booking_days(*days)
+            rebuild_days(*days)
         db.session.commit()
+        invalidate_catalog()
+        invalidate_calendar()
+        invalidate_analytics()
         
         return jsonify({
             'success': True,
             'message': 'Serviço atualizado com sucesso',
             'data': service.to_dict()
         }), 200
+    except OperationalError:
+        # Travas dos dias não obtidas dentro do busy timeout
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Agenda ocupada, tente novamente'
+        }), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -192,8 +221,8 @@ def delete_service(service_id):
                 'error': 'Serviço não encontrado'
             }), 404
         
-        # Verificar se há agendamentos associados
-        if service.bookings:
+        # Verificar se há agendamentos ou séries ativas associados
+        if service.bookings or any(series.status == 'active' for series in service.series):
             return jsonify({
                 'success': False,
                 'error': 'Não é possível excluir serviço com agendamentos associados'
@@ -201,6 +230,9 @@ def delete_service(service_id):
         
         db.session.delete(service)
         db.session.commit()
+        invalidate_catalog()
+        invalidate_calendar()
+        invalidate_analytics()
         
         return jsonify({
             'success': True,
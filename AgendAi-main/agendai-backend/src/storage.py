@@ -0,0 +1,75 @@
+import os
+from sqlalchemy import event
+
+# Banco padrão: arquivo SQLite em src/database
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(__file__), 'database', 'agendai.db')
+
+# Perfil de desempenho do SQLite. WAL permite leituras concorrentes com uma escrita,
+# synchronous=NORMAL é seguro em WAL e evita um fsync por commit, e o busy_timeout
+# faz a conexão esperar pela trava de escrita em vez de falhar com "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),  # negativo = KiB
+    'temp_store': 'MEMORY'
+}
+
+def database_uri():
+    """URI do banco: DATABASE_URL (ex.: PostgreSQL) ou o arquivo SQLite local"""
+    uri = os.environ.get('DATABASE_URL')
+    if not uri:
+        return f'sqlite:///{DEFAULT_SQLITE_PATH}'
+    # Provedores como o Render/Heroku usam o esquema antigo postgres://
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+def is_memory_sqlite(uri):
+    """URI de um banco SQLite em memória (sqlite://, :memory: ou mode=memory)"""
+    return uri.startswith('sqlite') and (
+        uri.rstrip('/') == 'sqlite:' or ':memory:' in uri or 'mode=memory' in uri
+    )
+
+def engine_options(uri):
+    """Opções do engine do SQLAlchemy adequadas ao banco informado"""
+    if uri.startswith('sqlite'):
+        options = {
+            'connect_args': {
+                # Em segundos; o PRAGMA busy_timeout abaixo tem o mesmo efeito
+                'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+                'check_same_thread': False
+            }
+        }
+        if not is_memory_sqlite(uri):
+            # Em memória o Flask-SQLAlchemy usa StaticPool (uma única conexão),
+            # que não aceita as opções de tamanho do pool
+            options['pool_size'] = int(os.environ.get('DB_POOL_SIZE', 10))
+            options['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+        return options
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    }
+
+def configure_storage(app, uri=None, pragmas=None):
+    """Preencher a configuração de banco da aplicação (antes de db.init_app)"""
+    uri = uri or database_uri()
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri)
+    app.config['SQLITE_PRAGMAS'] = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Aplicar os PRAGMAs em cada nova conexão SQLite do engine"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
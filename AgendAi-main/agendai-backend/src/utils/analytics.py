@@ -0,0 +1,233 @@
+import calendar
+import threading
+import time
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import select
+from src.models.agendai import db, Booking, Service
+from src.utils.recurrence import load_occurrences
+from src.utils.schedule import get_schedule
+
+# Meses ainda abertos (mês atual e futuros) são recalculados após este tempo.
+# Escritas no próprio processo invalidam o mês na hora, mas as de outros workers
+# (importação com datas passadas, mudança de status) só aparecem após o TTL,
+# por isso meses encerrados também expiram, com um prazo maior
+ANALYTICS_TTL = 30
+ANALYTICS_CLOSED_TTL = 300
+# Quantidade de horários mais ocupados retornados em peak_hours
+PEAK_HOURS = 3
+
+_lock = threading.Lock()
+# Chave do cache em app.extensions (agregados por mês, por aplicação)
+EXTENSION_KEY = 'agendai_analytics_cache'
+
+class MonthStats:
+    """Contadores brutos de um mês, somáveis entre meses
+    
+    As taxas só são calculadas em summarize(), depois de somar os meses do período.
+    """
+    
+    def __init__(self, year, month, schedule):
+        first = date(year, month, 1)
+        self.schedule = schedule
+        self.days = {}
+        self.windows = {}
+        for offset in range(calendar.monthrange(year, month)[1]):
+            day = first + timedelta(days=offset)
+            self.windows[day] = schedule.day_windows(day)
+            # [agendamentos, cancelados, minutos ocupados, capacidade, receita]
+            self.days[day] = [0, 0, 0, schedule.capacity_minutes(day), 0.0]
+        # service_id -> [agendamentos, cancelados, minutos ocupados, receita]
+        self.services = {}
+        # hora -> [agendamentos iniciados, minutos ocupados]
+        self.hours = {}
+    
+    def add_rows(self, rows):
+        """Acumular as linhas (data, hora, serviço, duração, preço, status) em uma passada"""
+        days, services, hours, windows = self.days, self.services, self.hours, self.windows
+        for appointment_date, appointment_time, service_id, duration, price, status in rows:
+            day = days[appointment_date]
+            service = services.get(service_id)
+            if service is None:
+                service = services[service_id] = [0, 0, 0, 0.0]
+            day[0] += 1
+            service[0] += 1
+            if status == 'cancelled':
+                day[1] += 1
+                service[1] += 1
+                continue
+            
+            day[4] += price
+            service[3] += price
+            booking_start = appointment_time.hour * 60 + appointment_time.minute
+            booking_end = booking_start + duration
+            hour = hours.get(booking_start // 60)
+            if hour is None:
+                hour = hours[booking_start // 60] = [0, 0]
+            hour[0] += 1
+            # Minutos dentro das janelas de atendimento, distribuídos pelas horas cobertas
+            for window_start, window_end in windows[appointment_date]:
+                start = max(booking_start, window_start)
+                end = min(booking_end, window_end)
+                if end <= start:
+                    continue
+                day[2] += end - start
+                service[2] += end - start
+                minute = start
+                while minute < end:
+                    next_hour = (minute // 60 + 1) * 60
+                    hour = hours.get(minute // 60)
+                    if hour is None:
+                        hour = hours[minute // 60] = [0, 0]
+                    hour[1] += min(end, next_hour) - minute
+                    minute = next_hour
+
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else 0.0
+
+def load_month_stats(year, month, schedule):
+    """Agregar um mês com consultas de colunas (sem carregar objetos ORM)"""
+    first = date(year, month, 1)
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    statement = select(
+        Booking.appointment_date,
+        Booking.appointment_time,
+        Booking.service_id,
+        Service.duration_minutes,
+        Service.price,
+        Booking.status
+    ).join(Service, Service.id == Booking.service_id).where(
+        Booking.appointment_date >= first,
+        Booking.appointment_date <= last
+    )
+    stats = MonthStats(year, month, schedule)
+    result = db.session.execute(statement)
+    while True:
+        rows = result.fetchmany(5000)
+        if not rows:
+            break
+        stats.add_rows(rows)
+    # Ocorrências de séries (inclusive as canceladas individualmente) entram como agendamentos
+    stats.add_rows(
+        (occurrence.date, occurrence.time, occurrence.service_id, occurrence.duration, occurrence.price, occurrence.status)
+        for occurrence in load_occurrences(first, last, include_cancelled=True)
+    )
+    return stats
+
+def _is_closed(year, month, today=None):
+    today = today or date.today()
+    return (year, month) < (today.year, today.month)
+
+def get_month_stats(year, month):
+    """Agregados do mês, do cache enquanto a entrada estiver no TTL do mês
+    
+    A entrada também é descartada se o expediente mudou, pois ele define a capacidade.
+    """
+    key = (year, month)
+    schedule = get_schedule()
+    with _lock:
+        entries = current_app.extensions.setdefault(EXTENSION_KEY, {})
+        entry = entries.get(key)
+    ttl = ANALYTICS_CLOSED_TTL if _is_closed(year, month) else ANALYTICS_TTL
+    if entry is not None and entry[1].schedule is schedule and time.monotonic() - entry[0] < ttl:
+        return entry[1]
+    
+    stats = load_month_stats(year, month, schedule)
+    with _lock:
+        current_app.extensions.setdefault(EXTENSION_KEY, {})[key] = (time.monotonic(), stats)
+    return stats
+
+def invalidate_analytics_months(*dates):
+    """Descartar os meses que contêm as datas informadas"""
+    months = {(day.year, day.month) for day in dates if day is not None}
+    with _lock:
+        entries = current_app.extensions.get(EXTENSION_KEY, {})
+        for key in months:
+            entries.pop(key, None)
+
+def invalidate_analytics():
+    """Descartar todos os meses (ex.: preço ou duração de serviço alterados)"""
+    with _lock:
+        current_app.extensions.pop(EXTENSION_KEY, None)
+
+def iter_months(start_year, start_month, end_year, end_month):
+    year, month = start_year, start_month
+    while (year, month) <= (end_year, end_month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def summarize(months, service_names):
+    """Somar os meses e calcular ocupação, receita, cancelamentos e horários de pico"""
+    days = []
+    services = {}
+    hours = {}
+    for stats in months:
+        for day, (bookings, cancelled, booked, capacity, revenue) in stats.days.items():
+            days.append({
+                'date': day.isoformat(),
+                'bookings': bookings,
+                'cancelled': cancelled,
+                'booked_minutes': booked,
+                'capacity_minutes': capacity,
+                'occupancy_rate': _rate(booked, capacity),
+                'revenue': round(revenue, 2)
+            })
+        for service_id, values in stats.services.items():
+            total = services.setdefault(service_id, [0, 0, 0, 0.0])
+            for index, value in enumerate(values):
+                total[index] += value
+        for hour, values in stats.hours.items():
+            total = hours.setdefault(hour, [0, 0])
+            total[0] += values[0]
+            total[1] += values[1]
+    
+    total_bookings = sum(day['bookings'] for day in days)
+    total_cancelled = sum(day['cancelled'] for day in days)
+    total_booked = sum(day['booked_minutes'] for day in days)
+    total_capacity = sum(day['capacity_minutes'] for day in days)
+    total_revenue = sum(values[3] for values in services.values())
+    # Capacidade de cada hora: minutos de atendimento dentro dela somados no período
+    hour_capacity = {}
+    for stats in months:
+        for day_windows in stats.windows.values():
+            for start, end in day_windows:
+                minute = start
+                while minute < end:
+                    next_hour = (minute // 60 + 1) * 60
+                    hour_capacity[minute // 60] = hour_capacity.get(minute // 60, 0) + min(end, next_hour) - minute
+                    minute = next_hour
+    
+    hour_rows = [{
+        'hour': hour,
+        'bookings': hours.get(hour, (0, 0))[0],
+        'booked_minutes': hours.get(hour, (0, 0))[1],
+        'occupancy_rate': _rate(hours.get(hour, (0, 0))[1], hour_capacity.get(hour, 0))
+    } for hour in sorted(set(hours) | set(hour_capacity))]
+    peak = sorted(hour_rows, key=lambda row: (-row['booked_minutes'], row['hour']))[:PEAK_HOURS]
+    
+    return {
+        'totals': {
+            'bookings': total_bookings,
+            'cancelled': total_cancelled,
+            'cancellation_rate': _rate(total_cancelled, total_bookings),
+            'booked_minutes': total_booked,
+            'capacity_minutes': total_capacity,
+            'occupancy_rate': _rate(total_booked, total_capacity),
+            'revenue': round(total_revenue, 2)
+        },
+        'days': days,
+        'services': [{
+            'service_id': service_id,
+            'name': service_names.get(service_id),
+            'bookings': bookings,
+            'cancelled': cancelled,
+            'cancellation_rate': _rate(cancelled, bookings),
+            'booked_minutes': booked,
+            'occupancy_share': _rate(booked, total_booked),
+            'revenue': round(revenue, 2)
+        } for service_id, (bookings, cancelled, booked, revenue) in sorted(
+            services.items(), key=lambda item: -item[1][3]
+        )],
+        'hours': hour_rows,
+        'peak_hours': [row['hour'] for row in peak if row['booked_minutes']]
+    }
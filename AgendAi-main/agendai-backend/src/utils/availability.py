@@ -0,0 +1,175 @@
+from bisect import bisect_left, bisect_right
+from sqlalchemy import select
+from src.models.agendai import db, Booking, BookingDayLock, Service
+from src.utils.occupancy import load_day_bitmap
+from src.utils.recurrence import load_occurrences
+from src.utils.schedule import get_schedule
+
+def time_to_minutes(value):
+    """Converter um datetime.time em minutos desde a meia-noite"""
+    return value.hour * 60 + value.minute
+
+def minutes_to_str(minutes):
+    """Formatar minutos desde a meia-noite como HH:MM"""
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+class BusyIntervals:
+    """Conjunto ordenado de intervalos ocupados de um dia
+    
+    Os intervalos são ordenados e mesclados uma única vez na construção, de
+    modo que a busca de horários livres é uma varredura linear e a verificação
+    de conflito é uma busca binária.
+    """
+    
+    def __init__(self, intervals=()):
+        merged = []
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+    
+    def __len__(self):
+        return len(self.starts)
+    
+    def add(self, start, end):
+        """Incluir um intervalo ocupado mantendo a ordenação e a mesclagem"""
+        if end <= start:
+            return
+        # Intervalos que tocam ou sobrepõem [start, end] são mesclados ao novo
+        low = bisect_left(self.ends, start)
+        high = bisect_right(self.starts, end)
+        if low < high:
+            start = min(start, self.starts[low])
+            end = max(end, self.ends[high - 1])
+        self.starts[low:high] = [start]
+        self.ends[low:high] = [end]
+    
+    def has_conflict(self, start, end):
+        """Verificar se [start, end) sobrepõe algum intervalo ocupado"""
+        index = bisect_right(self.starts, start) - 1
+        if index >= 0 and self.ends[index] > start:
+            return True
+        index += 1
+        return index < len(self.starts) and self.starts[index] < end
+    
+    def free_slots_in(self, grid, duration):
+        """Filtrar uma grade crescente de inícios, mantendo os que não conflitam"""
+        slots = []
+        index = 0
+        starts, ends = self.starts, self.ends
+        count = len(starts)
+        for slot in grid:
+            # Descartar intervalos que terminam antes do horário atual
+            while index < count and ends[index] <= slot:
+                index += 1
+            if index == count or starts[index] >= slot + duration:
+                slots.append(slot)
+        return slots
+
+def _busy_query():
+    """Consulta de (data, horário, duração) dos agendamentos não cancelados"""
+    return db.session.query(
+        Booking.appointment_date, Booking.appointment_time, Service.duration_minutes
+    ).join(
+        Service, Booking.service_id == Service.id
+    ).filter(Booking.status != 'cancelled')
+
+def _add_occurrences(intervals_by_date, start_date, end_date, exclude_occurrence=None):
+    """Incluir as ocorrências de séries do período nas datas presentes no dict"""
+    for occurrence in load_occurrences(start_date, end_date, exclude=exclude_occurrence):
+        intervals = intervals_by_date.get(occurrence.date)
+        if intervals is not None:
+            start = time_to_minutes(occurrence.time)
+            intervals.append((start, start + occurrence.duration))
+
+def load_busy_intervals(appointment_date, exclude_booking_id=None, exclude_occurrence=None):
+    """Carregar os intervalos ocupados de uma data (agendamentos e ocorrências de séries)"""
+    query = _busy_query().filter(Booking.appointment_date == appointment_date)
+    if exclude_booking_id is not None:
+        query = query.filter(Booking.id != exclude_booking_id)
+    
+    intervals = []
+    for _, appointment_time, duration_minutes in query:
+        start = time_to_minutes(appointment_time)
+        intervals.append((start, start + duration_minutes))
+    _add_occurrences({appointment_date: intervals}, appointment_date, appointment_date, exclude_occurrence)
+    return BusyIntervals(intervals)
+
+def load_busy_intervals_for_dates(dates, chunk_size=500):
+    """Carregar os intervalos ocupados de datas esparsas, agrupados por data
+    
+    As datas são consultadas em blocos para respeitar o limite de parâmetros
+    do SQLite; cada data informada recebe uma entrada.
+    """
+    dates = sorted(set(dates))
+    intervals_by_date = {day: [] for day in dates}
+    for offset in range(0, len(dates), chunk_size):
+        chunk = dates[offset:offset + chunk_size]
+        query = _busy_query().filter(Booking.appointment_date.in_(chunk))
+        for appointment_date, appointment_time, duration_minutes in query:
+            start = time_to_minutes(appointment_time)
+            intervals_by_date[appointment_date].append((start, start + duration_minutes))
+    if dates:
+        # Ocorrências expandidas uma única vez para o intervalo que cobre todas as datas
+        _add_occurrences(intervals_by_date, dates[0], dates[-1])
+    return {day: BusyIntervals(intervals) for day, intervals in intervals_by_date.items()}
+
+def lock_booking_days(*dates):
+    """Travar os dias informados até o fim da transação atual
+    
+    Cada dia tem uma linha em booking_day_locks que é criada ou incrementada
+    antes da verificação de conflito. No PostgreSQL isso trava apenas a linha
+    do dia; no SQLite a escrita obtém a trava de escrita do banco. Em ambos os
+    casos a verificação e a inserção seguintes ficam atômicas.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    # Ordem fixa para evitar deadlock entre transações que travam vários dias
+    for day in sorted(set(dates)):
+        statement = insert(BookingDayLock).values(appointment_date=day, version=1)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['appointment_date'],
+            set_={'version': BookingDayLock.version + 1}
+        ))
+
+def service_durations(*service_ids):
+    """Duração dos serviços lida do banco, por id
+    
+    A verificação de conflito e a ocupação marcada usam a duração gravada, não
+    a do catálogo em cache, que pode estar até CATALOG_TTL segundos atrasada.
+    As linhas dos serviços ficam travadas para leitura (FOR SHARE no
+    PostgreSQL) até o fim da transação, de modo que update_service espera as
+    escritas em andamento e estas não veem uma duração prestes a mudar. Deve
+    ser chamada antes de lock_booking_days: update_service trava o serviço e
+    depois os dias, e a mesma ordem evita deadlock. Serviços removidos ficam
+    de fora do resultado.
+    """
+    query = select(Service.id, Service.duration_minutes).where(
+        Service.id.in_(set(service_ids))
+    ).order_by(Service.id).with_for_update(read=True)
+    return dict(db.session.execute(query).all())
+
+def available_times(appointment_date, duration_minutes):
+    """Horários disponíveis (HH:MM) de uma data para a duração informada"""
+    schedule = get_schedule()
+    if not schedule.slot_grid(appointment_date, duration_minutes):
+        # Dia fechado: nem consulta os agendamentos
+        return []
+    # Ocupação materializada do dia: uma leitura pela chave primária, sem expandir séries
+    busy = load_day_bitmap(appointment_date)
+    return [minutes_to_str(slot) for slot in schedule.free_slots(appointment_date, busy, duration_minutes)]
+
+def is_slot_available(appointment_date, appointment_time, duration_minutes, exclude_booking_id=None,
+                      exclude_occurrence=None):
+    """Verificar se um horário está livre, ignorando opcionalmente um agendamento ou ocorrência"""
+    busy = load_busy_intervals(appointment_date, exclude_booking_id, exclude_occurrence)
+    start = time_to_minutes(appointment_time)
+    return not busy.has_conflict(start, start + duration_minutes)
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from src.models.agendai import db, Profile
+from src.utils.profile_cache import invalidate_profile
+
+logger = logging.getLogger(__name__)
+
+# Assinaturas (magic bytes) aceitas; a extensão enviada pelo cliente é ignorada
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+AVATAR_MAX_BYTES = 5 * 1024 * 1024
+# Imagens maiores que isso (em pixels) não são decodificadas, para evitar "bombas" de descompressão
+AVATAR_MAX_PIXELS = 40 * 1000 * 1000
+# Versões quadradas geradas (lado em pixels) e formatos de cada uma
+AVATAR_SIZES = (64, 256)
+AVATAR_FORMATS = (('webp', 'WEBP', {'quality': 80, 'method': 4}),
+                  ('jpg', 'JPEG', {'quality': 85, 'optimize': True, 'progressive': True}))
+# Tamanho exibido por padrão (avatar_url) depois que as versões ficam prontas
+AVATAR_DEFAULT_SIZE = 256
+# Arquivos de avatares antigos só são apagados depois disso, pois páginas em
+# cache ainda podem referenciá-los
+AVATAR_GC_GRACE = 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+# Nomes gerados: avatar-<hash>.<ext> (original) e avatar-<hash>-<tamanho>.<formato>
+AVATAR_PREFIX = 'avatar-'
+AVATAR_HASH_LENGTH = 16
+AVATAR_FILE = re.compile(rf'^{AVATAR_PREFIX}[0-9a-f]{{{AVATAR_HASH_LENGTH}}}(?:-\d+)?\.[a-z0-9]+$')
+
+class AvatarError(Exception):
+    """Upload de avatar inválido (tipo ou tamanho)"""
+    
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def uploads_folder():
+    return os.path.join(current_app.static_folder, 'uploads')
+
+def detect_image_type(header):
+    """Extensão correspondente aos primeiros bytes do arquivo, ou None"""
+    for signature, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+def verify_image(path):
+    """Confirmar com o Pillow que o arquivo é uma imagem válida; lança AvatarError
+    
+    A assinatura dos primeiros bytes não basta (ex.: "GIF89a" seguido de lixo).
+    Sem o Pillow só a assinatura é verificada.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        raise AvatarError('Arquivo de imagem inválido ou corrompido')
+
+def save_upload(stream, folder, max_bytes=AVATAR_MAX_BYTES):
+    """Gravar o upload em disco em blocos, validando tipo, tamanho e conteúdo
+    
+    Retorna o nome final, derivado do hash do conteúdo (avatar-<hash>.<ext>).
+    """
+    os.makedirs(folder, exist_ok=True)
+    header = stream.read(CHUNK_SIZE)
+    extension = detect_image_type(header)
+    if extension is None:
+        raise AvatarError('Tipo de arquivo não permitido')
+    
+    digest = hashlib.sha256()
+    size = 0
+    temp_path = os.path.join(folder, f'.upload-{uuid.uuid4().hex}')
+    try:
+        with open(temp_path, 'wb') as f:
+            chunk = header
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AvatarError(f'Arquivo maior que {max_bytes // (1024 * 1024)}MB', 413)
+                digest.update(chunk)
+                f.write(chunk)
+                chunk = stream.read(CHUNK_SIZE)
+        # Rejeitar antes de o arquivo ganhar o nome final e ir para o perfil
+        verify_image(temp_path)
+        filename = f'{AVATAR_PREFIX}{digest.hexdigest()[:AVATAR_HASH_LENGTH]}.{extension}'
+        os.replace(temp_path, os.path.join(folder, filename))
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return filename
+
+def avatar_key(filename):
+    """Prefixo comum ao original e às versões (avatar-<hash>)"""
+    if filename.startswith(AVATAR_PREFIX):
+        return filename[:len(AVATAR_PREFIX) + AVATAR_HASH_LENGTH]
+    return filename
+
+def create_variants(folder, filename):
+    """Gerar as versões redimensionadas; retorna {tamanho: {formato: nome}}
+    
+    Requer o Pillow; sem ele nenhuma versão é gerada e o original continua em uso.
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        logger.warning('Pillow não instalado: versões do avatar não serão geradas')
+        return {}
+    
+    key = avatar_key(filename)
+    variants = {}
+    with Image.open(os.path.join(folder, filename)) as image:
+        if image.width * image.height > AVATAR_MAX_PIXELS:
+            logger.warning('Avatar %s ignorado: %dx%d pixels', filename, image.width, image.height)
+            return {}
+        # Em JPEG, decodificar já reduzido (escala 1/2, 1/4, 1/8) quando possível
+        image.draft('RGB', (max(AVATAR_SIZES) * 2, max(AVATAR_SIZES) * 2))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Fundo branco para transparências (JPEG não tem canal alfa)
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+        
+        for size in sorted(AVATAR_SIZES, reverse=True):
+            resized = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            variants[size] = {}
+            for extension, pil_format, options in AVATAR_FORMATS:
+                name = f'{key}-{size}.{extension}'
+                temp_path = os.path.join(folder, f'.upload-{uuid.uuid4().hex}')
+                resized.save(temp_path, pil_format, **options)
+                os.replace(temp_path, os.path.join(folder, name))
+                variants[size][extension] = name
+    return variants
+
+def collect_garbage(folder, keep, grace=AVATAR_GC_GRACE):
+    """Apagar arquivos fora de uso (prefixo fora de `keep`) há mais de `grace` segundos"""
+    removed = 0
+    cutoff = time.time() - grace
+    for entry in os.scandir(folder):
+        if not entry.is_file() or avatar_key(entry.name) in keep:
+            continue
+        if entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+def _process_avatar(app, filename):
+    with app.app_context():
+        folder = uploads_folder()
+        original_url = f'/uploads/{filename}'
+        try:
+            variants = create_variants(folder, filename)
+        except Exception:
+            logger.exception('Falha ao gerar as versões do avatar %s', filename)
+            variants = {}
+        
+        urls = {str(size): {extension: f'/uploads/{name}' for extension, name in formats.items()}
+                for size, formats in variants.items()}
+        if urls:
+            # Só atualiza se este ainda for o avatar atual (outro upload pode ter chegado)
+            Profile.query.filter(Profile.avatar_url == original_url).update({
+                'avatar_url': urls[str(AVATAR_DEFAULT_SIZE)]['webp'],
+                'avatar_variants': json.dumps(urls)
+            }, synchronize_session=False)
+            db.session.commit()
+            invalidate_profile()
+        
+        # Mantém o avatar recém-enviado e o atual (outro upload pode ter chegado)
+        keep = {avatar_key(filename)}
+        profile = Profile.query.first()
+        if profile is not None:
+            keep.update(_keys_in_use(profile))
+        collect_garbage(folder, keep)
+
+def _keys_in_use(profile):
+    """Prefixos (ou nomes, para uploads antigos) dos arquivos referenciados pelo perfil"""
+    urls = [profile.avatar_url] if profile.avatar_url else []
+    for formats in json.loads(profile.avatar_variants or '{}').values():
+        urls.extend(formats.values())
+    return {avatar_key(url.rsplit('/', 1)[-1]) for url in urls}
+
+_lock = threading.Lock()
+_executor = None
+
+def _get_executor():
+    """Executor compartilhado, criado no primeiro uso (após o fork do gunicorn)"""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='agendai-avatar')
+    return _executor
+
+def schedule_processing(filename):
+    """Gerar versões e limpar avatares antigos fora da thread da requisição"""
+    app = current_app._get_current_object()
+    if app.config.get('AVATAR_PROCESS_SYNC'):
+        _process_avatar(app, filename)
+        return None
+    return _get_executor().submit(_process_avatar, app, filename)
@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+# Tempo máximo (segundos) de reutilização de um mês em cache. Escritas no próprio
+# processo invalidam o mês afetado imediatamente; o TTL limita o atraso
+# percebido por outros workers.
+CALENDAR_TTL = 30
+# Quantidade máxima de entradas (mês x modo) mantidas por aplicação
+CALENDAR_MAX_ENTRIES = 48
+
+_lock = threading.Lock()
+# Chave do cache em app.extensions (um cache por aplicação)
+EXTENSION_KEY = 'agendai_calendar_cache'
+
+def _entries():
+    return current_app.extensions.setdefault(EXTENSION_KEY, OrderedDict())
+
+def get_month(year, month, view, loader):
+    """Payload do calendário de um mês, calculado por loader() apenas em cache miss"""
+    key = (year, month, view)
+    with _lock:
+        entries = _entries()
+        entry = entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < CALENDAR_TTL:
+            entries.move_to_end(key)
+            return entry[1]
+    
+    payload = loader()
+    
+    with _lock:
+        entries = _entries()
+        entries[key] = (time.monotonic(), payload)
+        entries.move_to_end(key)
+        while len(entries) > CALENDAR_MAX_ENTRIES:
+            entries.popitem(last=False)
+    return payload
+
+def invalidate_months(*dates):
+    """Descartar os meses que contêm as datas informadas"""
+    months = {(day.year, day.month) for day in dates if day is not None}
+    with _lock:
+        entries = _entries()
+        for key in [key for key in entries if (key[0], key[1]) in months]:
+            del entries[key]
+
+def invalidate_calendar():
+    """Descartar todos os meses (ex.: serviço alterado, pois ele é embutido no payload)"""
+    with _lock:
+        current_app.extensions.pop(EXTENSION_KEY, None)
@@ -0,0 +1,51 @@
+import hashlib
+import json
+import threading
+import time
+from flask import current_app
+from src.models.agendai import Service
+
+# Tempo máximo (segundos) que um processo reutiliza o catálogo sem recarregar.
+# Escritas no próprio processo invalidam imediatamente; o TTL limita o tempo
+# em que outros workers podem servir um catálogo desatualizado.
+CATALOG_TTL = 30
+
+_lock = threading.Lock()
+# Chave do catálogo em app.extensions (um catálogo por aplicação)
+EXTENSION_KEY = 'agendai_service_catalog'
+
+class ServiceCatalog:
+    """Fotografia imutável da tabela de serviços já serializada"""
+    
+    def __init__(self, services):
+        self.services = [service.to_dict() for service in services]
+        self.by_id = {service['id']: service for service in self.services}
+        payload = json.dumps(self.services, sort_keys=True, separators=(',', ':'))
+        self.etag = hashlib.sha1(payload.encode()).hexdigest()
+        self.loaded_at = time.monotonic()
+
+def get_catalog():
+    """Retornar o catálogo em cache, recarregando-o se inválido ou expirado"""
+    extensions = current_app.extensions
+    catalog = extensions.get(EXTENSION_KEY)
+    if catalog is not None and time.monotonic() - catalog.loaded_at < CATALOG_TTL:
+        return catalog
+    with _lock:
+        catalog = extensions.get(EXTENSION_KEY)
+        if catalog is None or time.monotonic() - catalog.loaded_at >= CATALOG_TTL:
+            catalog = ServiceCatalog(Service.query.order_by(Service.created_at.desc()).all())
+            extensions[EXTENSION_KEY] = catalog
+        return catalog
+
+def invalidate_catalog():
+    """Descartar o catálogo; chamado após criar, atualizar ou excluir serviços"""
+    with _lock:
+        current_app.extensions.pop(EXTENSION_KEY, None)
+
+def get_cached_service(service_id):
+    """Dict do serviço a partir do catálogo, ou None se não existir"""
+    try:
+        service_id = int(service_id)
+    except (TypeError, ValueError):
+        return None
+    return get_catalog().by_id.get(service_id)
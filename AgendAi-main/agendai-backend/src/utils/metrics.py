@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Limites (segundos) dos histogramas de latência, no estilo dos padrões do Prometheus
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites da quantidade de consultas SQL por requisição
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# Tamanho máximo dos parâmetros reproduzidos no log de consultas lentas
+MAX_LOGGED_PARAMS = 500
+
+# Chave do registro de métricas em app.extensions (um por aplicação)
+EXTENSION_KEY = 'agendai_metrics'
+
+class Histogram:
+    """Histograma de limites fixos; a contagem acumulada só é feita na exportação"""
+    
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        # Prometheus usa le (<=): bisect_left encontra o primeiro limite >= valor
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+
+def _histogram_lines(name, labels, histogram):
+    prefix = _labels(labels)
+    separator = ',' if prefix else ''
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}{separator}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{prefix}{separator}le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{{prefix}}} {histogram.sum}')
+    lines.append(f'{name}_count{{{prefix}}} {histogram.count}')
+    return lines
+
+class Metrics:
+    """Registro em memória das métricas do processo
+    
+    Cada observação é um incremento sob uma trava curta; a formatação no
+    padrão do Prometheus só acontece quando /api/metrics é consultado.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (método, endpoint, status) -> Histogram de latência
+        self.latency = {}
+        # endpoint -> (Histogram de consultas, Histogram de tempo em SQL)
+        self.request_sql = {}
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.slow_queries = 0
+    
+    def observe_request(self, method, endpoint, status, seconds, queries, sql_seconds):
+        key = (method, endpoint, status)
+        with self._lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            sql = self.request_sql.get(endpoint)
+            if sql is None:
+                sql = self.request_sql[endpoint] = (Histogram(QUERY_COUNT_BUCKETS), Histogram(LATENCY_BUCKETS))
+            sql[0].observe(queries)
+            sql[1].observe(sql_seconds)
+    
+    def observe_query(self, seconds, slow):
+        with self._lock:
+            self.sql_queries += 1
+            self.sql_seconds += seconds
+            if slow:
+                self.slow_queries += 1
+    
+    def render(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        lines = [
+            '# HELP agendai_http_request_duration_seconds Latência das requisições por endpoint',
+            '# TYPE agendai_http_request_duration_seconds histogram'
+        ]
+        # A formatação é rápida (um histograma por endpoint): feita sob a trava
+        with self._lock:
+            for (method, endpoint, status), histogram in sorted(self.latency.items()):
+                lines.extend(_histogram_lines(
+                    'agendai_http_request_duration_seconds',
+                    (('method', method), ('endpoint', endpoint), ('status', status)),
+                    histogram
+                ))
+            lines.extend([
+                '# HELP agendai_http_request_sql_queries Consultas SQL por requisição',
+                '# TYPE agendai_http_request_sql_queries histogram'
+            ])
+            for endpoint, (queries, _) in sorted(self.request_sql.items()):
+                lines.extend(_histogram_lines('agendai_http_request_sql_queries', (('endpoint', endpoint),), queries))
+            lines.extend([
+                '# HELP agendai_http_request_sql_seconds Tempo em SQL por requisição',
+                '# TYPE agendai_http_request_sql_seconds histogram'
+            ])
+            for endpoint, (_, seconds) in sorted(self.request_sql.items()):
+                lines.extend(_histogram_lines('agendai_http_request_sql_seconds', (('endpoint', endpoint),), seconds))
+            lines.extend([
+                '# HELP agendai_sql_queries_total Consultas SQL executadas pelo processo',
+                '# TYPE agendai_sql_queries_total counter',
+                f'agendai_sql_queries_total {self.sql_queries}',
+                '# HELP agendai_sql_seconds_total Tempo total em consultas SQL',
+                '# TYPE agendai_sql_seconds_total counter',
+                f'agendai_sql_seconds_total {self.sql_seconds}',
+                '# HELP agendai_sql_slow_queries_total Consultas acima de SLOW_QUERY_MS',
+                '# TYPE agendai_sql_slow_queries_total counter',
+                f'agendai_sql_slow_queries_total {self.slow_queries}'
+            ])
+        return '\n'.join(lines) + '\n'
+
+def _format_params(parameters):
+    text = repr(parameters)
+    if len(text) > MAX_LOGGED_PARAMS:
+        text = text[:MAX_LOGGED_PARAMS] + '...'
+    return text
+
+def install_metrics(app, engine):
+    """Registrar os ganchos de latência por requisição e de contagem de SQL
+    
+    Deve ser chamada uma vez por aplicação, depois de db.init_app.
+    """
+    metrics = app.extensions[EXTENSION_KEY] = Metrics()
+    slow_seconds = app.config.get('SLOW_QUERY_MS', 200) / 1000
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        # O início fica no contexto de execução, descartado junto com ele se a consulta falhar
+        if context is not None:
+            context.agendai_query_start = time.perf_counter()
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def finish_query(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, 'agendai_query_start', None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        slow = elapsed >= slow_seconds
+        metrics.observe_query(elapsed, slow)
+        in_request = has_request_context()
+        if in_request:
+            sql = g.get('agendai_sql')
+            if sql is not None:
+                sql[0] += 1
+                sql[1] += elapsed
+        if slow:
+            logger.warning(
+                'Consulta lenta (%.1f ms) em %s: %s | parâmetros: %s',
+                elapsed * 1000, request.path if in_request else '-', statement, _format_params(parameters)
+            )
+    
+    @app.before_request
+    def start_request():
+        g.agendai_request_start = time.perf_counter()
+        g.agendai_sql = [0, 0.0]
+    
+    @app.after_request
+    def record_request(response):
+        start = g.pop('agendai_request_start', None)
+        if start is None:
+            return response
+        # Em respostas em streaming mede-se até o início do envio
+        elapsed = time.perf_counter() - start
+        queries, sql_seconds = g.pop('agendai_sql', (0, 0.0))
+        endpoint = request.endpoint or 'unmatched'
+        try:
+            metrics.observe_request(request.method, endpoint, response.status_code, elapsed, queries, sql_seconds)
+        except Exception:
+            # Falha nas métricas não deve trocar a resposta por um erro 500
+            current_app.logger.exception('Falha ao registrar métricas de %s %s', request.method, request.path)
+        if response.status_code >= 500 and response.is_json:
+            # As rotas capturam a exceção e devolvem só a mensagem; registrá-la aqui
+            current_app.logger.error(
+                'Erro %d em %s %s (%s): %s', response.status_code, request.method, request.path,
+                endpoint, (response.get_json(silent=True) or {}).get('error')
+            )
+        return response
+    
+    return metrics
+
+def get_metrics(app):
+    """Registro de métricas da aplicação, ou None se as métricas estiverem desligadas"""
+    return app.extensions.get(EXTENSION_KEY)
@@ -0,0 +1,213 @@
+from datetime import timedelta
+from sqlalchemy import delete, func, select
+from src.models.agendai import db, Booking, BookingSeries, DayOccupancy, SeriesOverride, Service
+from src.utils.recurrence import load_occurrences, series_span
+
+# Um bit por minuto do dia (bit m = minuto m ocupado): 1440 bits em 180 bytes.
+# A resolução de um minuto mantém o resultado idêntico ao das listas de intervalos
+# mesmo com horários fora da grade de 5 minutos.
+MINUTES_PER_DAY = 24 * 60
+BITMAP_BYTES = MINUTES_PER_DAY // 8
+# Datas consultadas por bloco (limite de parâmetros do SQLite)
+CHUNK_SIZE = 500
+
+def interval_bits(start, end):
+    """Máscara dos minutos [start, end) dentro do dia"""
+    start = max(start, 0)
+    end = min(end, MINUTES_PER_DAY)
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+class DayBitmap:
+    """Ocupação de um dia como inteiro de 1440 bits
+    
+    Oferece a mesma interface de BusyIntervals usada pela agenda
+    (free_slots_in e has_conflict), com operações de bits no lugar da
+    varredura de intervalos.
+    """
+    
+    __slots__ = ('bits',)
+    
+    def __init__(self, bits=0):
+        self.bits = bits
+    
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(int.from_bytes(data, 'little') if data else 0)
+    
+    def to_bytes(self):
+        return self.bits.to_bytes(BITMAP_BYTES, 'little')
+    
+    def __len__(self):
+        return bin(self.bits).count('1')
+    
+    def add(self, start, end):
+        self.bits |= interval_bits(start, end)
+    
+    def has_conflict(self, start, end):
+        return bool(self.bits & interval_bits(start, end))
+    
+    def free_slots_in(self, grid, duration):
+        """Filtrar uma grade de inícios, mantendo os que têm ``duration`` minutos livres"""
+        busy = self.bits
+        if not busy:
+            return list(grid)
+        # Espalhar cada minuto ocupado para os duration - 1 minutos anteriores
+        # (dobrando o deslocamento): o bit s fica ligado se [s, s + duration) tem conflito
+        span = 1
+        while span < duration:
+            shift = min(span, duration - span)
+            busy |= busy >> shift
+            span += shift
+        return [slot for slot in grid if not busy >> slot & 1]
+
+def _executor(connection):
+    return connection if connection is not None else db.session
+
+def compute_bitmaps(dates, connection=None):
+    """Calcular a ocupação das datas a partir dos agendamentos e das séries"""
+    dates = sorted(set(dates))
+    bitmaps = {day: 0 for day in dates}
+    if not dates:
+        return bitmaps
+    executor = _executor(connection)
+    for offset in range(0, len(dates), CHUNK_SIZE):
+        chunk = dates[offset:offset + CHUNK_SIZE]
+        for appointment_date, appointment_time, duration in executor.execute(select(
+            Booking.appointment_date, Booking.appointment_time, Service.duration_minutes
+        ).join(
+            Service, Booking.service_id == Service.id
+        ).where(
+            Booking.appointment_date.in_(chunk), Booking.status != 'cancelled'
+        )):
+            start = appointment_time.hour * 60 + appointment_time.minute
+            bitmaps[appointment_date] |= interval_bits(start, start + duration)
+    for occurrence in load_occurrences(dates[0], dates[-1], connection=connection):
+        if occurrence.date in bitmaps:
+            start = occurrence.time.hour * 60 + occurrence.time.minute
+            bitmaps[occurrence.date] |= interval_bits(start, start + occurrence.duration)
+    return bitmaps
+
+def _store(bitmaps, connection=None):
+    """Gravar as ocupações; dias sem nenhum minuto ocupado não têm linha"""
+    executor = _executor(connection)
+    dialect = connection.dialect if connection is not None else db.engine.dialect
+    if dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    empty = [day for day, bits in bitmaps.items() if not bits]
+    for offset in range(0, len(empty), CHUNK_SIZE):
+        executor.execute(delete(DayOccupancy).where(DayOccupancy.appointment_date.in_(empty[offset:offset + CHUNK_SIZE])))
+    rows = [
+        {'appointment_date': day, 'bitmap': DayBitmap(bits).to_bytes()}
+        for day, bits in sorted(bitmaps.items()) if bits
+    ]
+    for offset in range(0, len(rows), CHUNK_SIZE):
+        statement = insert(DayOccupancy).values(rows[offset:offset + CHUNK_SIZE])
+        executor.execute(statement.on_conflict_do_update(
+            index_elements=['appointment_date'],
+            set_={'bitmap': statement.excluded.bitmap}
+        ))
+
+def rebuild_days(*dates, connection=None):
+    """Recalcular a ocupação das datas informadas (na transação atual)
+    
+    Usado quando um intervalo deixa o dia (cancelamento, remarcação, série
+    encerrada): limpar só os bits do agendamento não distingue sobreposições.
+    """
+    _store(compute_bitmaps([day for day in dates if day is not None], connection), connection)
+
+def mark_busy(intervals_by_date):
+    """Ligar incrementalmente os minutos de {data: [(início, fim), ...]} (na transação atual)
+    
+    Deve ser chamada com os dias já travados por lock_booking_days, o que
+    serializa a leitura e a regravação do bitmap de cada dia.
+    """
+    dates = sorted(intervals_by_date)
+    bitmaps = dict.fromkeys(dates, 0)
+    for offset in range(0, len(dates), CHUNK_SIZE):
+        for appointment_date, data in db.session.execute(select(
+            DayOccupancy.appointment_date, DayOccupancy.bitmap
+        ).where(DayOccupancy.appointment_date.in_(dates[offset:offset + CHUNK_SIZE]))):
+            bitmaps[appointment_date] = DayBitmap.from_bytes(data).bits
+    for day, intervals in intervals_by_date.items():
+        for start, end in intervals:
+            bitmaps[day] |= interval_bits(start, end)
+    _store(bitmaps)
+
+def service_days(service_id):
+    """Dias com agendamentos ou ocorrências de um serviço
+    
+    Usado quando a duração muda: esses dias devem ser travados com
+    lock_booking_days e recalculados com rebuild_days.
+    """
+    dates = set(db.session.scalars(select(Booking.appointment_date).distinct().where(
+        Booking.service_id == service_id, Booking.status != 'cancelled'
+    )))
+    first, last = db.session.execute(select(
+        func.min(BookingSeries.start_date), func.max(BookingSeries.last_date)
+    ).where(BookingSeries.service_id == service_id, BookingSeries.status == 'active')).one()
+    if first is not None:
+        moved_first, moved_last = db.session.execute(select(
+            func.min(SeriesOverride.new_date), func.max(SeriesOverride.new_date)
+        ).join(
+            BookingSeries, SeriesOverride.series_id == BookingSeries.id
+        ).where(BookingSeries.service_id == service_id)).one()
+        if moved_first is not None:
+            first, last = min(first, moved_first), max(last, moved_last)
+        dates.update(
+            occurrence.date for occurrence in load_occurrences(first, last)
+            if occurrence.service_id == service_id
+        )
+    return dates
+
+def load_day_bitmap(appointment_date):
+    """Ocupação de uma data com uma consulta pela chave primária"""
+    data = db.session.execute(
+        select(DayOccupancy.bitmap).where(DayOccupancy.appointment_date == appointment_date)
+    ).scalar()
+    return DayBitmap.from_bytes(data)
+
+def load_day_bitmaps(start_date, end_date):
+    """Ocupação de cada data do período (dias sem linha estão livres)"""
+    stored = dict(db.session.execute(select(DayOccupancy.appointment_date, DayOccupancy.bitmap).where(
+        DayOccupancy.appointment_date >= start_date, DayOccupancy.appointment_date <= end_date
+    )).all())
+    bitmaps = {}
+    current = start_date
+    while current <= end_date:
+        bitmaps[current] = DayBitmap.from_bytes(stored.get(current))
+        current += timedelta(days=1)
+    return bitmaps
+
+def rebuild_all(connection=None):
+    """Regenerar toda a tabela de ocupação a partir de bookings e das séries
+    
+    Retorna a quantidade de dias com ocupação gravados.
+    """
+    executor = _executor(connection)
+    bitmaps = {}
+    result = executor.execute(select(
+        Booking.appointment_date, Booking.appointment_time, Service.duration_minutes
+    ).join(
+        Service, Booking.service_id == Service.id
+    ).where(Booking.status != 'cancelled'))
+    while True:
+        rows = result.fetchmany(5000)
+        if not rows:
+            break
+        for appointment_date, appointment_time, duration in rows:
+            start = appointment_time.hour * 60 + appointment_time.minute
+            bitmaps[appointment_date] = bitmaps.get(appointment_date, 0) | interval_bits(start, start + duration)
+    
+    first, last = series_span(connection)
+    if first is not None:
+        for occurrence in load_occurrences(first, last, connection=connection):
+            start = occurrence.time.hour * 60 + occurrence.time.minute
+            bitmaps[occurrence.date] = bitmaps.get(occurrence.date, 0) | interval_bits(start, start + occurrence.duration)
+    
+    executor.execute(delete(DayOccupancy))
+    _store(bitmaps, connection)
+    return sum(1 for bits in bitmaps.values() if bits)
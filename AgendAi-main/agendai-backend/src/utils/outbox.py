@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.orm import aliased
+from src.models.agendai import db, OutboxEvent
+from src.utils.recurrence import occurrence_id
+from src.utils.supabase_rest import SupabaseError, get_supabase
+
+logger = logging.getLogger(__name__)
+
+# Tabela do Supabase que espelha os agendamentos locais
+AGENDAMENTOS_TABLE = 'agendamentos'
+# Coluna única usada no upsert; deve existir (com índice UNIQUE) na tabela remota
+IDEMPOTENCY_COLUMN = 'idempotency_key'
+# Eventos enviados por lote e intervalo entre varreduras da fila vazia
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_POLL_INTERVAL = float(os.environ.get('AGENDAI_OUTBOX_POLL_INTERVAL', 2))
+# Espera máxima entre novas tentativas de um evento que falhou
+OUTBOX_MAX_BACKOFF = 300
+# Tempo que um lote reservado fica fora da fila enquanto é enviado; se o processo
+# morrer no meio do envio, os eventos voltam a ficar disponíveis depois disso
+OUTBOX_LEASE_SECONDS = 120
+# Falhas seguidas após as quais um evento é abandonado (status 'dead') e sai da fila
+OUTBOX_MAX_ATTEMPTS = 10
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    'sent_total': 0,
+    'failed_batches_total': 0,
+    'dead_total': 0,
+    'last_success_at': None,
+    'last_error': None
+}
+
+def enqueue(target_table, idempotency_key, payload):
+    """Adicionar um evento à fila na transação atual (sem commit)"""
+    payload = dict(payload, **{IDEMPOTENCY_COLUMN: idempotency_key})
+    db.session.add(OutboxEvent(
+        target_table=target_table,
+        idempotency_key=idempotency_key,
+        payload=json.dumps(payload, ensure_ascii=False)
+    ))
+
+def booking_payload(booking, service_name):
+    """Registro da tabela agendamentos correspondente a um agendamento local"""
+    return {
+        'nome': booking.client_name,
+        'email': booking.client_contact,
+        'servico': service_name,
+        'data': f"{booking.appointment_date.isoformat()}T{booking.appointment_time.strftime('%H:%M')}",
+        'status': booking.status
+    }
+
+def enqueue_booking(booking, service_name):
+    """Enfileirar o estado atual de um agendamento (já com id) para sincronização"""
+    enqueue(AGENDAMENTOS_TABLE, f'booking-{booking.id}', booking_payload(booking, service_name))
+
+def enqueue_occurrence(series, original_date, appointment_date, appointment_time, status, service_name):
+    """Enfileirar o estado de uma ocorrência de série (já com id)
+    
+    Cada ocorrência é um registro próprio em agendamentos, identificado pela
+    série e pela data original, como em occurrence_id.
+    """
+    occurrence = SimpleNamespace(
+        client_name=series.client_name,
+        client_contact=series.client_contact,
+        appointment_date=appointment_date,
+        appointment_time=appointment_time,
+        status=status
+    )
+    enqueue(AGENDAMENTOS_TABLE, f'occurrence-{occurrence_id(series.id, original_date)}',
+            booking_payload(occurrence, service_name))
+
+def claim_events(batch_size=OUTBOX_BATCH_SIZE, now=None):
+    """Reservar um lote de eventos pendentes para este processo; retorna os ids
+    
+    Cada worker (um por processo do gunicorn) reserva o lote adiantando
+    next_attempt_at, numa transação própria e em uma única instrução, antes de
+    enviá-lo: os demais não pegam os mesmos eventos. No PostgreSQL as linhas
+    já travadas por outro worker são puladas (SKIP LOCKED); no SQLite a
+    instrução roda sob a trava de escrita do banco.
+    
+    Um evento não é reservado enquanto houver um evento mais antigo da mesma
+    chave reservado ou aguardando nova tentativa, para que um envio lento não
+    sobrescreva no Supabase um estado mais recente.
+    """
+    now = now or datetime.utcnow()
+    older = aliased(OutboxEvent)
+    blocked = exists().where(
+        older.target_table == OutboxEvent.target_table,
+        older.idempotency_key == OutboxEvent.idempotency_key,
+        older.id < OutboxEvent.id,
+        older.status == 'pending',
+        older.next_attempt_at > now
+    )
+    candidates = select(OutboxEvent.id).where(
+        OutboxEvent.status == 'pending', OutboxEvent.next_attempt_at <= now, ~blocked
+    ).order_by(OutboxEvent.id).limit(batch_size).with_for_update(skip_locked=True)
+    claimed = db.session.scalars(
+        update(OutboxEvent).where(
+            OutboxEvent.id.in_(candidates), OutboxEvent.next_attempt_at <= now
+        ).values(
+            next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+        ).returning(OutboxEvent.id).execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return claimed
+
+def _mark_failed(events, error, now):
+    """Registrar a falha de envio: nova tentativa com espera exponencial ou abandono"""
+    for event in events:
+        event.attempts += 1
+        event.last_error = str(error)[:1000]
+        if event.attempts >= OUTBOX_MAX_ATTEMPTS:
+            event.status = 'dead'
+            logger.error('Evento %s (%s) abandonado após %d tentativas: %s',
+                         event.id, event.idempotency_key, event.attempts, error)
+            with _metrics_lock:
+                _metrics['dead_total'] += 1
+        else:
+            delay = min(OUTBOX_MAX_BACKOFF, 2 ** event.attempts)
+            event.next_attempt_at = now + timedelta(seconds=delay)
+
+def _mark_sent(table, events):
+    """Remover da fila os eventos enviados e os mais antigos das mesmas chaves
+    
+    Eventos antigos das mesmas chaves (em espera ou abandonados) também saem,
+    pois o estado enviado já os substitui.
+    """
+    OutboxEvent.query.filter(
+        OutboxEvent.target_table == table,
+        OutboxEvent.idempotency_key.in_({event.idempotency_key for event in events}),
+        OutboxEvent.id <= max(event.id for event in events)
+    ).delete(synchronize_session=False)
+    with _metrics_lock:
+        _metrics['sent_total'] += len(events)
+        _metrics['last_success_at'] = datetime.utcnow()
+    return len(events)
+
+def _upsert(table, rows):
+    get_supabase().upsert(table, rows, on_conflict=IDEMPOTENCY_COLUMN)
+
+def process_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    """Enviar um lote de eventos pendentes; retorna quantos foram confirmados
+    
+    O lote é reservado antes do envio (claim_events). Eventos com a mesma
+    chave de idempotência no lote são reduzidos ao mais recente, e cada tabela
+    recebe um único upsert em lote. Se o Supabase rejeitar o lote (4xx), as
+    linhas são reenviadas uma a uma, de modo que só a linha inválida falha e
+    não trava as demais.
+    """
+    claimed = claim_events(batch_size)
+    if not claimed:
+        return 0
+    now = datetime.utcnow()
+    events = OutboxEvent.query.filter(OutboxEvent.id.in_(claimed)).order_by(OutboxEvent.id).all()
+    
+    events_by_table = {}
+    for event in events:
+        events_by_table.setdefault(event.target_table, []).append(event)
+    
+    sent = 0
+    for table, table_events in events_by_table.items():
+        events_by_key = {}
+        for event in table_events:
+            events_by_key.setdefault(event.idempotency_key, []).append(event)
+        # Somente o estado mais recente de cada chave é enviado
+        rows = {key: json.loads(key_events[-1].payload) for key, key_events in events_by_key.items()}
+        try:
+            _upsert(table, list(rows.values()))
+        except SupabaseError as e:
+            with _metrics_lock:
+                _metrics['failed_batches_total'] += 1
+                _metrics['last_error'] = str(e)
+            logger.warning('Falha ao sincronizar %d evento(s) com %s: %s', len(table_events), table, e)
+            if not (e.status_code and 400 <= e.status_code < 500 and len(rows) > 1):
+                # Falha do Supabase ou da rede: o lote inteiro aguarda nova tentativa
+                _mark_failed(table_events, e, now)
+                continue
+            # Lote rejeitado: isolar a(s) linha(s) inválida(s)
+            for key, row in rows.items():
+                try:
+                    _upsert(table, [row])
+                except SupabaseError as row_error:
+                    _mark_failed(events_by_key[key], row_error, now)
+                else:
+                    sent += _mark_sent(table, events_by_key[key])
+            continue
+        
+        sent += _mark_sent(table, table_events)
+    
+    db.session.commit()
+    return sent
+
+def outbox_stats():
+    """Profundidade e atraso da fila, eventos abandonados e os contadores deste processo"""
+    depth, oldest = db.session.query(
+        func.count(OutboxEvent.id), func.min(OutboxEvent.created_at)
+    ).filter(OutboxEvent.status == 'pending').one()
+    dead = OutboxEvent.query.filter(OutboxEvent.status == 'dead').count()
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    return {
+        'depth': depth,
+        'lag_seconds': (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0,
+        'dead': dead,
+        'sent_total': metrics['sent_total'],
+        'failed_batches_total': metrics['failed_batches_total'],
+        'dead_total': metrics['dead_total'],
+        'last_success_at': metrics['last_success_at'].isoformat() if metrics['last_success_at'] else None,
+        'last_error': metrics['last_error']
+    }
+
+def _worker_loop(app, stop_event):
+    while not stop_event.is_set():
+        sent = 0
+        try:
+            with app.app_context():
+                sent = process_outbox()
+        except Exception:
+            logger.exception('Erro no worker da fila de sincronização')
+        # Continuar imediatamente enquanto houver lotes cheios
+        if sent < OUTBOX_BATCH_SIZE:
+            stop_event.wait(OUTBOX_POLL_INTERVAL)
+
+def start_outbox_worker(app):
+    """Iniciar (uma vez por aplicação) a thread que esvazia a fila em segundo plano"""
+    if 'agendai_outbox_worker' in app.extensions:
+        return app.extensions['agendai_outbox_worker']
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=_worker_loop, args=(app, stop_event), name='agendai-outbox', daemon=True
+    )
+    thread.start()
+    app.extensions['agendai_outbox_worker'] = (thread, stop_event)
+    return thread, stop_event
+
+def stop_outbox_worker(app, timeout=5):
+    """Sinalizar o fim da thread da fila e aguardar o lote em andamento"""
+    worker = app.extensions.pop('agendai_outbox_worker', None)
+    if worker is None:
+        return
+    thread, stop_event = worker
+    stop_event.set()
+    thread.join(timeout)
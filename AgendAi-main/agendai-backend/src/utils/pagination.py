@@ -0,0 +1,70 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+from src.models.agendai import Booking
+
+# Tamanho padrão e máximo de página da listagem de agendamentos
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(booking):
+    """Gerar o cursor opaco que aponta para depois do agendamento informado"""
+    raw = f"{booking.appointment_date.isoformat()}|{booking.appointment_time.strftime('%H:%M:%S')}|{booking.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decodificar um cursor em (data, horário, id); lança ValueError se inválido"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_str, time_str, booking_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return (
+            datetime.strptime(date_str, '%Y-%m-%d').date(),
+            datetime.strptime(time_str, '%H:%M:%S').time(),
+            int(booking_id)
+        )
+    except (TypeError, UnicodeDecodeError, ValueError, base64.binascii.Error):
+        raise ValueError('cursor inválido')
+
+def parse_page_size(value):
+    """Interpretar o parâmetro limit; lança ValueError se inválido"""
+    if value is None or value == '':
+        return DEFAULT_PAGE_SIZE
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit deve ser maior que zero')
+    return min(limit, MAX_PAGE_SIZE)
+
+def paginate_bookings(query, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Aplicar paginação por chave em (data, horário, id), do mais recente ao mais antigo
+    
+    Retorna (agendamentos, próximo cursor ou None).
+    """
+    if cursor:
+        cursor_date, cursor_time, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                Booking.appointment_date < cursor_date,
+                and_(
+                    Booking.appointment_date == cursor_date,
+                    Booking.appointment_time < cursor_time
+                ),
+                and_(
+                    Booking.appointment_date == cursor_date,
+                    Booking.appointment_time == cursor_time,
+                    Booking.id < cursor_id
+                )
+            )
+        )
+    
+    # Buscar um registro a mais para saber se existe próxima página
+    bookings = query.order_by(
+        Booking.appointment_date.desc(),
+        Booking.appointment_time.desc(),
+        Booking.id.desc()
+    ).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        next_cursor = encode_cursor(bookings[-1])
+    return bookings, next_cursor
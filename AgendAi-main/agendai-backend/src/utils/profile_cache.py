@@ -0,0 +1,71 @@
+import hashlib
+import json
+import threading
+import time
+from flask import current_app
+from src.models.agendai import db, Profile
+
+# Tempo máximo (segundos) que um processo reutiliza o perfil sem reler o banco.
+# Escritas no próprio processo atualizam o cache na hora (write-through); o TTL
+# limita o tempo em que outros workers podem servir um perfil desatualizado.
+PROFILE_TTL = 30
+# O perfil é único: a linha padrão sempre usa este id
+DEFAULT_PROFILE_ID = 1
+
+_lock = threading.Lock()
+# Chave do cache em app.extensions (um perfil por aplicação)
+EXTENSION_KEY = 'agendai_profile_cache'
+
+class ProfileSnapshot:
+    """Perfil já serializado, com ETag calculado uma vez"""
+    
+    def __init__(self, profile):
+        self.data = profile.to_dict()
+        payload = json.dumps(self.data, sort_keys=True, separators=(',', ':'))
+        self.etag = hashlib.sha1(payload.encode()).hexdigest()
+        self.loaded_at = time.monotonic()
+
+def get_or_create_profile():
+    """Linha do perfil, criando a padrão se ainda não existir (sem commit)
+    
+    A criação usa INSERT ... ON CONFLICT DO NOTHING com id fixo, então
+    requisições simultâneas no primeiro acesso resultam em uma única linha.
+    """
+    profile = Profile.query.order_by(Profile.id).first()
+    if profile is not None:
+        return profile
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    db.session.execute(insert(Profile).values(
+        id=DEFAULT_PROFILE_ID, full_name='', clinic_name='', email='', phone='', avatar_url=None
+    ).on_conflict_do_nothing(index_elements=['id']))
+    return Profile.query.order_by(Profile.id).first()
+
+def get_profile_snapshot():
+    """Retornar o perfil em cache, relendo (ou criando) a linha se expirado"""
+    extensions = current_app.extensions
+    snapshot = extensions.get(EXTENSION_KEY)
+    if snapshot is not None and time.monotonic() - snapshot.loaded_at < PROFILE_TTL:
+        return snapshot
+    with _lock:
+        snapshot = extensions.get(EXTENSION_KEY)
+        if snapshot is None or time.monotonic() - snapshot.loaded_at >= PROFILE_TTL:
+            profile = get_or_create_profile()
+            db.session.commit()
+            snapshot = ProfileSnapshot(profile)
+            extensions[EXTENSION_KEY] = snapshot
+        return snapshot
+
+def store_profile(profile):
+    """Atualizar o cache com o perfil recém-gravado (chamar após o commit)"""
+    snapshot = ProfileSnapshot(profile)
+    with _lock:
+        current_app.extensions[EXTENSION_KEY] = snapshot
+    return snapshot
+
+def invalidate_profile():
+    """Descartar o perfil em cache; chamado por escritas feitas fora das rotas"""
+    with _lock:
+        current_app.extensions.pop(EXTENSION_KEY, None)
@@ -0,0 +1,138 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime
+from flask import current_app, g, request
+
+# Cabeçalho que ativa o profiling de uma requisição (valor = PROFILE_SECRET)
+PROFILE_HEADER = 'X-Profile'
+# Cabeçalho da resposta com o id do arquivo gerado
+PROFILE_ID_HEADER = 'X-Profile-Id'
+# Quantidade de perfis mantidos em disco (os mais antigos são apagados)
+DEFAULT_PROFILE_MAX_FILES = 20
+# Nome dos arquivos: <data e hora>-<endpoint>-<duração>ms.pstats
+PROFILE_NAME = re.compile(r'^(\d{8}T\d{12})-([\w.]+)-(\d+)ms\.pstats$')
+
+_lock = threading.Lock()
+# Chave do estado do modo administrativo em app.extensions (um por aplicação)
+EXTENSION_KEY = 'agendai_profiler'
+
+def profiles_folder(app=None):
+    app = app or current_app
+    return app.config.get('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'agendai-profiles')
+
+def check_secret(value):
+    """Comparar o valor informado com PROFILE_SECRET em tempo constante"""
+    secret = current_app.config.get('PROFILE_SECRET')
+    return bool(secret and value) and hmac.compare_digest(value, secret)
+
+def get_toggle():
+    """Estado do modo administrativo: {'endpoint': str|None, 'remaining': int}"""
+    return current_app.extensions.setdefault(EXTENSION_KEY, {'endpoint': None, 'remaining': 0})
+
+def set_toggle(endpoint, count):
+    """Perfilar as próximas ``count`` requisições (opcionalmente de um só endpoint)"""
+    with _lock:
+        toggle = get_toggle()
+        toggle['endpoint'] = endpoint
+        toggle['remaining'] = count
+        return dict(toggle)
+
+def _claim_toggle(endpoint):
+    """Consumir uma requisição do modo administrativo, se ele a cobrir"""
+    toggle = current_app.extensions.get(EXTENSION_KEY)
+    if not toggle or toggle['remaining'] <= 0:
+        return False
+    with _lock:
+        if toggle['remaining'] <= 0 or toggle['endpoint'] not in (None, endpoint):
+            return False
+        toggle['remaining'] -= 1
+        return True
+
+def list_profiles(folder):
+    """Perfis guardados, do mais recente para o mais antigo"""
+    if not os.path.isdir(folder):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(folder), reverse=True):
+        match = PROFILE_NAME.match(name)
+        if not match:
+            continue
+        profiles.append({
+            'id': name,
+            'created_at': datetime.strptime(match.group(1), '%Y%m%dT%H%M%S%f').isoformat(),
+            'endpoint': match.group(2),
+            'duration_ms': int(match.group(3)),
+            'size': os.path.getsize(os.path.join(folder, name))
+        })
+    return profiles
+
+def profile_summary(path, limit=40):
+    """Resumo em texto de um .pstats, ordenado pelo tempo acumulado"""
+    output = io.StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return output.getvalue()
+
+def _save_profile(profiler, endpoint, elapsed):
+    """Gravar o perfil e apagar os mais antigos além de PROFILE_MAX_FILES"""
+    app = current_app
+    folder = profiles_folder(app)
+    name = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{endpoint}-{int(elapsed * 1000)}ms.pstats"
+    max_files = app.config.get('PROFILE_MAX_FILES', DEFAULT_PROFILE_MAX_FILES)
+    with _lock:
+        os.makedirs(folder, exist_ok=True)
+        profiler.dump_stats(os.path.join(folder, name))
+        names = sorted(name for name in os.listdir(folder) if PROFILE_NAME.match(name))
+        for old in names[:-max_files] if max_files > 0 else names:
+            try:
+                os.remove(os.path.join(folder, old))
+            except FileNotFoundError:
+                pass
+    return name
+
+def install_profiler(app):
+    """Registrar o profiling sob demanda (só quando PROFILE_SECRET está definido)
+    
+    Uma requisição é perfilada quando traz o cabeçalho X-Profile com o segredo
+    ou quando o modo administrativo (PUT /api/profiler) a cobre. As demais só
+    pagam a leitura de um cabeçalho.
+    """
+    @app.before_request
+    def start_profiling():
+        endpoint = request.endpoint or 'unmatched'
+        if endpoint.startswith('profiler.'):
+            return
+        if not check_secret(request.headers.get(PROFILE_HEADER)) and not _claim_toggle(endpoint):
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Outro profiler já ativo nesta thread (ex.: depurador)
+            return
+        g.agendai_profile = (profiler, time.perf_counter())
+    
+    @app.after_request
+    def finish_profiling(response):
+        profile = g.pop('agendai_profile', None)
+        if profile is None:
+            return response
+        profiler, start = profile
+        profiler.disable()
+        name = _save_profile(profiler, request.endpoint or 'unmatched', time.perf_counter() - start)
+        response.headers[PROFILE_ID_HEADER] = name
+        return response
+    
+    @app.teardown_request
+    def stop_profiling(exception=None):
+        # Garantir que o profiler seja desligado mesmo se after_request não rodar
+        profile = g.pop('agendai_profile', None)
+        if profile is not None:
+            profile[0].disable()
@@ -0,0 +1,191 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import and_, false, func, or_, select
+from src.models.agendai import db, BookingSeries, SeriesOverride, Service
+
+# Quantidade máxima de ocorrências de uma série (dois anos semanais)
+MAX_SERIES_OCCURRENCES = 104
+# Frequências aceitas e o intervalo correspondente em semanas
+FREQUENCIES = {'weekly': 1, 'biweekly': 2}
+
+# Ocorrência expandida de uma série; date/time já refletem uma eventual remarcação
+Occurrence = namedtuple('Occurrence', (
+    'series_id', 'original_date', 'date', 'time', 'service_id', 'duration', 'price',
+    'status', 'client_name', 'client_contact'
+))
+
+def occurrence_id(series_id, original_date):
+    """Identificador estável de uma ocorrência (ex.: s12-20261020)"""
+    return f"s{series_id}-{original_date.strftime('%Y%m%d')}"
+
+def parse_rrule(value):
+    """Interpretar uma regra no estilo RRULE; retorna (interval_weeks, until, count)
+    
+    Aceita somente FREQ=WEEKLY com INTERVAL 1 ou 2 e um término (UNTIL ou COUNT),
+    ex.: "FREQ=WEEKLY;INTERVAL=2;COUNT=10". Lança ValueError com a mensagem.
+    """
+    if not isinstance(value, str):
+        raise ValueError('rrule inválida')
+    if value.upper().startswith('RRULE:'):
+        value = value[6:]
+    try:
+        parts = dict(part.split('=', 1) for part in value.strip().split(';') if part)
+    except ValueError:
+        raise ValueError('rrule inválida')
+    parts = {key.upper(): item for key, item in parts.items()}
+    if parts.get('FREQ', '').upper() != 'WEEKLY':
+        raise ValueError('Somente FREQ=WEEKLY é suportado')
+    try:
+        interval_weeks = int(parts.get('INTERVAL', 1))
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+        until = datetime.strptime(parts['UNTIL'][:8], '%Y%m%d').date() if 'UNTIL' in parts else None
+    except ValueError:
+        raise ValueError('rrule inválida')
+    if interval_weeks not in FREQUENCIES.values():
+        raise ValueError('INTERVAL deve ser 1 (semanal) ou 2 (quinzenal)')
+    return interval_weeks, until, count
+
+def compute_last_date(start_date, interval_weeks, until=None, count=None):
+    """Data da última ocorrência a partir de until ou count; lança ValueError se inválido"""
+    step = 7 * interval_weeks
+    if count is not None:
+        if isinstance(count, bool) or not isinstance(count, int) or not 1 <= count <= MAX_SERIES_OCCURRENCES:
+            raise ValueError(f'count deve ser um inteiro entre 1 e {MAX_SERIES_OCCURRENCES}')
+        return start_date + timedelta(days=(count - 1) * step)
+    if until is None:
+        raise ValueError('Informe o término da série (until ou count)')
+    if until < start_date:
+        raise ValueError('until deve ser igual ou posterior à data inicial')
+    occurrences = (until - start_date).days // step + 1
+    if occurrences > MAX_SERIES_OCCURRENCES:
+        raise ValueError(f'A série não pode ultrapassar {MAX_SERIES_OCCURRENCES} ocorrências')
+    return start_date + timedelta(days=(occurrences - 1) * step)
+
+def series_dates(start_date, interval_weeks, last_date, window_start=None, window_end=None):
+    """Datas originais das ocorrências, somente dentro da janela informada
+    
+    A primeira data da janela é calculada diretamente, sem percorrer as anteriores.
+    """
+    step = 7 * interval_weeks
+    current = start_date
+    if window_start is not None and window_start > start_date:
+        current += timedelta(days=-(-(window_start - start_date).days // step) * step)
+    end = min(last_date, window_end) if window_end is not None else last_date
+    dates = []
+    while current <= end:
+        dates.append(current)
+        current += timedelta(days=step)
+    return dates
+
+def is_series_date(series, day):
+    """Verificar se a data é uma ocorrência original da série"""
+    return (
+        series.start_date <= day <= series.last_date
+        and (day - series.start_date).days % (7 * series.interval_weeks) == 0
+    )
+
+def series_span(connection=None):
+    """Período (primeira data, última data) coberto pelas séries ativas, ou (None, None)
+    
+    Remarcações podem levar uma ocorrência para fora do intervalo das séries,
+    por isso as novas datas também entram.
+    """
+    executor = connection if connection is not None else db.session
+    first, last = executor.execute(select(
+        func.min(BookingSeries.start_date), func.max(BookingSeries.last_date)
+    ).where(BookingSeries.status == 'active')).one()
+    if first is None:
+        return None, None
+    moved_first, moved_last = executor.execute(select(
+        func.min(SeriesOverride.new_date), func.max(SeriesOverride.new_date)
+    )).one()
+    if moved_first is not None:
+        first, last = min(first, moved_first), max(last, moved_last)
+    return first, last
+
+def load_occurrences(start_date, end_date, include_cancelled=False, exclude=None, connection=None):
+    """Expandir as ocorrências das séries ativas que caem no período
+    
+    Duas consultas de colunas: as exceções que tocam o período (pela data
+    original ou pela nova data) e as séries que cruzam o período ou são
+    referenciadas por essas exceções. ``exclude`` é um (series_id, data
+    original) ignorado, usado ao remarcar a própria ocorrência; ``connection``
+    permite usar uma conexão em vez da sessão (ex.: dentro de uma migração).
+    """
+    executor = connection if connection is not None else db.session
+    overrides = {}
+    for series_id, original_date, status, new_date, new_time in executor.execute(select(
+        SeriesOverride.series_id, SeriesOverride.original_date, SeriesOverride.status,
+        SeriesOverride.new_date, SeriesOverride.new_time
+    ).where(or_(
+        and_(SeriesOverride.original_date >= start_date, SeriesOverride.original_date <= end_date),
+        and_(SeriesOverride.new_date >= start_date, SeriesOverride.new_date <= end_date)
+    ))):
+        overrides[(series_id, original_date)] = (status, new_date, new_time)
+    referenced = {series_id for series_id, _ in overrides}
+    
+    rows = executor.execute(select(
+        BookingSeries.id, BookingSeries.start_date, BookingSeries.appointment_time,
+        BookingSeries.interval_weeks, BookingSeries.last_date, BookingSeries.service_id,
+        Service.duration_minutes, Service.price, BookingSeries.client_name, BookingSeries.client_contact
+    ).join(
+        Service, BookingSeries.service_id == Service.id
+    ).where(
+        BookingSeries.status == 'active',
+        or_(
+            and_(BookingSeries.start_date <= end_date, BookingSeries.last_date >= start_date),
+            BookingSeries.id.in_(referenced) if referenced else false()
+        )
+    )).all()
+    
+    occurrences = []
+    series_by_id = {}
+    for row in rows:
+        (series_id, first, appointment_time, interval_weeks, last,
+         service_id, duration, price, client_name, client_contact) = row
+        series_by_id[series_id] = row
+        for original_date in series_dates(first, interval_weeks, last, start_date, end_date):
+            if exclude == (series_id, original_date):
+                continue
+            override = overrides.get((series_id, original_date))
+            if override is None:
+                status, day, start = 'scheduled', original_date, appointment_time
+            elif override[0] == 'cancelled' and include_cancelled:
+                status, day, start = 'cancelled', original_date, appointment_time
+            else:
+                # Remarcadas entram pela nova data, no laço abaixo
+                continue
+            occurrences.append(Occurrence(
+                series_id, original_date, day, start, service_id, duration, price,
+                status, client_name, client_contact
+            ))
+    
+    for (series_id, original_date), (status, new_date, new_time) in overrides.items():
+        row = series_by_id.get(series_id)
+        if status != 'rescheduled' or row is None or exclude == (series_id, original_date):
+            continue
+        if not start_date <= new_date <= end_date or not row[1] <= original_date <= row[4]:
+            continue
+        occurrences.append(Occurrence(
+            series_id, original_date, new_date, new_time, row[5], row[6], row[7],
+            'scheduled', row[8], row[9]
+        ))
+    
+    occurrences.sort(key=lambda occurrence: (occurrence.date, occurrence.time, occurrence.series_id))
+    return occurrences
+
+def occurrence_to_dict(occurrence, service_dict=None):
+    """Serializar uma ocorrência no mesmo formato de um agendamento"""
+    return {
+        'id': occurrence_id(occurrence.series_id, occurrence.original_date),
+        'series_id': occurrence.series_id,
+        'occurrence_date': occurrence.original_date.isoformat(),
+        'service_id': occurrence.service_id,
+        'service': service_dict,
+        'client_name': occurrence.client_name,
+        'client_contact': occurrence.client_contact,
+        'appointment_date': occurrence.date.isoformat(),
+        'appointment_time': occurrence.time.strftime('%H:%M'),
+        'status': occurrence.status,
+        'recurring': True
+    }
@@ -0,0 +1,161 @@
+import threading
+from datetime import datetime
+from flask import current_app
+from src.utils.profile_cache import get_profile_snapshot
+
+# Expediente padrão (usado quando o perfil não define business_hours)
+DEFAULT_OPEN = '08:00'
+DEFAULT_CLOSE = '18:00'
+DEFAULT_SLOT_STEP = 30
+# Limites aceitos para o intervalo entre horários oferecidos
+MIN_SLOT_STEP = 5
+MAX_SLOT_STEP = 240
+WEEKDAYS = [str(weekday) for weekday in range(7)]  # 0 = segunda-feira
+
+_lock = threading.Lock()
+# Chave da agenda compilada em app.extensions (uma por aplicação)
+EXTENSION_KEY = 'agendai_schedule'
+
+def _parse_minutes(value):
+    parsed = datetime.strptime(value, '%H:%M')
+    return parsed.hour * 60 + parsed.minute
+
+def _format_minutes(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+def default_business_hours():
+    """Configuração equivalente ao comportamento original (8h às 18h, a cada 30 minutos)"""
+    return {
+        'slot_step': DEFAULT_SLOT_STEP,
+        'weekdays': {weekday: {'open': DEFAULT_OPEN, 'close': DEFAULT_CLOSE, 'breaks': []} for weekday in WEEKDAYS},
+        'closed_dates': []
+    }
+
+def normalize_business_hours(data):
+    """Validar e completar a configuração de expediente; lança ValueError com a mensagem
+    
+    Formato:
+        {
+            "slot_step": 30,
+            "weekdays": {"0": {"open": "08:00", "close": "18:00", "breaks": [["12:00", "13:00"]]},
+                         "6": null},
+            "closed_dates": ["2026-12-25"]
+        }
+    Dias da semana ausentes usam o expediente padrão; null indica dia fechado.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Configuração de expediente inválida')
+    normalized = default_business_hours()
+    
+    step = data.get('slot_step', DEFAULT_SLOT_STEP)
+    if not isinstance(step, int) or isinstance(step, bool) or not MIN_SLOT_STEP <= step <= MAX_SLOT_STEP:
+        raise ValueError(f'slot_step deve ser um inteiro entre {MIN_SLOT_STEP} e {MAX_SLOT_STEP}')
+    normalized['slot_step'] = step
+    
+    # Valores vazios como [] ou "" são rejeitados, não tratados como "sem dias"
+    weekdays = data.get('weekdays', {})
+    if not isinstance(weekdays, dict) or not set(weekdays) <= set(WEEKDAYS):
+        raise ValueError('weekdays deve usar as chaves "0" (segunda) a "6" (domingo)')
+    for weekday, hours in weekdays.items():
+        if hours is None:
+            normalized['weekdays'][weekday] = None
+            continue
+        if not isinstance(hours, dict) or not isinstance(hours.get('breaks', []), list):
+            raise ValueError(f'Expediente inválido no dia {weekday} (use HH:MM em open, close e breaks)')
+        try:
+            opening = _parse_minutes(hours['open'])
+            closing = _parse_minutes(hours['close'])
+            breaks = sorted((_parse_minutes(start), _parse_minutes(end)) for start, end in hours.get('breaks', []))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f'Expediente inválido no dia {weekday} (use HH:MM em open, close e breaks)')
+        if opening >= closing:
+            raise ValueError(f'No dia {weekday}, open deve ser anterior a close')
+        previous_end = opening
+        for start, end in breaks:
+            if not previous_end <= start < end <= closing:
+                raise ValueError(f'No dia {weekday}, os intervalos devem estar dentro do expediente e sem sobreposição')
+            previous_end = end
+        normalized['weekdays'][weekday] = {
+            'open': _format_minutes(opening),
+            'close': _format_minutes(closing),
+            'breaks': [[_format_minutes(start), _format_minutes(end)] for start, end in breaks]
+        }
+    
+    closed_dates = data.get('closed_dates', [])
+    try:
+        if not isinstance(closed_dates, list):
+            raise TypeError
+        closed_dates = sorted({datetime.strptime(value, '%Y-%m-%d').date() for value in closed_dates})
+    except (TypeError, ValueError):
+        raise ValueError('closed_dates deve ser uma lista de datas YYYY-MM-DD')
+    normalized['closed_dates'] = [day.isoformat() for day in closed_dates]
+    return normalized
+
+class Schedule:
+    """Expediente compilado em minutos inteiros, com grades de horários em cache
+    
+    Cada dia da semana vira uma tupla de janelas (início, fim) já sem os
+    intervalos. A grade de inícios possíveis para uma duração é calculada uma
+    vez por (dia da semana, duração) e reutilizada entre requisições.
+    """
+    
+    def __init__(self, config):
+        self.step = config['slot_step']
+        self.windows = []
+        for weekday in WEEKDAYS:
+            hours = config['weekdays'][weekday]
+            if hours is None:
+                self.windows.append(())
+                continue
+            windows = []
+            start = _parse_minutes(hours['open'])
+            for break_start, break_end in hours['breaks']:
+                windows.append((start, _parse_minutes(break_start)))
+                start = _parse_minutes(break_end)
+            windows.append((start, _parse_minutes(hours['close'])))
+            self.windows.append(tuple((start, end) for start, end in windows if end > start))
+        self.closed_dates = frozenset(datetime.strptime(value, '%Y-%m-%d').date() for value in config['closed_dates'])
+        self._grids = {}
+    
+    def day_windows(self, day):
+        """Janelas de atendimento de uma data (vazio em dias fechados)"""
+        if day in self.closed_dates:
+            return ()
+        return self.windows[day.weekday()]
+    
+    def capacity_minutes(self, day):
+        return sum(end - start for start, end in self.day_windows(day))
+    
+    def slot_grid(self, day, duration):
+        """Inícios possíveis (minutos) em que a duração cabe inteira em uma janela"""
+        if day in self.closed_dates:
+            return ()
+        key = (day.weekday(), duration)
+        grid = self._grids.get(key)
+        if grid is None:
+            grid = tuple(
+                slot
+                for start, end in self.windows[key[0]]
+                for slot in range(start, end - duration + 1, self.step)
+            )
+            self._grids[key] = grid
+        return grid
+    
+    def free_slots(self, day, busy, duration):
+        """Inícios livres da grade do dia, dados os intervalos ocupados (BusyIntervals)"""
+        return busy.free_slots_in(self.slot_grid(day, duration), duration)
+
+def get_schedule():
+    """Agenda compilada a partir do perfil, recompilada só quando a configuração muda"""
+    snapshot = get_profile_snapshot()
+    # O ETag do perfil muda sempre que o perfil (e portanto o expediente) muda
+    key = snapshot.etag
+    cached = current_app.extensions.get(EXTENSION_KEY)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with _lock:
+        cached = current_app.extensions.get(EXTENSION_KEY)
+        if cached is None or cached[0] != key:
+            cached = (key, Schedule(snapshot.data.get('business_hours') or default_business_hours()))
+            current_app.extensions[EXTENSION_KEY] = cached
+        return cached[1]
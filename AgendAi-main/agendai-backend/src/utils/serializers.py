@@ -0,0 +1,55 @@
+from sqlalchemy.orm import selectinload
+from src.models.agendai import Booking
+
+def with_service(query):
+    """Carregar o serviço de cada agendamento em uma única consulta extra
+    
+    Evita o SELECT por agendamento disparado pelo carregamento preguiçoso de
+    ``booking.service`` ao serializar listas.
+    """
+    return query.options(selectinload(Booking.service))
+
+# Campos que podem ser pedidos na projeção de agendamentos (?fields=)
+BOOKING_FIELDS = (
+    'id', 'service_id', 'service', 'client_name', 'client_contact',
+    'appointment_date', 'appointment_time', 'status', 'created_at', 'updated_at'
+)
+
+def parse_fields(value):
+    """Interpretar o parâmetro fields; retorna None quando todos os campos são pedidos
+    
+    Lança ValueError com o nome do primeiro campo desconhecido.
+    """
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    for field in fields:
+        if field not in BOOKING_FIELDS:
+            raise ValueError(field)
+    # O id é sempre retornado para que o cliente consiga referenciar o agendamento
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+def bookings_to_dicts(bookings, fields=None):
+    """Serializar uma lista de agendamentos reaproveitando o dict de cada serviço
+    
+    Com ``fields`` somente os campos pedidos são retornados e o serviço só é
+    acessado quando ``service`` faz parte da projeção.
+    """
+    include_service = fields is None or 'service' in fields
+    service_dicts = {}
+    result = []
+    for booking in bookings:
+        service_dict = None
+        if include_service:
+            service = booking.service
+            if service is not None:
+                if service.id not in service_dicts:
+                    service_dicts[service.id] = service.to_dict()
+                service_dict = service_dicts[service.id]
+        booking_dict = booking.to_dict(service_dict=service_dict, include_service=include_service)
+        if fields is not None:
+            booking_dict = {field: booking_dict[field] for field in fields}
+        result.append(booking_dict)
+    return result
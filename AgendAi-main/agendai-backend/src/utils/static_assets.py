@@ -0,0 +1,150 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from flask import current_app, request, send_file
+
+# Arquivos gerados pelo Vite em assets/ com o hash de 8 caracteres antes da
+# extensão (ex.: assets/index-BkQ2x9aF.js): o conteúdo nunca muda para o mesmo
+# nome, então podem ficar em cache por um ano. Fora de assets/ nomes como
+# apple-touch-icon.png não têm hash e seguem o cache padrão
+HASHED_ASSET = re.compile(r'^assets/(?:[^/]+/)*[^/]+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Demais arquivos sem hash (favicon, imagens públicas)
+DEFAULT_MAX_AGE = 60 * 60
+
+# Extensões que valem a pena comprimir e o tamanho mínimo para isso
+COMPRESSIBLE_EXTENSIONS = {'.js', '.mjs', '.css', '.html', '.svg', '.json', '.map', '.txt', '.xml', '.ico', '.wasm'}
+COMPRESS_MIN_SIZE = 1024
+# Variantes pré-comprimidas, na ordem de preferência (sufixo do arquivo, Content-Encoding)
+ENCODINGS = (('.br', 'br'), ('.gz', 'gzip'))
+
+# Pastas servidas por outras rotas e que mudam em tempo de execução
+EXCLUDED_DIRS = {'uploads'}
+
+_lock = threading.Lock()
+# Chave do manifesto em app.extensions (um manifesto por aplicação)
+EXTENSION_KEY = 'agendai_static_manifest'
+
+class StaticAsset:
+    """Arquivo estático com metadados calculados uma única vez"""
+    
+    def __init__(self, path, name):
+        self.path = path
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.immutable = HASHED_ASSET.search(name) is not None
+        with open(path, 'rb') as f:
+            self.etag = hashlib.sha1(f.read()).hexdigest()
+        # Só usa a variante se ela estiver atualizada em relação ao original
+        mtime = os.path.getmtime(path)
+        self.variants = {}
+        for suffix, encoding in ENCODINGS:
+            variant_path = path + suffix
+            if os.path.isfile(variant_path) and os.path.getmtime(variant_path) >= mtime:
+                self.variants[encoding] = variant_path
+
+class StaticManifest:
+    """Índice em memória da pasta estática (substitui os os.path.exists por requisição)"""
+    
+    def __init__(self, static_folder):
+        self.assets = {}
+        for root, dirs, files in os.walk(static_folder):
+            if root == static_folder:
+                dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+            for filename in files:
+                if filename.endswith(tuple(suffix for suffix, _ in ENCODINGS)):
+                    continue
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                self.assets[name] = StaticAsset(path, name)
+    
+    def get(self, name):
+        return self.assets.get(name)
+
+def get_manifest():
+    """Manifesto da pasta estática, montado no primeiro uso
+    
+    Em modo debug é remontado a cada chamada, para refletir novos builds do frontend.
+    """
+    extensions = current_app.extensions
+    manifest = extensions.get(EXTENSION_KEY)
+    if manifest is not None and not current_app.debug:
+        return manifest
+    with _lock:
+        manifest = extensions.get(EXTENSION_KEY)
+        if manifest is None or current_app.debug:
+            manifest = StaticManifest(current_app.static_folder)
+            extensions[EXTENSION_KEY] = manifest
+        return manifest
+
+def send_asset(asset):
+    """Responder com o arquivo (ou a variante comprimida aceita pelo cliente)
+    
+    O envio usa o wsgi.file_wrapper do servidor (sendfile no gunicorn), ou
+    X-Sendfile quando USE_X_SENDFILE está ativo.
+    """
+    path, encoding = asset.path, None
+    for candidate in ('br', 'gzip'):
+        if candidate in asset.variants and request.accept_encodings[candidate]:
+            path, encoding = asset.variants[candidate], candidate
+            break
+    
+    if asset.immutable:
+        max_age = IMMUTABLE_MAX_AGE
+    elif asset.mimetype == 'text/html':
+        # index.html sempre revalidado (no-cache + ETag), para que novos builds apareçam na hora
+        max_age = None
+    else:
+        max_age = DEFAULT_MAX_AGE
+    
+    response = send_file(
+        path,
+        mimetype=asset.mimetype,
+        etag=f'{asset.etag}-{encoding}' if encoding else asset.etag,
+        max_age=max_age,
+        conditional=True
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if asset.variants:
+        response.vary.add('Accept-Encoding')
+    if asset.immutable:
+        response.cache_control.immutable = True
+    return response
+
+def precompress(static_folder, min_size=COMPRESS_MIN_SIZE):
+    """Gerar as variantes .gz (e .br, se o pacote brotli estiver instalado)
+    
+    Executado após o build do frontend; retorna quantos arquivos foram gravados.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    
+    written = 0
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder:
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        for filename in files:
+            if os.path.splitext(filename)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, filename)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            
+            variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data, quality=11)
+            for suffix, compressed in variants.items():
+                # Variantes que não economizam nada só custariam uma leitura a mais
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    return written
@@ -0,0 +1,105 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import TestingConfig
+from src.main import create_app
+from src.models.agendai import db, Booking, Service
+
+def make_app(**overrides):
+    """Aplicação de teste com a TestingConfig e os valores informados"""
+    return create_app(type('TestConfig', (TestingConfig,), overrides))
+
+@contextmanager
+def capture_queries(app):
+    """Guardar (instrução, parâmetros) de cada SQL executado no engine da aplicação"""
+    captured = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+    
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def booking_data(service_id, day, time, name='Cliente'):
+    """Corpo de POST /api/bookings para o serviço, dia e horário (HH:MM) informados"""
+    return {
+        'service_id': service_id,
+        'client_name': name,
+        'client_contact': '11999999999',
+        'appointment_date': day.isoformat(),
+        'appointment_time': time
+    }
+
+@pytest.fixture
+def app():
+    # Banco em memória (sqlite://) já migrado
+    return make_app()
+
+@pytest.fixture
+def file_app(tmp_path):
+    """Aplicação com banco em arquivo temporário (várias conexões, como em produção)"""
+    return make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'agendai.db'}")
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def service(app):
+    """Serviço de 60 minutos; retorna o id"""
+    with app.app_context():
+        service = Service(name='Limpeza de pele', duration_minutes=60, price=120.0)
+        db.session.add(service)
+        db.session.commit()
+        return service.id
+
+def future_day(days=30):
+    """Dia útil (segunda a sexta) a pelo menos ``days`` dias de hoje"""
+    day = date.today() + timedelta(days=days)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+def create_services(app, count, duration_minutes=60):
+    """Criar ``count`` serviços; retorna os ids"""
+    with app.app_context():
+        services = [
+            Service(name=f'Serviço {index}', duration_minutes=duration_minutes, price=100.0)
+            for index in range(count)
+        ]
+        db.session.add_all(services)
+        db.session.commit()
+        return [service.id for service in services]
+
+def seed_bookings(app, service_ids, count, first_day):
+    """Inserir ``count`` agendamentos diretamente, um por hora a partir de first_day
+    
+    ``service_ids`` pode ser um id ou uma lista, usada em rodízio.
+    """
+    if isinstance(service_ids, int):
+        service_ids = [service_ids]
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(Booking.__table__.insert(), [{
+            'service_id': service_ids[index % len(service_ids)],
+            'client_name': f'Cliente {index}',
+            'client_contact': '11999999999',
+            'appointment_date': first_day + timedelta(days=index // 8),
+            'appointment_time': time(9 + index % 8),
+            'status': 'scheduled',
+            'created_at': now,
+            'updated_at': now
+        } for index in range(count)])
+        db.session.commit()
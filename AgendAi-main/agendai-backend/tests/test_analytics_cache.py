@@ -0,0 +1,25 @@
+import time
+from datetime import date, timedelta
+
+from conftest import seed_bookings
+from src.utils import analytics
+
+def _last_month():
+    """Primeiro dia do mês anterior (mês encerrado)"""
+    return (date.today().replace(day=1) - timedelta(days=1)).replace(day=1)
+
+def _bookings(client, month):
+    response = client.get(f"/api/analytics/occupancy?start={month.strftime('%Y-%m')}&end={month.strftime('%Y-%m')}")
+    return response.get_json()['data']['totals']['bookings']
+
+def test_closed_month_expires_after_its_ttl(app, client, service, monkeypatch):
+    month = _last_month()
+    assert _bookings(client, month) == 0
+    
+    # Escrita feita por outro worker: nenhuma invalidação neste processo
+    seed_bookings(app, service, 3, month)
+    assert _bookings(client, month) == 0
+    
+    now = time.monotonic()
+    monkeypatch.setattr(analytics.time, 'monotonic', lambda: now + analytics.ANALYTICS_CLOSED_TTL + 1)
+    assert _bookings(client, month) == 3
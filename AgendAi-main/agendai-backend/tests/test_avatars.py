@@ -0,0 +1,41 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+@pytest.fixture
+def uploads(app, tmp_path):
+    # Não gravar em src/static durante os testes
+    app.static_folder = str(tmp_path)
+    return tmp_path / 'uploads'
+
+def _post_avatar(client, data, name='foto.png'):
+    return client.post('/api/profile/avatar', data={'avatar': (io.BytesIO(data), name)},
+                       content_type='multipart/form-data')
+
+def _png(size=(300, 300)):
+    output = io.BytesIO()
+    Image.new('RGB', size, (200, 120, 80)).save(output, 'PNG')
+    return output.getvalue()
+
+def test_valid_image_is_saved_with_variants(client, uploads):
+    response = _post_avatar(client, _png())
+    
+    assert response.status_code == 200
+    filename = response.get_json()['avatar_url'].rsplit('/', 1)[-1]
+    assert (uploads / filename).exists()
+    assert client.get('/api/profile').get_json()['data']['avatar_variants']
+
+@pytest.mark.parametrize('data', [
+    b'GIF89a' + b'lixo' * 100,
+    b'\x89PNG\r\n\x1a\n' + os.urandom(2000),
+])
+def test_signature_with_invalid_content_is_rejected(client, uploads, data):
+    before = client.get('/api/profile').get_json()['data']['avatar_url']
+    
+    response = _post_avatar(client, data, 'foto.gif')
+    
+    assert response.status_code == 400
+    assert client.get('/api/profile').get_json()['data']['avatar_url'] == before
+    assert not uploads.exists() or os.listdir(uploads) == []
@@ -0,0 +1,102 @@
+import threading
+from collections import Counter
+from datetime import datetime
+
+from conftest import booking_data, future_day
+from src.models.agendai import db, Booking
+from src.routes import bookings
+
+THREADS = 8
+
+def run_concurrently(app, requests):
+    """Disparar as requisições ao mesmo tempo, uma thread e um test client por requisição"""
+    barrier = threading.Barrier(len(requests))
+    statuses = [None] * len(requests)
+    
+    def worker(index, request):
+        client = app.test_client()
+        barrier.wait()
+        statuses[index] = request(client).status_code
+    
+    threads = [threading.Thread(target=worker, args=(index, request)) for index, request in enumerate(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return Counter(statuses)
+
+def time_of(value):
+    return datetime.strptime(value, '%H:%M').time()
+
+def _create_service(client):
+    response = client.post('/api/services', json={'name': 'Massagem', 'duration_minutes': 60, 'price': 150})
+    return response.get_json()['data']['id']
+
+def test_parallel_creates_on_same_slot_book_it_once(file_app):
+    client = file_app.test_client()
+    service_id = _create_service(client)
+    day = future_day()
+    
+    statuses = run_concurrently(file_app, [
+        lambda client, index=index: client.post('/api/bookings', json=booking_data(service_id, day, '10:00', f'Cliente {index}'))
+        for index in range(THREADS)
+    ])
+    
+    assert statuses == Counter({201: 1, 409: THREADS - 1})
+    with file_app.app_context():
+        assert db.session.query(Booking).filter_by(appointment_date=day, status='scheduled').count() == 1
+
+def test_parallel_creates_on_overlapping_slots_book_one(file_app):
+    client = file_app.test_client()
+    service_id = _create_service(client)
+    day = future_day()
+    
+    # 60 minutos a partir de 10:00, 10:15, 10:30 e 10:45: todos se sobrepõem
+    times = ['10:00', '10:15', '10:30', '10:45'] * 2
+    statuses = run_concurrently(file_app, [
+        lambda client, time=time: client.post('/api/bookings', json=booking_data(service_id, day, time))
+        for time in times
+    ])
+    
+    assert statuses == Counter({201: 1, 409: len(times) - 1})
+
+def test_parallel_updates_into_same_slot_move_one(file_app):
+    client = file_app.test_client()
+    service_id = _create_service(client)
+    
+    # Algumas rodadas, uma por dia, para dar chance à disputa
+    for offset in range(5):
+        day = future_day(30 + offset)
+        ids = [
+            client.post('/api/bookings', json=booking_data(service_id, day, time)).get_json()['data']['id']
+            for time in ('09:00', '11:00')
+        ]
+        statuses = run_concurrently(file_app, [
+            lambda client, booking_id=booking_id: client.put(f'/api/bookings/{booking_id}', json={'appointment_time': '15:00'})
+            for booking_id in ids
+        ])
+        
+        assert statuses == Counter({200: 1, 409: 1})
+        with file_app.app_context():
+            assert db.session.query(Booking).filter_by(appointment_date=day, appointment_time=time_of('15:00')).count() == 1
+
+def test_opposite_reschedules_lock_both_days_in_one_call(file_app, monkeypatch):
+    client = file_app.test_client()
+    service_id = _create_service(client)
+    first, second = future_day(30), future_day(40)
+    ids = [
+        client.post('/api/bookings', json=booking_data(service_id, day, time)).get_json()['data']['id']
+        for day, time in ((first, '09:00'), (second, '11:00'))
+    ]
+    
+    # Uma única chamada com os dois dias: a ordem fixa de lock_booking_days evita o deadlock
+    calls = []
+    lock = bookings.lock_booking_days
+    monkeypatch.setattr(bookings, 'lock_booking_days', lambda *dates: calls.append(set(dates)) or lock(*dates))
+    statuses = run_concurrently(file_app, [
+        lambda client: client.put(f'/api/bookings/{ids[0]}', json={'appointment_date': second.isoformat()}),
+        lambda client: client.put(f'/api/bookings/{ids[1]}', json={'appointment_date': first.isoformat()})
+    ])
+    
+    assert statuses == Counter({200: 2})
+    assert calls == [{first, second}, {first, second}]
@@ -0,0 +1,45 @@
+import pytest
+
+from conftest import capture_queries, future_day, seed_bookings
+from src.models.agendai import db
+from src.utils.calendar_cache import invalidate_calendar
+
+def booking_selects(captured):
+    """Somente as consultas SELECT sobre bookings"""
+    return [
+        (statement, parameters) for statement, parameters in captured
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM bookings' in statement
+    ]
+
+def query_plans(app, captured):
+    """Detalhes do EXPLAIN QUERY PLAN de cada consulta capturada"""
+    plans = []
+    with app.app_context():
+        with db.engine.connect() as conn:
+            for statement, parameters in captured:
+                rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+                plans.append(' | '.join(row[-1] for row in rows))
+    return plans
+
+@pytest.mark.parametrize('method, path, index', [
+    # Calendário do mês: faixa de datas
+    ('get', '/api/bookings/calendar/{month}/{year}', 'ix_bookings_date_time_id'),
+    # Contagem por dia do calendário: faixa de datas e status, sem ler a tabela
+    ('get', '/api/bookings/calendar/{month}/{year}?view=counts', 'ix_bookings_date_status_time'),
+    # Listagem paginada ordenada por (data, horário, id)
+    ('get', '/api/bookings?limit=20', 'ix_bookings_date_time_id'),
+    # Exclusão de serviço verifica os agendamentos pelo service_id
+    ('delete', '/api/services/{service}', 'ix_bookings_service_id'),
+])
+def test_booking_queries_use_indexes(app, client, service, method, path, index):
+    first = future_day().replace(day=1)
+    seed_bookings(app, service, 40, first)
+    with app.app_context():
+        invalidate_calendar()
+    
+    with capture_queries(app) as captured:
+        getattr(client, method)(path.format(month=first.month, year=first.year, service=service))
+    plans = query_plans(app, booking_selects(captured))
+    
+    assert plans, 'nenhuma consulta em bookings foi executada'
+    assert any(index in plan for plan in plans), plans
@@ -0,0 +1,81 @@
+import json
+from datetime import timedelta
+
+from conftest import booking_data, future_day
+from src.models.agendai import Booking, OutboxEvent
+from src.routes import bookings
+from src.utils.availability import load_busy_intervals_for_dates
+
+def _import(client, rows):
+    return client.post('/api/bookings/bulk', json=rows)
+
+def test_each_row_reports_its_own_error(app, client, service):
+    day = future_day()
+    assert client.post('/api/bookings', json=booking_data(service, day, '09:00')).status_code == 201
+    
+    response = _import(client, [
+        booking_data(service, day, '10:00'),
+        booking_data(service, day, '09:30'),
+        booking_data(service, day, '10:30'),
+        dict(booking_data(service, day, '14:00'), client_name=''),
+        dict(booking_data(service, day, '14:00'), appointment_date='02/03/2026'),
+        dict(booking_data(service, day, '14:00'), appointment_time='2pm'),
+        booking_data(service + 100, day, '14:00'),
+        dict(booking_data(service, day, '14:00'), status='pending'),
+        'não é um objeto',
+        dict(booking_data(service, day, '10:00'), status='cancelled')
+    ])
+    
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (2, 8)
+    assert [row.get('error') for row in body['data']] == [
+        None,
+        'Horário não disponível',
+        'Horário não disponível',
+        'Campo client_name é obrigatório',
+        'Formato de data inválido (use YYYY-MM-DD)',
+        'Formato de horário inválido (use HH:MM)',
+        'Serviço não encontrado',
+        'Status deve ser um de: scheduled, completed, cancelled',
+        'Linha deve ser um objeto JSON',
+        None
+    ]
+    assert [row['row'] for row in body['data']] == list(range(10))
+    with app.app_context():
+        assert Booking.query.count() == 3
+        # Cada agendamento importado entra na fila de sincronização
+        assert OutboxEvent.query.count() == 3
+
+def test_ndjson_body(app, client, service):
+    day = future_day()
+    body = '\n'.join(json.dumps(booking_data(service, day, time)) for time in ('09:00', '', '11:00')) + '\n\n'
+    response = client.post('/api/bookings/bulk', data=body, content_type='application/x-ndjson')
+    
+    assert response.get_json()['created'] == 2
+    assert response.get_json()['data'][1] == {'row': 1, 'success': False, 'error': 'Campo appointment_time é obrigatório'}
+
+def test_rows_spread_over_many_days_are_checked_in_chunks(app, client, service, monkeypatch):
+    # Blocos pequenos: os intervalos dos dias da importação são carregados em vários blocos
+    monkeypatch.setattr(bookings, 'load_busy_intervals_for_dates',
+                        lambda dates: load_busy_intervals_for_dates(dates, chunk_size=7))
+    first = future_day()
+    days = [first + timedelta(days=offset) for offset in range(40)]
+    for day in days[::10]:
+        assert client.post('/api/bookings', json=booking_data(service, day, '09:30')).status_code == 201
+    
+    response = _import(client, [booking_data(service, day, '09:00') for day in days])
+    
+    errors = {row['row'] for row in response.get_json()['data'] if not row['success']}
+    assert errors == set(range(0, 40, 10))
+    with app.app_context():
+        assert Booking.query.count() == 40
+
+def test_rejects_bodies_that_are_not_rows(client, service, monkeypatch):
+    assert client.post('/api/bookings/bulk', data='{', content_type='application/json').status_code == 400
+    assert _import(client, []).status_code == 400
+    assert _import(client, {'rows': []}).status_code == 400
+    assert client.post('/api/bookings/bulk', data='{"a": 1}\n{', content_type='application/x-ndjson').status_code == 400
+    
+    monkeypatch.setattr(bookings, 'MAX_BULK_ROWS', 2)
+    assert _import(client, [booking_data(service, future_day(), '09:00')] * 3).status_code == 400
@@ -0,0 +1,30 @@
+import pytest
+
+CUSTOM = {'slot_step': 15, 'weekdays': {'0': {'open': '09:00', 'close': '17:00'}, '6': None}}
+
+@pytest.mark.parametrize('body', [
+    {'weekdays': []},
+    {'weekdays': ''},
+    {'weekdays': 0},
+    {'weekdays': False},
+    {'weekdays': None},
+    {'weekdays': {'0': []}},
+    {'weekdays': {'0': {'open': '09:00', 'close': '17:00', 'breaks': ''}}},
+    {'closed_dates': ''},
+    {'closed_dates': {}},
+])
+def test_invalid_business_hours_are_rejected_and_keep_the_configuration(client, body):
+    assert client.put('/api/profile/business-hours', json=CUSTOM).status_code == 200
+    before = client.get('/api/profile/business-hours').get_json()['data']
+    
+    assert client.put('/api/profile/business-hours', json=body).status_code == 400
+    assert client.get('/api/profile/business-hours').get_json()['data'] == before
+
+def test_missing_keys_use_defaults(client):
+    response = client.put('/api/profile/business-hours', json={'slot_step': 15})
+    
+    assert response.status_code == 200
+    data = client.get('/api/profile/business-hours').get_json()['data']
+    assert data['slot_step'] == 15
+    assert data['weekdays']['0'] == {'open': '08:00', 'close': '18:00', 'breaks': []}
+    assert data['closed_dates'] == []
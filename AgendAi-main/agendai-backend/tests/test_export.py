@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from conftest import booking_data, future_day
+
+HEADER = [
+    'id', 'appointment_date', 'appointment_time', 'status', 'client_name', 'client_contact', 'service_id',
+    'created_at', 'updated_at', 'service_name', 'service_duration_minutes', 'service_price'
+]
+
+def _csv(client, query=''):
+    response = client.get(f'/api/bookings/export?{query}')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    return list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+def _book(client, service, day, time):
+    response = client.post('/api/bookings', json=booking_data(service, day, time))
+    assert response.status_code == 201
+    return response.get_json()['data']['id']
+
+def test_csv_has_header_and_service_columns(client, service):
+    day = future_day()
+    booking_id = _book(client, service, day, '09:00')
+    
+    response = client.get('/api/bookings/export')
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0].split(',') == HEADER
+    assert response.headers['Content-Disposition'] == 'attachment; filename=bookings.csv'
+    
+    row = _csv(client)[0]
+    assert row['id'] == str(booking_id)
+    assert (row['appointment_date'], row['appointment_time']) == (day.isoformat(), '09:00')
+    assert row['service_duration_minutes'] == '60'
+
+def test_ndjson_rows_use_the_same_columns(client, service):
+    day = future_day()
+    _book(client, service, day, '10:00')
+    _book(client, service, day, '08:00')
+    
+    response = client.get('/api/bookings/export?format=ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [list(row) for row in rows] == [HEADER] * 2
+    assert [row['appointment_time'] for row in rows] == ['08:00', '10:00']
+
+def test_filters_match_the_listing(client, service):
+    first = future_day()
+    second = first + timedelta(days=1)
+    _book(client, service, first, '09:00')
+    cancelled = _book(client, service, second, '09:00')
+    _book(client, service, second, '11:00')
+    assert client.delete(f'/api/bookings/{cancelled}').status_code == 200
+    
+    assert len(_csv(client, f'start_date={second.isoformat()}')) == 2
+    assert len(_csv(client, f'end_date={first.isoformat()}')) == 1
+    assert [row['id'] for row in _csv(client, 'status=cancelled')] == [str(cancelled)]
+
+def test_invalid_parameters_return_400(client):
+    assert client.get('/api/bookings/export?format=xml').status_code == 400
+    assert client.get('/api/bookings/export?start_date=02/03/2026').status_code == 400
+
+def test_series_occurrences_are_merged_by_date_and_time(client, service):
+    start = future_day()
+    response = client.post('/api/bookings/series', json={
+        'service_id': service,
+        'client_name': 'Ana',
+        'client_contact': 'ana@exemplo.com',
+        'start_date': start.isoformat(),
+        'appointment_time': '10:00',
+        'count': 3
+    })
+    assert response.status_code == 201
+    series_id = response.get_json()['data']['id']
+    second = start + timedelta(weeks=1)
+    assert client.delete(f'/api/bookings/series/{series_id}/occurrences/{second.isoformat()}').status_code == 200
+    _book(client, service, start, '09:00')
+    _book(client, service, start, '11:00')
+    _book(client, service, start + timedelta(weeks=2), '08:00')
+    
+    rows = _csv(client)
+    assert [(row['appointment_date'], row['appointment_time']) for row in rows] == [
+        (start.isoformat(), '09:00'),
+        (start.isoformat(), '10:00'),
+        (start.isoformat(), '11:00'),
+        (second.isoformat(), '10:00'),
+        ((start + timedelta(weeks=2)).isoformat(), '08:00'),
+        ((start + timedelta(weeks=2)).isoformat(), '10:00')
+    ]
+    occurrence = rows[1]
+    assert occurrence['id'] == f"s{series_id}-{start.strftime('%Y%m%d')}"
+    assert (occurrence['client_name'], occurrence['created_at']) == ('Ana', '')
+    assert occurrence['service_duration_minutes'] == '60'
+    
+    # Os filtros também valem para as ocorrências
+    assert [row['id'] for row in _csv(client, 'status=cancelled')] == [f"s{series_id}-{second.strftime('%Y%m%d')}"]
+    window = f'start_date={second.isoformat()}&end_date={second.isoformat()}'
+    assert len(_csv(client, window)) == 1
+    assert len(_csv(client, f'{window}&status=scheduled')) == 0
@@ -0,0 +1,21 @@
+import logging
+
+from src.utils.metrics import Metrics
+
+def test_recording_failure_is_logged_and_response_kept(client, monkeypatch, caplog):
+    def broken(self, *args):
+        raise RuntimeError('histograma quebrado')
+    monkeypatch.setattr(Metrics, 'observe_request', broken)
+    
+    with caplog.at_level(logging.ERROR):
+        response = client.get('/api/services')
+    
+    assert response.status_code == 200
+    record = next(record for record in caplog.records if record.getMessage().startswith('Falha ao registrar métricas'))
+    assert record.getMessage() == 'Falha ao registrar métricas de GET /api/services'
+    assert record.exc_info[0] is RuntimeError
+
+def test_requests_are_exposed(client):
+    client.get('/api/services')
+    body = client.get('/api/metrics').get_data(as_text=True)
+    assert 'endpoint="services.get_services"' in body
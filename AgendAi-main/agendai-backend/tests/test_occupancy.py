@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from conftest import booking_data, create_services, future_day
+from src.models.agendai import DayOccupancy
+from src.utils.occupancy import DayBitmap, compute_bitmaps, rebuild_all
+
+def _stored(app):
+    with app.app_context():
+        return {row.appointment_date: DayBitmap.from_bytes(row.bitmap).bits for row in DayOccupancy.query}
+
+def assert_matches_rebuild(app, days):
+    """A ocupação mantida incrementalmente é a mesma calculada do zero"""
+    stored = _stored(app)
+    with app.app_context():
+        expected = compute_bitmaps(set(days) | set(stored))
+    assert {day: bits for day, bits in stored.items() if bits} == {day: bits for day, bits in expected.items() if bits}
+    
+    with app.app_context():
+        rebuild_all()
+    assert _stored(app) == stored
+
+def test_incremental_occupancy_matches_full_rebuild(app, client):
+    short, long = create_services(app, 2, duration_minutes=30)
+    client.put(f'/api/services/{long}', json={'duration_minutes': 90})
+    first = future_day()
+    days = [first + timedelta(days=offset) for offset in range(14)]
+    
+    def book(service, day, time):
+        response = client.post('/api/bookings', json=booking_data(service, day, time))
+        assert response.status_code == 201
+        return response.get_json()['data']['id']
+    
+    # Criações sobrepostas no mesmo dia e em dias diferentes
+    ids = [book(short, first, '09:00'), book(long, first, '09:30'), book(short, first, '11:00')]
+    ids.append(book(long, first + timedelta(days=1), '14:10'))
+    assert_matches_rebuild(app, days)
+    
+    # Remarcação para outro dia, cancelamento, reativação e troca de serviço
+    assert client.put(f'/api/bookings/{ids[1]}', json={
+        'appointment_date': (first + timedelta(days=2)).isoformat(), 'appointment_time': '16:00'
+    }).status_code == 200
+    assert client.delete(f'/api/bookings/{ids[0]}').status_code == 200
+    assert client.put(f'/api/bookings/{ids[0]}', json={'status': 'scheduled'}).status_code == 200
+    assert client.put(f'/api/bookings/{ids[2]}', json={'service_id': long}).status_code == 200
+    assert_matches_rebuild(app, days)
+    
+    # Importação em lote, incluindo uma linha cancelada e um conflito
+    response = client.post('/api/bookings/bulk', json=[
+        booking_data(short, first + timedelta(days=3), '08:00'),
+        dict(booking_data(long, first + timedelta(days=3), '08:00'), status='cancelled'),
+        booking_data(long, first + timedelta(days=3), '08:15'),
+        booking_data(long, first + timedelta(days=4), '13:00')
+    ])
+    assert response.get_json()['created'] == 3
+    assert_matches_rebuild(app, days)
+    
+    # Série semanal, remarcação e cancelamento de ocorrências, encerramento parcial
+    response = client.post('/api/bookings/series', json={
+        'service_id': short,
+        'client_name': 'Ana',
+        'client_contact': 'ana@exemplo.com',
+        'start_date': first.isoformat(),
+        'appointment_time': '15:00',
+        'count': 2
+    })
+    assert response.status_code == 201
+    series_id = response.get_json()['data']['id']
+    second = first + timedelta(weeks=1)
+    assert client.put(f'/api/bookings/series/{series_id}/occurrences/{first.isoformat()}', json={
+        'appointment_date': (first + timedelta(days=5)).isoformat(), 'appointment_time': '10:00'
+    }).status_code == 200
+    assert client.delete(f'/api/bookings/series/{series_id}/occurrences/{second.isoformat()}').status_code == 200
+    assert client.put(f'/api/bookings/series/{series_id}/occurrences/{second.isoformat()}', json={
+        'status': 'scheduled'
+    }).status_code == 200
+    assert_matches_rebuild(app, days)
+    
+    assert client.delete(f'/api/bookings/series/{series_id}?from={second.isoformat()}').status_code == 200
+    # Mudança de duração recalcula todos os dias do serviço
+    assert client.put(f'/api/services/{short}', json={'duration_minutes': 45}).status_code == 200
+    assert_matches_rebuild(app, days)
@@ -0,0 +1,180 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from src.models.agendai import db, OutboxEvent
+from src.utils import outbox
+from src.utils.outbox import claim_events, enqueue, outbox_stats, process_outbox
+from src.utils.supabase_rest import SupabaseError
+
+class FakeSupabase:
+    """Registra os upserts; ``fail`` faz o próximo envio falhar
+    
+    Lotes com alguma linha de status 'invalid' são rejeitados com 400, como o
+    PostgREST faz com um valor que não cabe na coluna.
+    """
+    
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.fail = False
+        self.upserts = []
+        self.lock = threading.Lock()
+    
+    def upsert(self, table, rows, on_conflict):
+        time.sleep(self.delay)
+        if self.fail:
+            self.fail = False
+            raise SupabaseError('indisponível', 503)
+        if any(row.get('status') == 'invalid' for row in rows):
+            raise SupabaseError('valor inválido', 400)
+        with self.lock:
+            self.upserts.append((table, rows))
+
+@pytest.fixture
+def supabase(monkeypatch):
+    fake = FakeSupabase()
+    monkeypatch.setattr(outbox, 'get_supabase', lambda: fake)
+    return fake
+
+def _enqueue(app, *items):
+    with app.app_context():
+        for key, status in items:
+            enqueue('agendamentos', key, {'status': status})
+        db.session.commit()
+
+def _pending(app):
+    with app.app_context():
+        return [(event.idempotency_key, event.attempts) for event in OutboxEvent.query.order_by(OutboxEvent.id)]
+
+def test_claimed_events_are_not_claimed_again(app):
+    _enqueue(app, ('booking-1', 'scheduled'), ('booking-2', 'scheduled'))
+    with app.app_context():
+        first = claim_events()
+        second = claim_events()
+    assert len(first) == 2
+    assert second == []
+
+def test_newer_event_waits_while_older_one_of_same_key_is_claimed(app):
+    _enqueue(app, ('booking-1', 'scheduled'))
+    with app.app_context():
+        first = claim_events()
+    _enqueue(app, ('booking-1', 'cancelled'), ('booking-2', 'scheduled'))
+    with app.app_context():
+        second = claim_events()
+        keys = [OutboxEvent.query.get(event_id).idempotency_key for event_id in second]
+    assert len(first) == 1
+    assert keys == ['booking-2']
+
+def test_process_outbox_sends_latest_state_and_empties_queue(app, supabase):
+    _enqueue(app, ('booking-1', 'scheduled'), ('booking-1', 'cancelled'), ('booking-2', 'scheduled'))
+    with app.app_context():
+        assert process_outbox() == 3
+    (table, rows), = supabase.upserts
+    assert table == 'agendamentos'
+    assert {row['idempotency_key']: row['status'] for row in rows} == {
+        'booking-1': 'cancelled', 'booking-2': 'scheduled'
+    }
+    assert _pending(app) == []
+
+def test_failed_batch_is_kept_with_backoff(app, supabase):
+    supabase.fail = True
+    _enqueue(app, ('booking-1', 'scheduled'))
+    with app.app_context():
+        assert process_outbox() == 0
+        # Em espera: nem o lote seguinte o pega
+        assert process_outbox() == 0
+    assert _pending(app) == [('booking-1', 1)]
+    assert supabase.upserts == []
+
+def test_parallel_drainers_send_each_event_once(file_app, monkeypatch):
+    fake = FakeSupabase(delay=0.05)
+    monkeypatch.setattr(outbox, 'get_supabase', lambda: fake)
+    _enqueue(file_app, *[(f'booking-{index}', 'scheduled') for index in range(40)])
+    
+    def drain():
+        with file_app.app_context():
+            while process_outbox(batch_size=5):
+                pass
+    
+    threads = [threading.Thread(target=drain) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    sent = [row['idempotency_key'] for _, rows in fake.upserts for row in rows]
+    assert sorted(sent) == sorted(f'booking-{index}' for index in range(40))
+    assert len(fake.upserts) > 1
+    assert _pending(file_app) == []
+
+def _retry_now(app):
+    """Antecipar as novas tentativas agendadas"""
+    with app.app_context():
+        OutboxEvent.query.update({OutboxEvent.next_attempt_at: datetime.utcnow()})
+        db.session.commit()
+
+def test_rejected_row_does_not_block_the_batch(app, supabase):
+    _enqueue(app, ('booking-1', 'invalid'), ('booking-2', 'scheduled'), ('booking-3', 'scheduled'))
+    with app.app_context():
+        assert process_outbox() == 2
+    sent = [row['idempotency_key'] for _, rows in supabase.upserts for row in rows]
+    assert sorted(sent) == ['booking-2', 'booking-3']
+    assert _pending(app) == [('booking-1', 1)]
+    
+    # Novos eventos também passam enquanto a linha inválida aguarda
+    _enqueue(app, ('booking-4', 'scheduled'))
+    _retry_now(app)
+    with app.app_context():
+        assert process_outbox() == 1
+    assert _pending(app) == [('booking-1', 2)]
+
+def test_event_is_dead_lettered_after_max_attempts(app, supabase, monkeypatch):
+    monkeypatch.setattr(outbox, 'OUTBOX_MAX_ATTEMPTS', 3)
+    _enqueue(app, ('booking-1', 'invalid'))
+    for _ in range(5):
+        _retry_now(app)
+        with app.app_context():
+            process_outbox()
+    
+    with app.app_context():
+        event = OutboxEvent.query.one()
+        assert (event.status, event.attempts) == ('dead', 3)
+        assert claim_events() == []
+        stats = outbox_stats()
+    assert (stats['depth'], stats['dead']) == (0, 1)
+    
+    # Um estado mais recente da mesma chave segue normalmente e substitui o abandonado
+    _enqueue(app, ('booking-1', 'scheduled'))
+    with app.app_context():
+        assert process_outbox() == 1
+    assert _pending(app) == []
+
+def test_sync_status_reports_dead_letters(app, client, supabase, monkeypatch):
+    monkeypatch.setattr(outbox, 'OUTBOX_MAX_ATTEMPTS', 1)
+    _enqueue(app, ('booking-1', 'invalid'), ('booking-2', 'scheduled'))
+    with app.app_context():
+        process_outbox()
+    
+    data = client.get('/api/sync/status').get_json()['data']
+    assert (data['depth'], data['dead']) == (0, 1)
+
+@pytest.mark.parametrize('body', [
+    {'nome': 'Ana', 'email': 'ana@exemplo.com', 'servico': 'Limpeza', 'data': 'not-a-date'},
+    {'nome': 'Ana', 'email': 'ana', 'servico': 'Limpeza', 'data': '2026-03-02T10:00'},
+    {'nome': '', 'email': 'ana@exemplo.com', 'servico': 'Limpeza', 'data': '2026-03-02T10:00'},
+    {'email': 'ana@exemplo.com', 'servico': 'Limpeza', 'data': '2026-03-02T10:00'},
+    ['nome'],
+])
+def test_agendar_rejects_invalid_payload_before_enqueuing(app, client, body):
+    assert client.post('/api/agendar', json=body).status_code == 400
+    assert _pending(app) == []
+
+def test_agendar_enqueues_valid_payload(app, client):
+    response = client.post('/api/agendar', json={
+        'nome': 'Ana', 'email': 'ana@exemplo.com', 'servico': 'Limpeza', 'data': '2026-03-02T10:00'
+    }, headers={'Idempotency-Key': 'pedido-1'})
+    
+    assert response.status_code == 201
+    assert _pending(app) == [('pedido-1', 0)]
@@ -0,0 +1,71 @@
+import base64
+
+import pytest
+
+from conftest import future_day, seed_bookings
+from src.utils.pagination import MAX_PAGE_SIZE
+
+def _pages(client, query):
+    """Percorrer todas as páginas seguindo next_cursor; retorna as páginas de ids"""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(f'/api/bookings?{query}' + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        body = response.get_json()
+        pages.append([booking['id'] for booking in body['data']])
+        cursor = body['next_cursor']
+        if not cursor:
+            return pages
+
+def test_cursor_round_trip_visits_every_booking_once_in_order(app, client, service):
+    # Duas cargas nos mesmos dias e horários: o desempate entre elas é pelo id
+    seed_bookings(app, service, 23, future_day())
+    seed_bookings(app, service, 5, future_day())
+    
+    pages = _pages(client, 'limit=4')
+    everything = client.get('/api/bookings?limit=100').get_json()['data']
+    
+    assert [len(page) for page in pages] == [4] * 7
+    assert sum(pages, []) == [booking['id'] for booking in everything]
+    keys = [(booking['appointment_date'], booking['appointment_time'], booking['id']) for booking in everything]
+    assert keys == sorted(keys, reverse=True)
+
+def test_cursor_keeps_filters_and_projection(app, client, service):
+    first = future_day()
+    seed_bookings(app, service, 24, first)
+    query = f'start_date={first.isoformat()}&end_date={first.isoformat()}&fields=id,appointment_date&limit=3'
+    
+    pages = _pages(client, query)
+    
+    assert [len(page) for page in pages] == [3, 3, 2]
+    body = client.get(f'/api/bookings?{query}').get_json()
+    assert set(body['data'][0]) == {'id', 'appointment_date'}
+    assert {booking['appointment_date'] for booking in body['data']} == {first.isoformat()}
+
+def test_last_page_has_no_cursor(app, client, service):
+    seed_bookings(app, service, 3, future_day())
+    assert client.get('/api/bookings?limit=3').get_json()['next_cursor'] is None
+
+@pytest.mark.parametrize('cursor', [
+    'lixo',
+    '%%%',
+    base64.urlsafe_b64encode(b'2026-03-02|10:00').decode(),
+    base64.urlsafe_b64encode(b'2026-13-02|10:00:00|1').decode(),
+    base64.urlsafe_b64encode(b'2026-03-02|10:00:00|x').decode(),
+    base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+])
+def test_invalid_cursor_returns_400(client, cursor):
+    response = client.get(f'/api/bookings?cursor={cursor}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Cursor inválido'
+
+@pytest.mark.parametrize('limit', ['0', '-1', 'abc'])
+def test_invalid_limit_returns_400(client, limit):
+    assert client.get(f'/api/bookings?limit={limit}').status_code == 400
+
+def test_limit_is_capped(app, client, service):
+    seed_bookings(app, service, MAX_PAGE_SIZE + 1, future_day())
+    body = client.get(f'/api/bookings?limit={MAX_PAGE_SIZE * 2}').get_json()
+    assert len(body['data']) == MAX_PAGE_SIZE
+    assert body['next_cursor']
@@ -0,0 +1,36 @@
+import pytest
+
+from conftest import capture_queries, create_services, future_day, seed_bookings
+from src.utils.calendar_cache import invalidate_calendar
+
+def _queries_for(app, client, path):
+    # Sem o cache do calendário, para medir as consultas de verdade
+    with app.app_context():
+        invalidate_calendar()
+    with capture_queries(app) as statements:
+        response = client.get(path)
+    assert response.status_code == 200
+    return len(statements)
+
+@pytest.mark.parametrize('path', [
+    '/api/bookings?limit=100',
+    '/api/bookings?start_date={first}&end_date={last}&limit=100',
+    '/api/bookings/calendar/{month}/{year}',
+    '/api/bookings/calendar/{month}/{year}?view=counts'
+])
+def test_query_count_does_not_grow_with_bookings(app, client, path):
+    # Vários serviços: carregar o serviço de cada agendamento sob demanda (N+1) mudaria a contagem
+    services = create_services(app, 6)
+    first = future_day().replace(day=1)
+    path = path.format(first=first.isoformat(), last=first.replace(day=28).isoformat(),
+                       month=first.month, year=first.year)
+    
+    seed_bookings(app, services[:2], 5, first)
+    # Aquecer os caches do processo (catálogo de serviços, expediente)
+    _queries_for(app, client, path)
+    few = _queries_for(app, client, path)
+    # Mesmo mês e mesma página, com mais agendamentos (8 por dia)
+    seed_bookings(app, services, 75, first.replace(day=2))
+    many = _queries_for(app, client, path)
+    
+    assert many == few
@@ -0,0 +1,121 @@
+import json
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from conftest import future_day
+from src.models.agendai import OutboxEvent
+from src.routes import series as series_routes
+
+def _latest_events(app):
+    """Último payload enfileirado por chave de idempotência"""
+    with app.app_context():
+        return {
+            event.idempotency_key: json.loads(event.payload)
+            for event in OutboxEvent.query.order_by(OutboxEvent.id)
+        }
+
+def _create_series(client, service, start, count=3):
+    response = client.post('/api/bookings/series', json={
+        'service_id': service,
+        'client_name': 'Ana',
+        'client_contact': 'ana@exemplo.com',
+        'start_date': start.isoformat(),
+        'appointment_time': '10:00',
+        'count': count
+    })
+    assert response.status_code == 201
+    return response.get_json()['data']['id']
+
+def test_series_occurrences_are_enqueued(app, client, service):
+    start = future_day()
+    series_id = _create_series(client, service, start)
+    
+    events = _latest_events(app)
+    for week in range(3):
+        day = start + timedelta(weeks=week)
+        payload = events[f"occurrence-s{series_id}-{day.strftime('%Y%m%d')}"]
+        assert payload['data'] == f'{day.isoformat()}T10:00'
+        assert payload['status'] == 'scheduled'
+        assert payload['nome'] == 'Ana'
+
+def test_occurrence_changes_are_enqueued(app, client, service):
+    start = future_day()
+    series_id = _create_series(client, service, start)
+    second = start + timedelta(weeks=1)
+    third = start + timedelta(weeks=2)
+    key = f"occurrence-s{series_id}-{second.strftime('%Y%m%d')}"
+    
+    response = client.put(f'/api/bookings/series/{series_id}/occurrences/{second.isoformat()}', json={
+        'appointment_date': (second + timedelta(days=1)).isoformat(), 'appointment_time': '15:00'
+    })
+    assert response.status_code == 200
+    assert _latest_events(app)[key]['data'] == f'{(second + timedelta(days=1)).isoformat()}T15:00'
+    
+    assert client.delete(f'/api/bookings/series/{series_id}/occurrences/{second.isoformat()}').status_code == 200
+    payload = _latest_events(app)[key]
+    assert payload['status'] == 'cancelled'
+    # Cancelada onde estava marcada (a data remarcada)
+    assert payload['data'] == f'{(second + timedelta(days=1)).isoformat()}T15:00'
+    
+    assert client.delete(f'/api/bookings/series/{series_id}?from={third.isoformat()}').status_code == 200
+    events = _latest_events(app)
+    assert events[f"occurrence-s{series_id}-{third.strftime('%Y%m%d')}"]['status'] == 'cancelled'
+    assert events[f"occurrence-s{series_id}-{start.strftime('%Y%m%d')}"]['status'] == 'scheduled'
+
+def test_cancelling_series_enqueues_every_occurrence(app, client, service):
+    start = future_day()
+    series_id = _create_series(client, service, start, count=4)
+    
+    assert client.delete(f'/api/bookings/series/{series_id}').status_code == 200
+    statuses = [
+        payload['status'] for key, payload in _latest_events(app).items()
+        if key.startswith(f'occurrence-s{series_id}-')
+    ]
+    assert statuses == ['cancelled'] * 4
+
+def test_occurrences_in_listing_follow_limit_and_cursor(client, service):
+    start = future_day()
+    _create_series(client, service, start, count=5)
+    window = f'start_date={start.isoformat()}&end_date={(start + timedelta(weeks=5)).isoformat()}'
+    
+    seen = []
+    query = f'/api/bookings?{window}&limit=2'
+    while True:
+        body = client.get(query).get_json()
+        assert len(body['occurrences']) <= 2
+        seen += [occurrence['appointment_date'] for occurrence in body['occurrences']]
+        if not body['next_occurrences_cursor']:
+            break
+        query = f"/api/bookings?{window}&limit=2&occurrences_cursor={body['next_occurrences_cursor']}"
+    
+    assert seen == [(start + timedelta(weeks=week)).isoformat() for week in range(4, -1, -1)]
+    assert client.get(f'/api/bookings?{window}&occurrences_cursor=lixo').status_code == 400
+
+def test_rescheduling_an_occurrence_locks_all_days_in_one_call(client, service, monkeypatch):
+    start = future_day()
+    series_id = _create_series(client, service, start)
+    target = start + timedelta(days=1)
+    
+    calls = []
+    lock = series_routes.lock_booking_days
+    monkeypatch.setattr(series_routes, 'lock_booking_days', lambda *dates: calls.append(set(dates)) or lock(*dates))
+    response = client.put(f'/api/bookings/series/{series_id}/occurrences/{start.isoformat()}', json={
+        'appointment_date': target.isoformat(), 'appointment_time': '15:00'
+    })
+    
+    assert response.status_code == 200
+    assert calls == [{start, target}]
+
+@pytest.mark.parametrize('path', ['', '/occurrences/{day}'])
+def test_cancel_routes_return_503_when_days_are_locked(client, service, monkeypatch, path):
+    start = future_day()
+    series_id = _create_series(client, service, start)
+    
+    def busy(*dates):
+        raise OperationalError('INSERT', {}, Exception('database is locked'))
+    monkeypatch.setattr(series_routes, 'lock_booking_days', busy)
+    response = client.delete(f'/api/bookings/series/{series_id}' + path.format(day=start.isoformat()))
+    
+    assert response.status_code == 503
@@ -0,0 +1,66 @@
+import pytest
+
+from conftest import booking_data, create_services, future_day
+from src.models.agendai import db, Service
+from src.routes import services as services_routes
+from src.utils.catalog import get_cached_service
+
+@pytest.fixture
+def stale_catalog(app, service):
+    """Catálogo em cache com 60 minutos enquanto o banco já tem 120 (outro processo alterou)"""
+    with app.app_context():
+        assert get_cached_service(service)['duration_minutes'] == 60
+        Service.query.get(service).duration_minutes = 120
+        db.session.commit()
+        assert get_cached_service(service)['duration_minutes'] == 60
+    return service
+
+def test_create_uses_duration_from_database(client, stale_catalog):
+    day = future_day()
+    assert client.post('/api/bookings', json=booking_data(stale_catalog, day, '10:00')).status_code == 201
+    
+    # 10:00 + 120 minutos ocupa 11:00, tanto na verificação quanto na ocupação marcada
+    assert client.post('/api/bookings', json=booking_data(stale_catalog, day, '11:00')).status_code == 409
+    times = client.get(f'/api/bookings/available-times/{day.isoformat()}/{stale_catalog}').get_json()['data']
+    assert '10:00' not in times and '11:00' not in times
+
+def test_bulk_uses_duration_from_database(client, stale_catalog):
+    day = future_day()
+    response = client.post('/api/bookings/bulk', json=[
+        booking_data(stale_catalog, day, '10:00'), booking_data(stale_catalog, day, '11:00')
+    ])
+    
+    assert response.get_json()['created'] == 1
+    assert response.get_json()['data'][1]['error'] == 'Horário não disponível'
+
+def test_series_uses_duration_from_database(client, stale_catalog):
+    day = future_day()
+    assert client.post('/api/bookings', json=booking_data(stale_catalog, day, '12:00')).status_code == 201
+    
+    # 11:00 + 120 minutos da própria série alcança o agendamento das 12:00
+    response = client.post('/api/bookings/series', json={
+        'service_id': stale_catalog,
+        'client_name': 'Bia',
+        'client_contact': 'bia@exemplo.com',
+        'start_date': day.isoformat(),
+        'appointment_time': '11:00',
+        'count': 2
+    })
+    assert response.status_code == 409
+
+def test_duration_change_locks_and_rebuilds_service_days(app, client, service, monkeypatch):
+    short, = create_services(app, 1, duration_minutes=30)
+    days = [future_day(30), future_day(40)]
+    for day in days:
+        assert client.post('/api/bookings', json=booking_data(service, day, '10:00')).status_code == 201
+    
+    calls = []
+    lock = services_routes.lock_booking_days
+    monkeypatch.setattr(services_routes, 'lock_booking_days', lambda *dates: calls.append(set(dates)) or lock(*dates))
+    assert client.put(f'/api/services/{service}', json={'duration_minutes': 120}).status_code == 200
+    
+    assert calls == [set(days)]
+    for day in days:
+        # 10:00 + 120 minutos: um serviço de 30 minutos não cabe mais às 11:00
+        times = client.get(f'/api/bookings/available-times/{day.isoformat()}/{short}').get_json()['data']
+        assert '11:00' not in times and '12:00' in times
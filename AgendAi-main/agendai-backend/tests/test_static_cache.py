@@ -0,0 +1,26 @@
+import pytest
+
+from src.utils.avatars import AVATAR_FILE
+from src.utils.static_assets import HASHED_ASSET
+
+@pytest.mark.parametrize('name, immutable', [
+    ('assets/index-BkQ2x9aF.js', True),
+    ('assets/vendor-a_b-C9dE.css', True),
+    ('assets/fonts/inter-Xy12_abc.woff2', True),
+    ('apple-touch-icon.png', False),
+    ('android-chrome-192x192.png', False),
+    ('logo-dark-mode.svg', False),
+    ('assets/logo-dark-mode.svg', False),
+    ('index.html', False),
+])
+def test_only_vite_hashed_assets_are_immutable(name, immutable):
+    assert (HASHED_ASSET.match(name) is not None) == immutable
+
+@pytest.mark.parametrize('name, immutable', [
+    ('avatar-0123456789abcdef.png', True),
+    ('avatar-0123456789abcdef-256.webp', True),
+    ('avatar-dark-mode-icon.png', False),
+    ('apple-touch-icon.png', False),
+])
+def test_only_content_hashed_avatars_are_immutable(name, immutable):
+    assert (AVATAR_FILE.match(name) is not None) == immutable
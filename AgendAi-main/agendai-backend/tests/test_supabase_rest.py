@@ -0,0 +1,142 @@
+import httpx
+import pytest
+
+from src.routes import agendamentos
+from src.utils import supabase_rest
+from src.utils.supabase_rest import SupabaseError, SupabaseREST
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(supabase_rest, 'SUPABASE_RETRY_BACKOFF', 0)
+
+def make_client(responses, max_retries=2):
+    """Cliente com um transporte falso; ``responses`` é uma lista de status ou exceções"""
+    requests = []
+    
+    def handler(request):
+        requests.append(request)
+        outcome = responses[min(len(requests), len(responses)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json=[{'id': 1}] if outcome < 400 else {'message': f'erro {outcome}'})
+    
+    client = SupabaseREST(url='http://supabase.test', key='chave', max_retries=max_retries,
+                          transport=httpx.MockTransport(handler))
+    return client, requests
+
+def test_select_sends_projection_order_pagination_and_filters():
+    client, requests = make_client([200])
+    
+    assert client.select('agendamentos', columns='nome,data', order='data', desc=True, limit=50, offset=100,
+                         filters={'email': 'eq.ana@exemplo.com'}) == [{'id': 1}]
+    
+    request = requests[0]
+    assert request.method == 'GET'
+    assert request.url.path == '/rest/v1/agendamentos'
+    assert dict(request.url.params) == {
+        'select': 'nome,data',
+        'order': 'data.desc',
+        'limit': '50',
+        'offset': '100',
+        'email': 'eq.ana@exemplo.com'
+    }
+    assert request.headers['apikey'] == 'chave'
+    assert request.headers['authorization'] == 'Bearer chave'
+
+def test_select_omits_empty_pagination():
+    client, requests = make_client([200])
+    client.select('servicos')
+    assert dict(requests[0].url.params) == {'select': '*'}
+
+def test_reads_are_retried_on_transient_status():
+    client, requests = make_client([503, 502, 200])
+    assert client.select('servicos') == [{'id': 1}]
+    assert len(requests) == 3
+
+def test_reads_are_retried_on_transport_errors():
+    client, requests = make_client([httpx.ReadTimeout('lento'), 200])
+    assert client.select('servicos') == [{'id': 1}]
+    assert len(requests) == 2
+
+def test_retries_stop_after_max_retries():
+    client, requests = make_client([503], max_retries=2)
+    with pytest.raises(SupabaseError) as error:
+        client.select('servicos')
+    assert error.value.status_code == 503
+    assert len(requests) == 3
+
+def test_client_errors_are_not_retried():
+    client, requests = make_client([400, 200])
+    with pytest.raises(SupabaseError) as error:
+        client.select('servicos')
+    assert error.value.status_code == 400
+    assert str(error.value) == 'erro 400'
+    assert len(requests) == 1
+
+def test_inserts_are_not_retried_after_the_request_was_sent():
+    client, requests = make_client([503, 201])
+    with pytest.raises(SupabaseError):
+        client.insert('agendamentos', {'nome': 'Ana'})
+    assert len(requests) == 1
+    
+    client, requests = make_client([httpx.ReadTimeout('lento'), 201])
+    with pytest.raises(SupabaseError):
+        client.insert('agendamentos', {'nome': 'Ana'})
+    assert len(requests) == 1
+
+def test_inserts_are_retried_when_the_connection_failed():
+    client, requests = make_client([httpx.ConnectError('recusada'), 201])
+    assert client.insert('agendamentos', {'nome': 'Ana'}) == [{'id': 1}]
+    assert len(requests) == 2
+
+def test_upserts_are_retried_and_merge_duplicates():
+    client, requests = make_client([503, 201])
+    client.upsert('agendamentos', [{'idempotency_key': 'k1'}], on_conflict='idempotency_key')
+    assert len(requests) == 2
+    assert requests[-1].url.params['on_conflict'] == 'idempotency_key'
+    assert 'resolution=merge-duplicates' in requests[-1].headers['prefer']
+
+@pytest.fixture
+def supabase(monkeypatch):
+    """Substituir o cliente compartilhado usado pela rota de agendamentos"""
+    state = {'responses': [200], 'requests': []}
+    
+    def get_supabase():
+        if 'client' not in state:
+            state['client'], state['requests'] = make_client(state['responses'])
+        return state['client']
+    
+    monkeypatch.setattr(agendamentos, 'get_supabase', get_supabase)
+    return state
+
+def test_agendamentos_pagination_params(client, supabase):
+    response = client.get('/api/agendamentos?limit=20&offset=40&columns=nome,data')
+    
+    assert response.status_code == 200
+    assert response.get_json() == [{'id': 1}]
+    assert dict(supabase['requests'][0].url.params) == {
+        'select': 'nome,data', 'order': 'data.asc', 'limit': '20', 'offset': '40'
+    }
+
+def test_agendamentos_default_and_max_page_size(client, supabase):
+    client.get('/api/agendamentos')
+    client.get('/api/agendamentos?limit=100000')
+    
+    first, second = supabase['requests']
+    assert first.url.params['limit'] == str(agendamentos.AGENDAMENTOS_PAGE_SIZE)
+    assert 'offset' not in first.url.params
+    assert second.url.params['limit'] == str(agendamentos.AGENDAMENTOS_MAX_PAGE_SIZE)
+
+@pytest.mark.parametrize('query', ['limit=abc', 'limit=0', 'offset=-1', 'columns=nome;drop'])
+def test_agendamentos_rejects_invalid_params(client, supabase, query):
+    assert client.get(f'/api/agendamentos?{query}').status_code == 400
+    assert supabase['requests'] == []
+
+@pytest.mark.parametrize('upstream, expected', [(400, 400), (404, 400), (500, 502), (503, 502)])
+def test_agendamentos_maps_upstream_errors(client, supabase, upstream, expected):
+    supabase['responses'] = [upstream]
+    assert client.get('/api/agendamentos').status_code == expected
+
+def test_agendamentos_maps_transport_errors_to_502(client, supabase):
+    supabase['responses'] = [httpx.ConnectError('recusada')]
+    assert client.get('/api/agendamentos').status_code == 502
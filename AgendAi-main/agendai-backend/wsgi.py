@@ -0,0 +1,7 @@
+"""Ponto de entrada WSGI de produção
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from src.main import create_app
+
+app = create_app('production')
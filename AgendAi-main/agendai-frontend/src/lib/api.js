@@ -34,6 +34,8 @@ api.interceptors.response.use(
 export const profileAPI = {
   get: () => api.get('/profile'),
   update: (data) => api.put('/profile', data),
+  getBusinessHours: () => api.get('/profile/business-hours'),
+  updateBusinessHours: (data) => api.put('/profile/business-hours', data),
   uploadAvatar: (formData) => api.post('/profile/avatar', formData, {
     headers: { 'Content-Type': 'multipart/form-data' }
   })
@@ -52,10 +54,25 @@ export const servicesAPI = {
 export const bookingsAPI = {
   getAll: (params = {}) => api.get('/bookings', { params }),
   getCalendar: (month, year) => api.get(`/bookings/calendar/${month}/${year}`),
+  getCalendarCounts: (month, year) => api.get(`/bookings/calendar/${month}/${year}`, { params: { view: 'counts' } }),
   getAvailableTimes: (date, serviceId) => api.get(`/bookings/available-times/${date}/${serviceId}`),
+  getAvailableTimesRange: (startDate, endDate, serviceIds) => api.get('/bookings/available-times', {
+    params: { start_date: startDate, end_date: endDate, service_ids: [].concat(serviceIds).join(',') }
+  }),
   create: (data) => api.post('/bookings', data),
+  bulkCreate: (rows) => api.post('/bookings/bulk', rows),
   update: (id, data) => api.put(`/bookings/${id}`, data),
-  cancel: (id) => api.delete(`/bookings/${id}`)
+  cancel: (id) => api.delete(`/bookings/${id}`),
+  createSeries: (data) => api.post('/bookings/series', data),
+  getSeries: (id) => api.get(`/bookings/series/${id}`),
+  cancelSeries: (id, from) => api.delete(`/bookings/series/${id}`, { params: from ? { from } : {} }),
+  updateOccurrence: (seriesId, date, data) => api.put(`/bookings/series/${seriesId}/occurrences/${date}`, data),
+  cancelOccurrence: (seriesId, date) => api.delete(`/bookings/series/${seriesId}/occurrences/${date}`)
+}
+
+// Analytics API
+export const analyticsAPI = {
+  getOccupancy: (start, end) => api.get('/analytics/occupancy', { params: { start, end } })
 }
 
 export default api